@@ -3,9 +3,9 @@ from tkinter import messagebox
 from admin.admin_nav import AdminNavigationFrame
 from admin.user_management import UserManagementFrame
 from admin.inventory_management import InventoryManagementFrame
-from admin.reports import ReportsFrame
-from utils import connect_to_database, center_window
-import mysql.connector
+from utils import get_connection, center_window
+from store_stats import fetch_store_stats
+from background import background_tasks
 import os
 
 class AdminDashboard(ctk.CTk):
@@ -24,34 +24,54 @@ class AdminDashboard(ctk.CTk):
         self.navigation_frame = AdminNavigationFrame(master=self, signout_command=self.sign_out)
         self.navigation_frame.grid(row=0, column=0, sticky="nsew")
         
-        # Initialize frames
-        self.home_frame = HomeFrame(master=self, user_id=self.user_id)
-        self.user_management_frame = UserManagementFrame(master=self)
-        self.inventory_management_frame = InventoryManagementFrame(master=self)
-        self.reports_frame = ReportsFrame(master=self)
+        # Frames are built the first time they are shown, so only the home
+        # screen's widgets and queries stand between login and the first paint
+        self.frame_factories = {
+            "home": lambda: HomeFrame(master=self, user_id=self.user_id),
+            "user_management": lambda: UserManagementFrame(master=self),
+            "inventory_management": lambda: InventoryManagementFrame(master=self),
+            "reports": self.create_reports_frame,
+        }
+        self.frames = {}
         
         # Display the default frame (Home)
         self.show_frame("home")
     
+    def create_reports_frame(self):
+        # Deferred so logging in doesn't pay for importing the report modules
+        from admin.reports import ReportsFrame
+        return ReportsFrame(master=self)
+    
+    def get_frame(self, frame_name):
+        """Return the named frame, building it on first use. Returns (frame, created)."""
+        frame = self.frames.get(frame_name)
+        if frame is not None:
+            return frame, False
+        frame = self.frames[frame_name] = self.frame_factories[frame_name]()
+        return frame, True
+    
     def show_frame(self, frame_name):
         """Display the selected frame."""
         # Hide all frames
-        self.home_frame.grid_forget()
-        self.user_management_frame.grid_forget()
-        self.inventory_management_frame.grid_forget()
-        self.reports_frame.grid_forget()
+        for frame in self.frames.values():
+            frame.grid_forget()
+        
+        # Drop results still loading for tabs the user left; each tab reloads when shown again
+        for name, frame in self.frames.items():
+            if name != frame_name and name != "home":
+                background_tasks.cancel_group(frame)
         
         # Show the selected frame
-        if frame_name == "home":
-            self.home_frame.grid(row=0, column=1, sticky="nsew")
-        elif frame_name == "user_management":
-            self.user_management_frame.grid(row=0, column=1, sticky="nsew")
-            self.user_management_frame.load_users()  # Refresh users
+        frame, created = self.get_frame(frame_name)
+        frame.grid(row=0, column=1, sticky="nsew")
+        
+        # A frame that was just built started its own load
+        if created:
+            return
+        if frame_name == "user_management":
+            frame.load_users()  # Refresh users
         elif frame_name == "inventory_management":
-            self.inventory_management_frame.grid(row=0, column=1, sticky="nsew")
-            self.inventory_management_frame.load_inventory()  # Refresh inventory
-        elif frame_name == "reports":
-            self.reports_frame.grid(row=0, column=1, sticky="nsew")
+            frame.load_inventory()  # Refresh inventory
     
     def sign_out(self):
         """Handle sign-out process."""
@@ -167,50 +187,62 @@ class HomeFrame(ctk.CTkFrame):
         self.inner_frame.grid_rowconfigure(1, weight=1)
     
     def load_statistics(self):
-        """Load and display system statistics."""
+        """Load system statistics in the background and display them."""
+        self.stats_loading_label = ctk.CTkLabel(
+            self.stats_frame,
+            text="Loading statistics...",
+            font=("Arial", 14),
+            text_color="#555"
+        )
+        self.stats_loading_label.pack(pady=20)
+        
+        background_tasks.submit(
+            self,
+            self.fetch_statistics,
+            on_success=self.display_statistics,
+            on_error=self.display_statistics_error
+        )
+    
+    def fetch_statistics(self):
+        """Read the maintained counters; runs on a worker thread."""
+        conn = get_connection()
+        cursor = conn.cursor()
         try:
-            conn = connect_to_database()
-            cursor = conn.cursor()
-            
-            # Get user count
-            cursor.execute("SELECT COUNT(*) FROM users WHERE user_role = 'customer'")
-            customer_count = cursor.fetchone()[0]
-            
-            # Get total products
-            cursor.execute("SELECT COUNT(*) FROM products")
-            product_count = cursor.fetchone()[0]
-            
-            # Get low stock products
-            cursor.execute("SELECT COUNT(*) FROM products WHERE stock_quantity < 10")
-            low_stock_count = cursor.fetchone()[0]
-            
-            # Get total orders
-            cursor.execute("SELECT COUNT(*) FROM orders")
-            order_count = cursor.fetchone()[0]
-            
-            # Get total revenue
-            cursor.execute("SELECT SUM(total_price) FROM orders")
-            total_revenue = cursor.fetchone()[0] or 0
-            
+            # All five numbers come from the maintained counters in one query
+            return fetch_store_stats(cursor)
+        finally:
             cursor.close()
             conn.close()
-            
-            # Create and display stat items
-            self.create_stat_item("Registered Customers", customer_count, "#1a73e8")
-            self.create_stat_item("Total Products", product_count, "#4CAF50")
-            self.create_stat_item("Low Stock Products", low_stock_count, "#FF9800" if low_stock_count > 0 else "#4CAF50")
-            self.create_stat_item("Total Orders", order_count, "#9C27B0")
-            self.create_stat_item("Total Revenue", f"${total_revenue:.2f}", "#F44336")
-            
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            error_label = ctk.CTkLabel(
-                self.stats_frame,
-                text=f"Error loading statistics: {err}",
-                font=("Arial", 14),
-                text_color="red"
-            )
-            error_label.pack(pady=20)
+    
+    def display_statistics(self, stats):
+        """Display the loaded statistics."""
+        self.stats_loading_label.destroy()
+        
+        customer_count = stats["customer_count"]
+        product_count = stats["product_count"]
+        low_stock_count = stats["low_stock_count"]
+        order_count = stats["order_count"]
+        total_revenue = stats["total_revenue"] or 0
+        
+        # Create and display stat items
+        self.create_stat_item("Registered Customers", customer_count, "#1a73e8")
+        self.create_stat_item("Total Products", product_count, "#4CAF50")
+        self.create_stat_item("Low Stock Products", low_stock_count, "#FF9800" if low_stock_count > 0 else "#4CAF50")
+        self.create_stat_item("Total Orders", order_count, "#9C27B0")
+        self.create_stat_item("Total Revenue", f"${total_revenue:.2f}", "#F44336")
+    
+    def display_statistics_error(self, err):
+        """Show that the statistics could not be loaded."""
+        self.stats_loading_label.destroy()
+        
+        print(f"Database error: {err}")
+        error_label = ctk.CTkLabel(
+            self.stats_frame,
+            text=f"Error loading statistics: {err}",
+            font=("Arial", 14),
+            text_color="red"
+        )
+        error_label.pack(pady=20)
     
     def create_stat_item(self, label_text, value_text, color):
         """Create and display a statistic item."""
@@ -2,9 +2,9 @@ import customtkinter as ctk
 from tkinter import ttk, messagebox
 import tkinter as tk
 from utils import connect_to_database, center_window, format_currency
+from thumbnails import thumbnail_cache
+from background import background_tasks
 import mysql.connector
-from PIL import Image
-import os
 
 
 class InventoryManagementFrame(ctk.CTkFrame):
@@ -122,19 +122,23 @@ class InventoryManagementFrame(ctk.CTkFrame):
         self.inventory_tree.heading(col, command=lambda: self.sort_treeview(col, not reverse))
     
     def load_inventory(self):
-        """Load inventory data from database and display it in the Treeview."""
-        # Clear existing rows
-        for row in self.inventory_tree.get_children():
-            self.inventory_tree.delete(row)
+        """Load inventory data from database in the background and display it in the Treeview."""
+        background_tasks.cancel_group(self)
+        background_tasks.submit(
+            self,
+            self.fetch_inventory,
+            on_success=self.display_inventory,
+            on_error=self.display_load_error
+        )
+    
+    def fetch_inventory(self):
+        """Return all products; runs on a worker thread."""
+        conn = connect_to_database()
+        if not conn:
+            raise mysql.connector.Error(msg="Failed to connect to database")
         
+        cursor = conn.cursor(dictionary=True)
         try:
-            conn = connect_to_database()
-            if not conn:
-                messagebox.showerror("Database Error", "Failed to connect to database")
-                return
-                
-            cursor = conn.cursor(dictionary=True)
-            
             # Get all products
             cursor.execute("""
                 SELECT product_id, product_name, product_category, product_price, 
@@ -142,48 +146,55 @@ class InventoryManagementFrame(ctk.CTkFrame):
                 FROM products 
                 ORDER BY product_category, product_name
             """)
-            products = cursor.fetchall()
-            
+            return cursor.fetchall()
+        finally:
             cursor.close()
             conn.close()
-            
-            if not products:
-                messagebox.showinfo("Inventory", "No products found in inventory.")
-                return
-            
-            # Add products to the Treeview
-            for product in products:
-                # Format the date if it exists
-                added_date = product["added_at"].strftime("%Y-%m-%d") if product["added_at"] else ""
-                
-                self.inventory_tree.insert(
-                    "",
-                    "end",
-                    values=(
-                        product["product_id"],
-                        product["product_name"],
-                        product["product_category"],
-                        format_currency(product["product_price"]),
-                        product["stock_quantity"],
-                        added_date
-                    )
+    
+    def display_inventory(self, products):
+        """Replace the Treeview rows with the loaded products."""
+        # Clear existing rows
+        for row in self.inventory_tree.get_children():
+            self.inventory_tree.delete(row)
+        
+        if not products:
+            messagebox.showinfo("Inventory", "No products found in inventory.")
+            return
+        
+        # Add products to the Treeview
+        for product in products:
+            # Format the date if it exists
+            added_date = product["added_at"].strftime("%Y-%m-%d") if product["added_at"] else ""
+            
+            self.inventory_tree.insert(
+                "",
+                "end",
+                values=(
+                    product["product_id"],
+                    product["product_name"],
+                    product["product_category"],
+                    format_currency(product["product_price"]),
+                    product["stock_quantity"],
+                    added_date
                 )
-            
-            # Color rows based on stock level
-            for item in self.inventory_tree.get_children():
-                stock = int(self.inventory_tree.item(item, "values")[4])
-                if stock < 10:  # Low stock
-                    self.inventory_tree.item(item, tags=("low_stock",))
-                elif stock < 20:  # Medium stock
-                    self.inventory_tree.item(item, tags=("medium_stock",))
-            
-            # Configure tags
-            self.inventory_tree.tag_configure("low_stock", background="#ffebee")  # Light red
-            self.inventory_tree.tag_configure("medium_stock", background="#fff8e1")  # Light yellow
-            
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            messagebox.showerror("Database Error", f"Failed to load inventory: {err}")
+            )
+        
+        # Color rows based on stock level
+        for item in self.inventory_tree.get_children():
+            stock = int(self.inventory_tree.item(item, "values")[4])
+            if stock < 10:  # Low stock
+                self.inventory_tree.item(item, tags=("low_stock",))
+            elif stock < 20:  # Medium stock
+                self.inventory_tree.item(item, tags=("medium_stock",))
+        
+        # Configure tags
+        self.inventory_tree.tag_configure("low_stock", background="#ffebee")  # Light red
+        self.inventory_tree.tag_configure("medium_stock", background="#fff8e1")  # Light yellow
+    
+    def display_load_error(self, err):
+        """Report a failed inventory load."""
+        print(f"Database error: {err}")
+        messagebox.showerror("Database Error", f"Failed to load inventory: {err}")
     
     def open_add_product_window(self):
         """Open a new window for adding a product."""
@@ -324,37 +335,11 @@ class InventoryManagementFrame(ctk.CTkFrame):
                 if stock < 0:
                     error_label.configure(text="Stock cannot be negative")
                     return
-                
-                conn = connect_to_database()
-                if not conn:
-                    error_label.configure(text="Database connection failed")
-                    return
-                    
-                cursor = conn.cursor()
-                
-                # Insert the new product
-                cursor.execute(
-                    """
-                    INSERT INTO products 
-                    (product_name, product_category, product_price, stock_quantity, added_at) 
-                    VALUES (%s, %s, %s, %s, NOW())
-                    """,
-                    (name, category, price, stock)
-                )
-                
-                # Get the new product ID
-                product_id = cursor.lastrowid
-                
-                # Insert into inventory table
-                cursor.execute(
-                    "INSERT INTO inventory (product_id, stock_level, last_updated) VALUES (%s, %s, NOW())",
-                    (product_id, stock)
-                )
-                
-                conn.commit()
-                cursor.close()
-                conn.close()
-                
+            except ValueError:
+                error_label.configure(text="Price and stock must be valid numbers")
+                return
+            
+            def on_saved(_):
                 # Reload inventory
                 self.load_inventory()
                 
@@ -363,12 +348,23 @@ class InventoryManagementFrame(ctk.CTkFrame):
                 
                 # Show success message
                 messagebox.showinfo("Success", "Product added successfully")
-                
-            except ValueError:
-                error_label.configure(text="Price and stock must be valid numbers")
-            except mysql.connector.Error as err:
+            
+            def on_error(err):
                 print(f"Database error: {err}")
+                save_button.configure(state="normal")
                 error_label.configure(text=f"Error: {err}")
+            
+            save_button.configure(state="disabled")
+            background_tasks.submit(
+                save_button,
+                self.insert_product,
+                name,
+                category,
+                price,
+                stock,
+                on_success=on_saved,
+                on_error=on_error
+            )
         
         save_button = ctk.CTkButton(
             form_frame,
@@ -382,8 +378,40 @@ class InventoryManagementFrame(ctk.CTkFrame):
         )
         save_button.pack(pady=(0, 20))
     
+    def insert_product(self, name, category, price, stock):
+        """Insert a product and its inventory row; runs on a worker thread."""
+        conn = connect_to_database()
+        if not conn:
+            raise mysql.connector.Error(msg="Database connection failed")
+        
+        cursor = conn.cursor()
+        try:
+            # Insert the new product
+            cursor.execute(
+                """
+                INSERT INTO products 
+                (product_name, product_category, product_price, stock_quantity, added_at) 
+                VALUES (%s, %s, %s, %s, NOW())
+                """,
+                (name, category, price, stock)
+            )
+            
+            # Get the new product ID
+            product_id = cursor.lastrowid
+            
+            # Insert into inventory table
+            cursor.execute(
+                "INSERT INTO inventory (product_id, stock_level, last_updated) VALUES (%s, %s, NOW())",
+                (product_id, stock)
+            )
+            
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+    
     def edit_selected_product(self, event=None):
-        """Open a window to edit the selected product."""
+        """Load the selected product in the background and open a window to edit it."""
         selected = self.inventory_tree.selection()
         if not selected:
             messagebox.showinfo("Selection Required", "Please select a product to edit")
@@ -392,225 +420,249 @@ class InventoryManagementFrame(ctk.CTkFrame):
         # Get the selected product's information
         product_id = self.inventory_tree.item(selected, "values")[0]
         
-        try:
-            conn = connect_to_database()
-            if not conn:
-                messagebox.showerror("Database Error", "Failed to connect to database")
+        def on_loaded(product):
+            if not product:
+                messagebox.showerror("Error", "Product not found")
                 return
-                
-            cursor = conn.cursor(dictionary=True)
-            
+            self.open_edit_window(product_id, product)
+        
+        def on_error(err):
+            print(f"Database error: {err}")
+            messagebox.showerror("Database Error", f"Error: {err}")
+        
+        background_tasks.submit(
+            self.inventory_tree,
+            self.fetch_product,
+            product_id,
+            on_success=on_loaded,
+            on_error=on_error
+        )
+    
+    def fetch_product(self, product_id):
+        """Return one product's row; runs on a worker thread."""
+        conn = connect_to_database()
+        if not conn:
+            raise mysql.connector.Error(msg="Failed to connect to database")
+        
+        cursor = conn.cursor(dictionary=True)
+        try:
             cursor.execute("SELECT * FROM products WHERE product_id = %s", (product_id,))
-            product = cursor.fetchone()
-            
+            return cursor.fetchone()
+        finally:
             cursor.close()
             conn.close()
+    
+    def open_edit_window(self, product_id, product):
+        """Open a window to edit a loaded product."""
+        # Create edit window
+        edit_window = ctk.CTkToplevel(self)
+        edit_window.title("Edit Product")
+        edit_window.geometry("450x600")
+        edit_window.resizable(False, False)
+        center_window(edit_window, width=450, height=600)
+        
+        # Set this window as modal
+        edit_window.grab_set()
+        
+        # Form container
+        form_frame = ctk.CTkScrollableFrame(edit_window, fg_color="white")
+        form_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Title
+        title_label = ctk.CTkLabel(
+            form_frame,
+            text="Edit Product",
+            font=("Arial", 18, "bold"),
+            text_color="#1a73e8"
+        )
+        title_label.pack(pady=(10, 20))
+        
+        # Product Image Preview
+        image_frame = ctk.CTkFrame(form_frame, fg_color="#f5f5f5", width=200, height=150, corner_radius=5)
+        image_frame.pack(pady=(0, 15))
+        
+        # Try to load product image if it exists
+        photo = thumbnail_cache.get(product_id, (180, 140))
+        if photo:
+            image_label = ctk.CTkLabel(image_frame, image=photo, text="")
+            image_label.image = photo  # Keep a reference
+            image_label.place(relx=0.5, rely=0.5, anchor="center")
+        
+        # Product Name
+        name_label = ctk.CTkLabel(form_frame, text="Product Name:", font=("Arial", 14))
+        name_label.pack(anchor="w", padx=20, pady=(0, 5))
+        
+        name_entry = ctk.CTkEntry(
+            form_frame,
+            placeholder_text="Enter product name",
+            width=390,
+            height=35,
+            border_width=1,
+            corner_radius=8
+        )
+        name_entry.insert(0, product["product_name"])
+        name_entry.pack(padx=20, pady=(0, 15))
+        
+        # Product Category
+        category_label = ctk.CTkLabel(form_frame, text="Category:", font=("Arial", 14))
+        category_label.pack(anchor="w", padx=20, pady=(0, 5))
+        
+        categories = ["Fruits", "Vegetables", "Dairy", "Bakery", "Meat", "Beverages", "Snacks", "Other"]
+        category_var = ctk.StringVar(value=product["product_category"])
+        category_combobox = ctk.CTkOptionMenu(
+            form_frame,
+            variable=category_var,
+            values=categories,
+            width=390,
+            height=35,
+            fg_color="white",
+            button_color="#1a73e8",
+            button_hover_color="#005cb2",
+            dropdown_fg_color="white",
+            dropdown_hover_color="#f0f0f0",
+            dropdown_text_color="black"
+        )
+        category_combobox.pack(padx=20, pady=(0, 15))
+        
+        # Price
+        price_label = ctk.CTkLabel(form_frame, text="Price ($):", font=("Arial", 14))
+        price_label.pack(anchor="w", padx=20, pady=(0, 5))
+        
+        price_entry = ctk.CTkEntry(
+            form_frame,
+            placeholder_text="Enter price",
+            width=390,
+            height=35,
+            border_width=1,
+            corner_radius=8
+        )
+        price_entry.insert(0, str(product["product_price"]))
+        price_entry.pack(padx=20, pady=(0, 15))
+        
+        # Stock Quantity
+        stock_label = ctk.CTkLabel(form_frame, text="Stock Quantity:", font=("Arial", 14))
+        stock_label.pack(anchor="w", padx=20, pady=(0, 5))
+        
+        stock_entry = ctk.CTkEntry(
+            form_frame,
+            placeholder_text="Enter stock quantity",
+            width=390,
+            height=35,
+            border_width=1,
+            corner_radius=8
+        )
+        stock_entry.insert(0, str(product["stock_quantity"]))
+        stock_entry.pack(padx=20, pady=(0, 15))
+        
+        # Error label
+        error_label = ctk.CTkLabel(
+            form_frame,
+            text="",
+            font=("Arial", 12),
+            text_color="red",
+            wraplength=390
+        )
+        error_label.pack(pady=(0, 15))
+        
+        # Save button
+        def save_changes():
+            # Validate fields
+            name = name_entry.get().strip()
+            category = category_var.get()
+            price = price_entry.get().strip()
+            stock = stock_entry.get().strip()
             
-            if not product:
-                messagebox.showerror("Error", "Product not found")
+            if not name or not price or not stock:
+                error_label.configure(text="Product name, price, and stock are required")
                 return
             
-            # Create edit window
-            edit_window = ctk.CTkToplevel(self)
-            edit_window.title("Edit Product")
-            edit_window.geometry("450x600")
-            edit_window.resizable(False, False)
-            center_window(edit_window, width=450, height=600)
-            
-            # Set this window as modal
-            edit_window.grab_set()
-            
-            # Form container
-            form_frame = ctk.CTkScrollableFrame(edit_window, fg_color="white")
-            form_frame.pack(fill="both", expand=True, padx=20, pady=20)
-            
-            # Title
-            title_label = ctk.CTkLabel(
-                form_frame,
-                text="Edit Product",
-                font=("Arial", 18, "bold"),
-                text_color="#1a73e8"
-            )
-            title_label.pack(pady=(10, 20))
-            
-            # Product Image Preview
-            image_frame = ctk.CTkFrame(form_frame, fg_color="#f5f5f5", width=200, height=150, corner_radius=5)
-            image_frame.pack(pady=(0, 15))
-            
-            # Try to load product image if it exists
-            image_path = os.path.join("images", "products", f"{product_id}.png")
-            if os.path.exists(image_path):
-                try:
-                    product_image = Image.open(image_path)
-                    product_image = product_image.resize((180, 140))
-                    photo = ctk.CTkImage(light_image=product_image, size=(180, 140))
-                    image_label = ctk.CTkLabel(image_frame, image=photo, text="")
-                    image_label.image = photo  # Keep a reference
-                    image_label.place(relx=0.5, rely=0.5, anchor="center")
-                except Exception as e:
-                    print(f"Error loading image {image_path}: {e}")
-            
-            # Product Name
-            name_label = ctk.CTkLabel(form_frame, text="Product Name:", font=("Arial", 14))
-            name_label.pack(anchor="w", padx=20, pady=(0, 5))
-            
-            name_entry = ctk.CTkEntry(
-                form_frame,
-                placeholder_text="Enter product name",
-                width=390,
-                height=35,
-                border_width=1,
-                corner_radius=8
-            )
-            name_entry.insert(0, product["product_name"])
-            name_entry.pack(padx=20, pady=(0, 15))
-            
-            # Product Category
-            category_label = ctk.CTkLabel(form_frame, text="Category:", font=("Arial", 14))
-            category_label.pack(anchor="w", padx=20, pady=(0, 5))
-            
-            categories = ["Fruits", "Vegetables", "Dairy", "Bakery", "Meat", "Beverages", "Snacks", "Other"]
-            category_var = ctk.StringVar(value=product["product_category"])
-            category_combobox = ctk.CTkOptionMenu(
-                form_frame,
-                variable=category_var,
-                values=categories,
-                width=390,
-                height=35,
-                fg_color="white",
-                button_color="#1a73e8",
-                button_hover_color="#005cb2",
-                dropdown_fg_color="white",
-                dropdown_hover_color="#f0f0f0",
-                dropdown_text_color="black"
-            )
-            category_combobox.pack(padx=20, pady=(0, 15))
-            
-            # Price
-            price_label = ctk.CTkLabel(form_frame, text="Price ($):", font=("Arial", 14))
-            price_label.pack(anchor="w", padx=20, pady=(0, 5))
+            try:
+                # Validate price as a number
+                price = float(price)
+                if price <= 0:
+                    error_label.configure(text="Price must be greater than zero")
+                    return
+                
+                # Validate stock as an integer
+                stock = int(stock)
+                if stock < 0:
+                    error_label.configure(text="Stock cannot be negative")
+                    return
+            except ValueError:
+                error_label.configure(text="Price and stock must be valid numbers")
+                return
             
-            price_entry = ctk.CTkEntry(
-                form_frame,
-                placeholder_text="Enter price",
-                width=390,
-                height=35,
-                border_width=1,
-                corner_radius=8
-            )
-            price_entry.insert(0, str(product["product_price"]))
-            price_entry.pack(padx=20, pady=(0, 15))
+            def on_saved(_):
+                # Reload inventory
+                self.load_inventory()
+                
+                # Close the window
+                edit_window.destroy()
+                
+                # Show success message
+                messagebox.showinfo("Success", "Product updated successfully")
             
-            # Stock Quantity
-            stock_label = ctk.CTkLabel(form_frame, text="Stock Quantity:", font=("Arial", 14))
-            stock_label.pack(anchor="w", padx=20, pady=(0, 5))
+            def on_error(err):
+                print(f"Database error: {err}")
+                save_button.configure(state="normal")
+                error_label.configure(text=f"Error: {err}")
             
-            stock_entry = ctk.CTkEntry(
-                form_frame,
-                placeholder_text="Enter stock quantity",
-                width=390,
-                height=35,
-                border_width=1,
-                corner_radius=8
+            save_button.configure(state="disabled")
+            background_tasks.submit(
+                save_button,
+                self.update_product,
+                product_id,
+                name,
+                category,
+                price,
+                stock,
+                on_success=on_saved,
+                on_error=on_error
             )
-            stock_entry.insert(0, str(product["stock_quantity"]))
-            stock_entry.pack(padx=20, pady=(0, 15))
-            
-            # Error label
-            error_label = ctk.CTkLabel(
-                form_frame,
-                text="",
-                font=("Arial", 12),
-                text_color="red",
-                wraplength=390
+        
+        save_button = ctk.CTkButton(
+            form_frame,
+            text="Save Changes",
+            command=save_changes,
+            width=390,
+            height=40,
+            corner_radius=8,
+            fg_color="#4CAF50",
+            hover_color="#388E3C"
+        )
+        save_button.pack(pady=(0, 20))
+    
+    def update_product(self, product_id, name, category, price, stock):
+        """Update a product and its inventory row; runs on a worker thread."""
+        conn = connect_to_database()
+        if not conn:
+            raise mysql.connector.Error(msg="Database connection failed")
+        
+        cursor = conn.cursor()
+        try:
+            # Update the product
+            cursor.execute(
+                """
+                UPDATE products 
+                SET product_name = %s, product_category = %s, product_price = %s, stock_quantity = %s
+                WHERE product_id = %s
+                """,
+                (name, category, price, stock, product_id)
             )
-            error_label.pack(pady=(0, 15))
             
-            # Save button
-            def save_changes():
-                # Validate fields
-                name = name_entry.get().strip()
-                category = category_var.get()
-                price = price_entry.get().strip()
-                stock = stock_entry.get().strip()
-                
-                if not name or not price or not stock:
-                    error_label.configure(text="Product name, price, and stock are required")
-                    return
-                
-                try:
-                    # Validate price as a number
-                    price = float(price)
-                    if price <= 0:
-                        error_label.configure(text="Price must be greater than zero")
-                        return
-                    
-                    # Validate stock as an integer
-                    stock = int(stock)
-                    if stock < 0:
-                        error_label.configure(text="Stock cannot be negative")
-                        return
-                    
-                    conn = connect_to_database()
-                    if not conn:
-                        error_label.configure(text="Database connection failed")
-                        return
-                        
-                    cursor = conn.cursor()
-                    
-                    # Update the product
-                    cursor.execute(
-                        """
-                        UPDATE products 
-                        SET product_name = %s, product_category = %s, product_price = %s, stock_quantity = %s
-                        WHERE product_id = %s
-                        """,
-                        (name, category, price, stock, product_id)
-                    )
-                    
-                    # Update inventory
-                    cursor.execute(
-                        "UPDATE inventory SET stock_level = %s, last_updated = NOW() WHERE product_id = %s",
-                        (stock, product_id)
-                    )
-                    
-                    conn.commit()
-                    cursor.close()
-                    conn.close()
-                    
-                    # Reload inventory
-                    self.load_inventory()
-                    
-                    # Close the window
-                    edit_window.destroy()
-                    
-                    # Show success message
-                    messagebox.showinfo("Success", "Product updated successfully")
-                    
-                except ValueError:
-                    error_label.configure(text="Price and stock must be valid numbers")
-                except mysql.connector.Error as err:
-                    print(f"Database error: {err}")
-                    error_label.configure(text=f"Error: {err}")
-            
-            save_button = ctk.CTkButton(
-                form_frame,
-                text="Save Changes",
-                command=save_changes,
-                width=390,
-                height=40,
-                corner_radius=8,
-                fg_color="#4CAF50",
-                hover_color="#388E3C"
+            # Update inventory
+            cursor.execute(
+                "UPDATE inventory SET stock_level = %s, last_updated = NOW() WHERE product_id = %s",
+                (stock, product_id)
             )
-            save_button.pack(pady=(0, 20))
             
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            messagebox.showerror("Database Error", f"Error: {err}")
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
     
     def delete_selected_product(self):
-        """Delete the selected product."""
+        """Delete the selected product in the background."""
         selected = self.inventory_tree.selection()
         if not selected:
             messagebox.showinfo("Selection Required", "Please select a product to delete")
@@ -628,44 +680,51 @@ class InventoryManagementFrame(ctk.CTkFrame):
         if not confirm:
             return
         
-        try:
-            conn = connect_to_database()
-            if not conn:
-                messagebox.showerror("Database Error", "Failed to connect to database")
-                return
-                
-            cursor = conn.cursor()
-            
-            try:
-                # Start transaction
-                conn.start_transaction()
-                
-                # Delete from inventory first (due to foreign key constraint)
-                cursor.execute("DELETE FROM inventory WHERE product_id = %s", (product_id,))
-                
-                # Delete the product
-                cursor.execute("DELETE FROM products WHERE product_id = %s", (product_id,))
-                
-                # Commit transaction
-                conn.commit()
-                
-                # Reload inventory
-                self.load_inventory()
-                
-                # Show success message
-                messagebox.showinfo("Success", "Product deleted successfully")
-                
-            except mysql.connector.Error as err:
-                # Rollback on error
-                conn.rollback()
-                raise err
-            finally:
-                cursor.close()
-                conn.close()
+        def on_deleted(_):
+            # Reload inventory
+            self.load_inventory()
             
-        except mysql.connector.Error as err:
+            # Show success message
+            messagebox.showinfo("Success", "Product deleted successfully")
+        
+        def on_error(err):
             print(f"Database error: {err}")
             messagebox.showerror("Database Error", f"Failed to delete product: {err}")
+        
+        background_tasks.submit(
+            self.inventory_tree,
+            self.delete_product,
+            product_id,
+            on_success=on_deleted,
+            on_error=on_error
+        )
+    
+    def delete_product(self, product_id):
+        """Delete a product and its inventory row; runs on a worker thread."""
+        conn = connect_to_database()
+        if not conn:
+            raise mysql.connector.Error(msg="Failed to connect to database")
+        
+        cursor = conn.cursor()
+        try:
+            # Start transaction
+            conn.start_transaction()
+            
+            # Delete from inventory first (due to foreign key constraint)
+            cursor.execute("DELETE FROM inventory WHERE product_id = %s", (product_id,))
+            
+            # Delete the product
+            cursor.execute("DELETE FROM products WHERE product_id = %s", (product_id,))
+            
+            # Commit transaction
+            conn.commit()
+        except mysql.connector.Error:
+            # Rollback on error
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
     
     def show_context_menu(self, event):
         """Show a context menu when right-clicking on a product."""
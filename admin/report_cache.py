@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+
+
+class ReportEntry:
+    """A report's query result plus, once drawn, its figure as PNG bytes."""
+    
+    def __init__(self, key, stamp, data):
+        self.key = key
+        self.stamp = stamp
+        self.data = data
+        self.figure = None
+        self.figure_png = None
+        self.created_at = time.monotonic()
+
+
+class ReportCache:
+    """Cache of generated reports keyed by (report_type, start_date, end_date, granularity).
+    
+    An entry is served while it is younger than the TTL and the data stamp
+    it was built from still matches. The stamp is the order and product
+    counters in store_stats, which triggers update on every checkout and
+    every products write, so a new order or an inventory edit invalidates
+    every cached report with a single primary-key lookup. Entries are
+    dropped least recently used first beyond max_entries.
+    """
+    
+    def __init__(self, ttl=None, max_entries=32):
+        self.ttl = ttl if ttl is not None else Config.report_cache_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> ReportEntry
+        self._lock = threading.Lock()
+        
+        # Counters for monitoring
+        self.hits = 0
+        self.misses = 0
+    
+    def current_stamp(self, cursor):
+        """Return the stamp describing the data every report is built from."""
+        cursor.execute("""
+            SELECT order_count, total_revenue, product_count, catalog_version
+            FROM store_stats WHERE stats_id = 1
+        """)
+        row = cursor.fetchone()
+        return tuple(row.values()) if isinstance(row, dict) else tuple(row)
+    
+    def get(self, key, stamp):
+        """Return the fresh entry for key, or None after counting a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.stamp == stamp and time.monotonic() - entry.created_at < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, entry):
+        """Store an entry built from fresh data."""
+        with self._lock:
+            self._entries[entry.key] = entry
+            self._entries.move_to_end(entry.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self):
+        """Drop every cached report."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Return the counters and current size for monitoring."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+# Process-wide report cache shared by all report screens
+report_cache = ReportCache()
@@ -0,0 +1,252 @@
+from datetime import date, timedelta
+
+from config import Config
+from utils import get_connection
+from store_stats import LOW_STOCK_THRESHOLD
+
+REPORT_TYPES = ("sales", "products", "revenue", "stock")
+GRANULARITIES = ("day", "week", "month")
+
+# Base file names used for exported reports
+REPORT_NAMES = {
+    "sales": "Sales_Report",
+    "products": "Top_Products_Report",
+    "revenue": "Revenue_Summary",
+    "stock": "Low_Stock_Report",
+}
+
+
+def default_range():
+    """Return (start_date, end_date) covering the last 90 days, both inclusive."""
+    today = date.today()
+    return today - timedelta(days=90), today
+
+
+def plan_source(start_date, end_date):
+    """Choose the tables a date-range report reads: "raw" or "rollup".
+    
+    Short ranges cover few orders, so scanning them through idx_orders_date
+    is as cheap as reading the rollups; longer ranges read the daily rollups
+    so their cost depends on the number of days, not orders.
+    """
+    days = (end_date - start_date).days + 1
+    return "raw" if days <= Config.report_raw_max_days else "rollup"
+
+
+def period_label(column, granularity):
+    """Return the SQL expression labelling a date column with its period."""
+    if granularity == "day":
+        return f"DATE_FORMAT({column}, '%Y-%m-%d')"
+    if granularity == "week":
+        # Weeks are labelled by their Monday
+        return f"DATE_FORMAT(DATE({column}) - INTERVAL WEEKDAY({column}) DAY, '%Y-%m-%d')"
+    if granularity == "month":
+        return f"DATE_FORMAT({column}, '%Y-%m')"
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def range_params(source, start_date, end_date):
+    """Return the bounds for the range predicates of the chosen source.
+    
+    Both sources compare the bare column with constants so the index on it
+    is used: sale_date is a DATE and takes the inclusive end, while
+    order_date is a TIMESTAMP and takes the start of the following day.
+    """
+    if source == "raw":
+        return start_date, end_date + timedelta(days=1)
+    return start_date, end_date
+
+
+def fetch_sales_data(cursor, start_date, end_date, granularity="month", source="rollup"):
+    """Return (period, order_count, revenue) rows for the sales over time report."""
+    if source == "raw":
+        query = f"""
+            SELECT
+                {period_label("order_date", granularity)} AS period,
+                COUNT(order_id) AS order_count,
+                SUM(total_price) AS revenue
+            FROM orders
+            WHERE order_date >= %s AND order_date < %s
+            GROUP BY period
+            ORDER BY period
+        """
+    else:
+        # Totals from the daily rollup, one row per day at most
+        query = f"""
+            SELECT
+                {period_label("sale_date", granularity)} AS period,
+                SUM(order_count) AS order_count,
+                SUM(revenue) AS revenue
+            FROM sales_daily
+            WHERE sale_date >= %s AND sale_date <= %s
+            GROUP BY period
+            ORDER BY period
+        """
+    cursor.execute(query, range_params(source, start_date, end_date))
+    return cursor.fetchall()
+
+
+def fetch_products_data(cursor, start_date, end_date, source="rollup"):
+    """Return (product_name, total_quantity, total_revenue) rows for the top 10 products."""
+    if source == "raw":
+        query = """
+            SELECT
+                p.product_name,
+                SUM(od.quantity) AS total_quantity,
+                SUM(od.sub_total) AS total_revenue
+            FROM orders o
+            JOIN order_details od ON od.order_id = o.order_id
+            JOIN products p ON od.product_id = p.product_id
+            WHERE o.order_date >= %s AND o.order_date < %s
+            GROUP BY p.product_id
+            ORDER BY total_quantity DESC
+            LIMIT 10
+        """
+    else:
+        # Top products by quantity sold, from the per-product daily rollup
+        query = """
+            SELECT
+                p.product_name,
+                SUM(ps.quantity) AS total_quantity,
+                SUM(ps.revenue) AS total_revenue
+            FROM product_sales_daily ps
+            JOIN products p ON ps.product_id = p.product_id
+            WHERE ps.sale_date >= %s AND ps.sale_date <= %s
+            GROUP BY p.product_id
+            ORDER BY total_quantity DESC
+            LIMIT 10
+        """
+    cursor.execute(query, range_params(source, start_date, end_date))
+    return cursor.fetchall()
+
+
+def fetch_revenue_data(cursor, start_date, end_date, source="rollup"):
+    """Return (revenue stats dict, revenue by category dicts) for the revenue summary."""
+    if source == "raw":
+        query = """
+            SELECT
+                COUNT(order_id) AS total_orders,
+                SUM(total_price) AS total_revenue,
+                AVG(total_price) AS average_order_value,
+                MAX(total_price) AS highest_order,
+                MIN(total_price) AS lowest_order
+            FROM orders
+            WHERE order_date >= %s AND order_date < %s
+        """
+        category_query = """
+            SELECT
+                od.product_category,
+                SUM(od.sub_total) AS category_revenue
+            FROM orders o
+            JOIN order_details od ON od.order_id = o.order_id
+            WHERE o.order_date >= %s AND o.order_date < %s
+            GROUP BY od.product_category
+            ORDER BY category_revenue DESC
+        """
+    else:
+        # Revenue stats from the daily rollup
+        query = """
+            SELECT
+                COALESCE(SUM(order_count), 0) AS total_orders,
+                SUM(revenue) AS total_revenue,
+                SUM(revenue) / NULLIF(SUM(order_count), 0) AS average_order_value,
+                MAX(highest_order) AS highest_order,
+                MIN(lowest_order) AS lowest_order
+            FROM sales_daily
+            WHERE sale_date >= %s AND sale_date <= %s
+        """
+        # Revenue by category from the per-category daily rollup
+        category_query = """
+            SELECT
+                product_category,
+                SUM(revenue) AS category_revenue
+            FROM category_sales_daily
+            WHERE sale_date >= %s AND sale_date <= %s
+            GROUP BY product_category
+            ORDER BY category_revenue DESC
+        """
+    params = range_params(source, start_date, end_date)
+    cursor.execute(query, params)
+    revenue_data = cursor.fetchone()
+    
+    cursor.execute(category_query, params)
+    category_data = cursor.fetchall()
+    return revenue_data, category_data
+
+
+def fetch_stock_data(cursor):
+    """Return the low stock products as dicts, lowest stock first."""
+    cursor.execute(f"""
+        SELECT
+            product_id,
+            product_name,
+            product_category,
+            stock_quantity,
+            product_price
+        FROM products
+        WHERE stock_quantity < {LOW_STOCK_THRESHOLD}
+        ORDER BY stock_quantity ASC
+    """)
+    return cursor.fetchall()
+
+
+def fetch_report_data(report_type, start_date, end_date, granularity="month"):
+    """Run the queries for one report on a pooled connection and return its data.
+    
+    granularity ("day", "week" or "month") sets the periods of the sales
+    over time report. The low stock report is a snapshot of current stock
+    and ignores the range.
+    """
+    source = plan_source(start_date, end_date)
+    conn = get_connection()
+    # The revenue and stock reports read columns by name
+    cursor = conn.cursor(dictionary=report_type in ("revenue", "stock"))
+    try:
+        if report_type == "sales":
+            return fetch_sales_data(cursor, start_date, end_date, granularity, source)
+        if report_type == "products":
+            return fetch_products_data(cursor, start_date, end_date, source)
+        if report_type == "revenue":
+            return fetch_revenue_data(cursor, start_date, end_date, source)
+        if report_type == "stock":
+            return fetch_stock_data(cursor)
+        raise ValueError(f"Unknown report type: {report_type}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def has_data(report_type, data):
+    """Return whether a report's data has anything to show."""
+    if report_type == "revenue":
+        revenue_data, _ = data
+        return bool(revenue_data) and revenue_data["total_orders"] > 0
+    return bool(data)
+
+
+def report_rows(report_type, data):
+    """Return (header, rows) for writing a report's data as a table."""
+    if report_type == "sales":
+        return ["period", "order_count", "revenue"], [list(row) for row in data]
+    if report_type == "products":
+        return ["product_name", "total_quantity", "total_revenue"], [list(row) for row in data]
+    if report_type == "revenue":
+        revenue_data, category_data = data
+        header = ["metric", "value"]
+        rows = [[key, value] for key, value in revenue_data.items()]
+        rows += [[f"category_revenue:{row['product_category']}", row["category_revenue"]] for row in category_data]
+        return header, rows
+    if report_type == "stock":
+        header = ["product_id", "product_name", "product_category", "stock_quantity", "product_price"]
+        return header, [[row[column] for column in header] for row in data]
+    raise ValueError(f"Unknown report type: {report_type}")
+
+
+def log_reports(cursor, user_id, paths):
+    """Record generated report files in admin_reports with one INSERT. Does not commit."""
+    if not paths:
+        return
+    cursor.executemany(
+        "INSERT INTO admin_reports (user_id, date_generated, path_stored) VALUES (%s, NOW(), %s)",
+        [(user_id, path) for path in paths]
+    )
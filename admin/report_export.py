@@ -0,0 +1,196 @@
+import csv
+import importlib.util
+import os
+from datetime import timedelta
+from functools import lru_cache
+
+from utils import get_connection
+from store_stats import LOW_STOCK_THRESHOLD
+
+# Rows fetched from the server and written per batch; memory use is bounded
+# by one batch however many rows the export has
+EXPORT_CHUNK_SIZE = 10000
+
+# Datasets behind the reports: (columns with their types, query, whether the
+# query takes the date range). Order lines take the range as
+# order_date >= start AND order_date < day after end, and are ordered the
+# way idx_orders_date (order_date, then the order_id primary key) already
+# sorts them, so rows stream without a server-side sort.
+EXPORT_DATASETS = {
+    "order_lines": (
+        [
+            ("order_id", "int"),
+            ("order_date", "datetime"),
+            ("user_id", "int"),
+            ("product_id", "int"),
+            ("product_name", "str"),
+            ("product_category", "str"),
+            ("quantity", "int"),
+            ("sub_total", "decimal"),
+        ],
+        """
+            SELECT o.order_id, o.order_date, o.user_id, od.product_id,
+                   p.product_name, od.product_category, od.quantity, od.sub_total
+            FROM orders o
+            JOIN order_details od ON od.order_id = o.order_id
+            JOIN products p ON p.product_id = od.product_id
+            WHERE o.order_date >= %s AND o.order_date < %s
+            ORDER BY o.order_date, o.order_id
+        """,
+        True,
+    ),
+    "low_stock": (
+        [
+            ("product_id", "int"),
+            ("product_name", "str"),
+            ("product_category", "str"),
+            ("stock_quantity", "int"),
+            ("product_price", "decimal"),
+        ],
+        f"""
+            SELECT product_id, product_name, product_category, stock_quantity, product_price
+            FROM products
+            WHERE stock_quantity < {LOW_STOCK_THRESHOLD}
+            ORDER BY stock_quantity, product_id
+        """,
+        False,
+    ),
+}
+
+# The dataset exported for each report type
+REPORT_DATASETS = {
+    "sales": "order_lines",
+    "products": "order_lines",
+    "revenue": "order_lines",
+    "stock": "low_stock",
+}
+
+
+def load_pyarrow():
+    """Return the pyarrow module, or None when it is not installed."""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+@lru_cache(maxsize=None)
+def export_formats():
+    """Return the file extensions data can be exported to in this environment.
+    
+    Called from the Tk thread, so pyarrow is looked up without importing it
+    and the answer is cached.
+    """
+    if importlib.util.find_spec("pyarrow") is None:
+        return ("csv",)
+    return ("csv", "parquet", "arrow")
+
+
+def stream_rows(cursor, query, params, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield lists of up to chunk_size rows as the server sends them.
+    
+    The cursor must be unbuffered, so rows stay on the server side of the
+    connection until they are fetched instead of being read into memory at
+    execute time.
+    """
+    cursor.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
+
+
+def write_csv(path, columns, chunks):
+    row_count = 0
+    with open(path, "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow([name for name, _ in columns])
+        for rows in chunks:
+            writer.writerows(rows)
+            row_count += len(rows)
+    return row_count
+
+
+def arrow_schema(pa, columns):
+    types = {
+        "int": pa.int64(),
+        "str": pa.string(),
+        "decimal": pa.decimal128(14, 2),
+        "datetime": pa.timestamp("us"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def write_columnar(pa, path, columns, chunks, file_format):
+    """Write chunks as Parquet row groups or Arrow IPC record batches."""
+    schema = arrow_schema(pa, columns)
+    if file_format == "parquet":
+        writer = pa.parquet.ParquetWriter(path, schema)
+        write = writer.write_table
+    else:
+        writer = pa.ipc.new_file(path, schema)
+        write = writer.write
+    
+    row_count = 0
+    try:
+        for rows in chunks:
+            # Rows to columns, one chunk at a time
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            write(pa.Table.from_arrays(arrays, schema=schema))
+            row_count += len(rows)
+    finally:
+        writer.close()
+    return row_count
+
+
+def export_report_data(report_type, start_date, end_date, path, chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream the data behind a report to path and return the number of rows written.
+    
+    The format follows the file extension: .csv always, .parquet and .arrow
+    when pyarrow is installed. The low stock data is a snapshot and ignores
+    the range. Rows are written to a temporary file next to path, which
+    replaces path only once the export is complete, so a failed export
+    never leaves a truncated file behind.
+    """
+    file_format = os.path.splitext(path)[1].lstrip(".").lower()
+    if file_format not in ("csv", "parquet", "arrow"):
+        raise ValueError(f"Unsupported export format: {path}")
+    pa = None
+    if file_format != "csv":
+        pa = load_pyarrow()
+        if pa is None:
+            raise ValueError(f"Exporting .{file_format} files requires pyarrow")
+    
+    columns, query, takes_range = EXPORT_DATASETS[REPORT_DATASETS[report_type]]
+    params = (start_date, end_date + timedelta(days=1)) if takes_range else ()
+    
+    directory, file_name = os.path.split(os.path.abspath(path))
+    temp_path = os.path.join(directory, f".{file_name}.part")
+    
+    conn = get_connection()
+    # Unbuffered, so the result set is read from the socket chunk by chunk
+    cursor = conn.cursor(buffered=False)
+    try:
+        chunks = stream_rows(cursor, query, params, chunk_size)
+        if file_format == "csv":
+            row_count = write_csv(temp_path, columns, chunks)
+        else:
+            row_count = write_columnar(pa, temp_path, columns, chunks, file_format)
+        os.replace(temp_path, path)
+        return row_count
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        try:
+            # A failed write leaves unread rows on the socket; drop them so
+            # closing the cursor doesn't raise over the original error
+            conn.consume_results()
+            cursor.close()
+        finally:
+            conn.close()
@@ -0,0 +1,158 @@
+from matplotlib.figure import Figure
+
+# Figures are built with the object-oriented API rather than pyplot, so they
+# carry no global state and render with whichever canvas displays or saves
+# them: FigureCanvasTkAgg in the GUI, Agg in batch jobs.
+
+
+def sales_figure(data, granularity="month"):
+    """Return a figure of order count and revenue per day, week or month."""
+    # Extract data
+    periods = [item[0] for item in data]
+    order_counts = [item[1] for item in data]
+    revenue = [float(item[2]) for item in data]
+    
+    # Create figure
+    fig = Figure(figsize=(8, 5), dpi=100)
+    ax1 = fig.add_subplot()
+    
+    # Plot order count
+    ax1.set_xlabel(granularity.capitalize())
+    ax1.set_ylabel('Order Count', color='tab:blue')
+    ax1.bar(periods, order_counts, color='tab:blue', alpha=0.7, label='Order Count')
+    ax1.tick_params(axis='y', labelcolor='tab:blue')
+    
+    # Create second y-axis for revenue
+    ax2 = ax1.twinx()
+    ax2.set_ylabel('Revenue ($)', color='tab:red')
+    ax2.plot(periods, revenue, color='tab:red', marker='o', linestyle='-', linewidth=2, label='Revenue')
+    ax2.tick_params(axis='y', labelcolor='tab:red')
+    
+    # Format x-axis labels for better readability
+    ax1.tick_params(axis='x', labelrotation=45)
+    
+    # Add title and grid
+    ax1.set_title('Sales and Revenue Over Time')
+    ax1.grid(True, alpha=0.3)
+    
+    # Add legend
+    lines1, labels1 = ax1.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
+    
+    # Tight layout to ensure everything fits
+    fig.tight_layout()
+    return fig
+
+
+def products_figure(data):
+    """Return a horizontal bar chart of the top products by quantity sold."""
+    # Extract data
+    products = [item[0] for item in data]
+    quantities = [item[1] for item in data]
+    
+    # Create figure
+    fig = Figure(figsize=(8, 5), dpi=100)
+    ax = fig.add_subplot()
+    
+    # Create horizontal bar chart
+    y_pos = range(len(products))
+    ax.barh(y_pos, quantities, align='center', color='tab:blue', alpha=0.7)
+    ax.set_yticks(y_pos)
+    ax.set_yticklabels(products)
+    ax.invert_yaxis()  # Labels read top-to-bottom
+    
+    # Add labels and title
+    ax.set_xlabel('Quantity Sold')
+    ax.set_title('Top Products by Quantity Sold')
+    
+    # Add quantity values at the end of each bar
+    for i, v in enumerate(quantities):
+        ax.text(v + 0.5, i, str(v), va='center')
+    
+    # Tight layout to ensure everything fits
+    fig.tight_layout()
+    return fig
+
+
+def category_revenue_figure(category_data):
+    """Return a pie chart of revenue by category."""
+    # Extract data
+    categories = [item["product_category"] for item in category_data]
+    revenues = [float(item["category_revenue"]) for item in category_data]
+    
+    # Create figure
+    fig = Figure(figsize=(6, 4), dpi=100)
+    ax = fig.add_subplot()
+    
+    # Create pie chart
+    ax.pie(
+        revenues,
+        labels=categories,
+        autopct='%1.1f%%',
+        startangle=90,
+        shadow=False
+    )
+    
+    # Equal aspect ratio ensures that pie is drawn as a circle
+    ax.axis('equal')
+    
+    # Add title
+    ax.set_title('Revenue by Category')
+    return fig
+
+
+def low_stock_figure(data):
+    """Return a bar chart of the ten lowest stock items."""
+    # Extract data (limit to top 10 lowest stock items)
+    sorted_data = sorted(data, key=lambda x: x["stock_quantity"])[:10]
+    products = [item["product_name"] for item in sorted_data]
+    stock_levels = [item["stock_quantity"] for item in sorted_data]
+    
+    # Create figure
+    fig = Figure(figsize=(8, 4), dpi=100)
+    ax = fig.add_subplot()
+    
+    # Create horizontal bar chart
+    y_pos = range(len(products))
+    bars = ax.barh(y_pos, stock_levels, align='center')
+    
+    # Color bars based on stock level
+    for i, bar in enumerate(bars):
+        if stock_levels[i] < 5:
+            bar.set_color('#f44336')  # Red for very low stock
+        else:
+            bar.set_color('#ff9800')  # Orange for low stock
+    
+    ax.set_yticks(y_pos)
+    ax.set_yticklabels(products)
+    ax.invert_yaxis()  # Labels read top-to-bottom
+    
+    # Add labels and title
+    ax.set_xlabel('Stock Quantity')
+    ax.set_title('Lowest Stock Items')
+    
+    # Add stock values at the end of each bar
+    for i, v in enumerate(stock_levels):
+        ax.text(v + 0.1, i, str(v), va='center')
+    
+    # Set x-axis limit for better visibility
+    ax.set_xlim(0, max(stock_levels) + 2)
+    
+    # Tight layout to ensure everything fits
+    fig.tight_layout()
+    return fig
+
+
+def report_figure(report_type, data, granularity="month"):
+    """Return the figure for a report's data, or None if it has no chart."""
+    if report_type == "sales":
+        return sales_figure(data, granularity)
+    if report_type == "products":
+        return products_figure(data)
+    if report_type == "revenue":
+        _, category_data = data
+        return category_revenue_figure(category_data) if category_data else None
+    if report_type == "stock":
+        return low_stock_figure(data)
+    raise ValueError(f"Unknown report type: {report_type}")
@@ -1,11 +1,15 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox, filedialog
-from utils import connect_to_database, format_currency, center_window
+from utils import get_connection, format_currency, center_window
+from background import background_tasks
+from admin.report_cache import report_cache, ReportEntry
+from admin.report_data import REPORT_NAMES, GRANULARITIES, default_range, fetch_report_data, log_reports
+from admin.report_export import export_formats, export_report_data
 import mysql.connector
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from datetime import datetime
+from PIL import Image
+import io
 import os
 
 
@@ -22,12 +26,37 @@ class ReportsFrame(ctk.CTkFrame):
         # Title
         self.title_label = ctk.CTkLabel(
             self.title_frame,
-            text="Reports - Last 3 Months",
+            text="Reports",
             font=("Arial", 24, "bold"),
             text_color="#1a73e8"
         )
         self.title_label.pack(side="left", padx=30, pady=15)
         
+        # Report period: an inclusive date range and how the sales chart groups it
+        start_date, end_date = default_range()
+        self.range_frame = ctk.CTkFrame(self.title_frame, fg_color="transparent")
+        self.range_frame.pack(side="right", padx=30, pady=15)
+        
+        ctk.CTkLabel(self.range_frame, text="From", font=("Arial", 14), text_color="#333").pack(side="left", padx=(0, 5))
+        self.start_entry = ctk.CTkEntry(self.range_frame, width=110, height=32, corner_radius=8)
+        self.start_entry.insert(0, start_date.isoformat())
+        self.start_entry.pack(side="left", padx=(0, 10))
+        
+        ctk.CTkLabel(self.range_frame, text="To", font=("Arial", 14), text_color="#333").pack(side="left", padx=(0, 5))
+        self.end_entry = ctk.CTkEntry(self.range_frame, width=110, height=32, corner_radius=8)
+        self.end_entry.insert(0, end_date.isoformat())
+        self.end_entry.pack(side="left", padx=(0, 10))
+        
+        self.granularity_var = ctk.StringVar(value="month")
+        self.granularity_menu = ctk.CTkOptionMenu(
+            self.range_frame,
+            values=list(GRANULARITIES),
+            variable=self.granularity_var,
+            width=100,
+            height=32
+        )
+        self.granularity_menu.pack(side="left")
+        
         # Main content frame with report types on left and display area on right
         self.content_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.content_frame.pack(fill="both", expand=True, padx=20, pady=10)
@@ -114,7 +143,20 @@ class ReportsFrame(ctk.CTkFrame):
             fg_color="#4CAF50",
             hover_color="#388E3C"
         )
-        self.export_btn.pack(padx=20, pady=(30, 20))
+        self.export_btn.pack(padx=20, pady=(30, 10))
+        
+        # Export the data behind the current report
+        self.export_data_btn = ctk.CTkButton(
+            self.report_types_frame,
+            text="Export Report Data",
+            command=self.export_data,
+            width=180,
+            height=40,
+            corner_radius=8,
+            fg_color="#4CAF50",
+            hover_color="#388E3C"
+        )
+        self.export_data_btn.pack(padx=20, pady=(0, 20))
         
         # Report display frame (right)
         self.report_display_frame = ctk.CTkFrame(self.content_frame, fg_color="white", corner_radius=10)
@@ -139,245 +181,129 @@ class ReportsFrame(ctk.CTkFrame):
         
         # Instance variables
         self.current_report_type = None
+        self.current_entry = None
+        self.current_period_text = None
+        self.current_granularity = None
         self.current_figure = None
         self.canvas = None
     
+    def selected_period(self):
+        """Return (start_date, end_date, granularity) from the period controls, or None if invalid."""
+        try:
+            start_date = datetime.strptime(self.start_entry.get().strip(), "%Y-%m-%d").date()
+            end_date = datetime.strptime(self.end_entry.get().strip(), "%Y-%m-%d").date()
+        except ValueError:
+            messagebox.showerror("Invalid Dates", "Enter the report dates as YYYY-MM-DD.")
+            return None
+        if end_date < start_date:
+            messagebox.showerror("Invalid Dates", "The end date must not be before the start date.")
+            return None
+        return start_date, end_date, self.granularity_var.get()
+    
     def generate_report(self, report_type):
-        """Generate and display the selected report type."""
+        """Generate the selected report type in the background and display it."""
+        period = self.selected_period()
+        if period is None:
+            return
         self.current_report_type = report_type
         
+        # A report still loading for an earlier selection is stale
+        background_tasks.cancel_group(self)
+        
         # Clear current display
         for widget in self.report_display_frame.winfo_children():
             widget.destroy()
         
-        # Generate the report based on type
-        try:
-            if report_type == "sales":
-                self.generate_sales_report()
-            elif report_type == "products":
-                self.generate_products_report()
-            elif report_type == "revenue":
-                self.generate_revenue_report()
-            elif report_type == "stock":
-                self.generate_stock_report()
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            error_label = ctk.CTkLabel(
-                self.report_display_frame,
-                text=f"Error generating report: {err}",
-                font=("Arial", 14),
-                text_color="red",
-                wraplength=500
-            )
-            error_label.pack(pady=100)
+        loading_label = ctk.CTkLabel(
+            self.report_display_frame,
+            text="Generating report...",
+            font=("Arial", 14),
+            text_color="#555"
+        )
+        loading_label.pack(pady=100)
+        
+        background_tasks.submit(
+            self,
+            self.fetch_report,
+            report_type,
+            *period,
+            on_success=lambda entry: self.display_report(report_type, entry),
+            on_error=self.display_report_error
+        )
     
-    def generate_sales_report(self):
-        """Generate and display the sales over time report."""
+    def fetch_report(self, report_type, start_date, end_date, granularity):
+        """Return the cached report entry, or fetch its data on a miss; runs on a worker thread."""
+        key = (report_type, start_date, end_date, granularity)
+        
+        conn = get_connection()
+        cursor = conn.cursor()
         try:
-            conn = connect_to_database()
-            cursor = conn.cursor()
-            
-            # Date 3 months ago
-            three_months_ago = datetime.now() - timedelta(days=90)
-            
-            # Query to get sales data grouped by month
-            query = """
-                SELECT 
-                    DATE_FORMAT(order_date, '%Y-%m') AS month,
-                    COUNT(order_id) AS order_count,
-                    SUM(total_price) AS revenue
-                FROM orders
-                WHERE order_date >= %s
-                GROUP BY month
-                ORDER BY month
-            """
-            
-            cursor.execute(query, (three_months_ago,))
-            sales_data = cursor.fetchall()
-            
+            stamp = report_cache.current_stamp(cursor)
+        finally:
             cursor.close()
             conn.close()
-            
-            if not sales_data:
-                self.display_no_data_message("No sales data available for the last 3 months.")
-                return
-            
-            # Create and display the plot
-            self.create_sales_plot(sales_data)
-            
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            self.display_error_message(f"Database error: {err}")
+        
+        entry = report_cache.get(key, stamp)
+        if entry is not None:
+            return entry
+        
+        return ReportEntry(key, stamp, fetch_report_data(report_type, start_date, end_date, granularity))
     
-    def generate_products_report(self):
-        """Generate and display the top products report."""
-        try:
-            conn = connect_to_database()
-            cursor = conn.cursor()
-            
-            # Date 3 months ago
-            three_months_ago = datetime.now() - timedelta(days=90)
-            
-            # Query to get top products by quantity sold
-            query = """
-                SELECT 
-                    p.product_name,
-                    SUM(od.quantity) AS total_quantity,
-                    SUM(od.sub_total) AS total_revenue
-                FROM order_details od
-                JOIN products p ON od.product_id = p.product_id
-                JOIN orders o ON od.order_id = o.order_id
-                WHERE o.order_date >= %s
-                GROUP BY p.product_id
-                ORDER BY total_quantity DESC
-                LIMIT 10
-            """
-            
-            cursor.execute(query, (three_months_ago,))
-            product_data = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
-            
-            if not product_data:
-                self.display_no_data_message("No product sales data available for the last 3 months.")
-                return
-            
-            # Create and display the plot
-            self.create_products_plot(product_data)
-            
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            self.display_error_message(f"Database error: {err}")
+    def display_report(self, report_type, entry):
+        """Replace the loading state with the fetched report."""
+        for widget in self.report_display_frame.winfo_children():
+            widget.destroy()
+        
+        self.current_entry = entry
+        self.current_figure = None
+        self.canvas = None
+        _, start_date, end_date, granularity = entry.key
+        self.current_period_text = f"{start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}"
+        self.current_granularity = granularity
+        self.render_report(report_type, entry.data)
+        
+        # Cached once drawn, so a repeat request skips both the query and matplotlib
+        report_cache.put(entry)
     
-    def generate_revenue_report(self):
-        """Generate and display the revenue summary report."""
-        try:
-            conn = connect_to_database()
-            cursor = conn.cursor(dictionary=True)
-            
-            # Date 3 months ago
-            three_months_ago = datetime.now() - timedelta(days=90)
-            
-            # Query to get revenue stats
-            query = """
-                SELECT 
-                    COUNT(order_id) AS total_orders,
-                    SUM(total_price) AS total_revenue,
-                    AVG(total_price) AS average_order_value,
-                    MAX(total_price) AS highest_order,
-                    MIN(total_price) AS lowest_order
-                FROM orders
-                WHERE order_date >= %s
-            """
-            
-            cursor.execute(query, (three_months_ago,))
-            revenue_data = cursor.fetchone()
-            
-            # Get revenue by category
-            category_query = """
-                SELECT 
-                    p.product_category,
-                    SUM(od.sub_total) AS category_revenue
-                FROM order_details od
-                JOIN products p ON od.product_id = p.product_id
-                JOIN orders o ON od.order_id = o.order_id
-                WHERE o.order_date >= %s
-                GROUP BY p.product_category
-                ORDER BY category_revenue DESC
-            """
-            
-            cursor.execute(category_query, (three_months_ago,))
-            category_data = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
-            
+    def render_report(self, report_type, data):
+        """Draw the report for the fetched data."""
+        if report_type == "sales":
+            if not data:
+                self.display_no_data_message(f"No sales data available for {self.current_period_text}.")
+                return
+            self.create_sales_plot(data)
+        elif report_type == "products":
+            if not data:
+                self.display_no_data_message(f"No product sales data available for {self.current_period_text}.")
+                return
+            self.create_products_plot(data)
+        elif report_type == "revenue":
+            revenue_data, category_data = data
             if not revenue_data or revenue_data["total_orders"] == 0:
-                self.display_no_data_message("No revenue data available for the last 3 months.")
+                self.display_no_data_message(f"No revenue data available for {self.current_period_text}.")
                 return
-            
-            # Display the revenue summary
             self.display_revenue_summary(revenue_data, category_data)
-            
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            self.display_error_message(f"Database error: {err}")
-    
-    def generate_stock_report(self):
-        """Generate and display the low stock items report."""
-        try:
-            conn = connect_to_database()
-            cursor = conn.cursor(dictionary=True)
-            
-            # Query to get low stock items (less than 10 units)
-            query = """
-                SELECT 
-                    product_id,
-                    product_name,
-                    product_category,
-                    stock_quantity,
-                    product_price
-                FROM products
-                WHERE stock_quantity < 10
-                ORDER BY stock_quantity ASC
-            """
-            
-            cursor.execute(query)
-            stock_data = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
-            
-            if not stock_data:
+        elif report_type == "stock":
+            if not data:
                 self.display_no_data_message("No low stock items found.")
                 return
-            
-            # Display the low stock items
-            self.display_low_stock_items(stock_data)
-            
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            self.display_error_message(f"Database error: {err}")
+            self.display_low_stock_items(data)
+    
+    def display_report_error(self, err):
+        """Show a failed report in place of the loading state."""
+        for widget in self.report_display_frame.winfo_children():
+            widget.destroy()
+        
+        print(f"Database error: {err}")
+        self.display_error_message(f"Database error: {err}")
     
     def create_sales_plot(self, data):
         """Create and display a plot showing sales over time."""
-        # Extract data
-        months = [item[0] for item in data]
-        order_counts = [item[1] for item in data]
-        revenue = [float(item[2]) for item in data]
-        
-        # Create figure
-        fig, ax1 = plt.subplots(figsize=(8, 5), dpi=100)
-        
-        # Plot order count
-        ax1.set_xlabel('Month')
-        ax1.set_ylabel('Order Count', color='tab:blue')
-        ax1.bar(months, order_counts, color='tab:blue', alpha=0.7, label='Order Count')
-        ax1.tick_params(axis='y', labelcolor='tab:blue')
-        
-        # Create second y-axis for revenue
-        ax2 = ax1.twinx()
-        ax2.set_ylabel('Revenue ($)', color='tab:red')
-        ax2.plot(months, revenue, color='tab:red', marker='o', linestyle='-', linewidth=2, label='Revenue')
-        ax2.tick_params(axis='y', labelcolor='tab:red')
-        
-        # Format x-axis labels for better readability
-        plt.xticks(rotation=45)
-        
-        # Add title and grid
-        plt.title('Sales and Revenue Over Time')
-        ax1.grid(True, alpha=0.3)
-        
-        # Add legend
-        lines1, labels1 = ax1.get_legend_handles_labels()
-        lines2, labels2 = ax2.get_legend_handles_labels()
-        ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
-        
-        # Tight layout to ensure everything fits
-        fig.tight_layout()
-        
-        # Display the plot
+        if self.display_cached_figure():
+            return
+        
+        from admin.report_plots import sales_figure
+        fig = sales_figure(data, self.current_granularity)
         self.display_matplotlib_figure(fig)
         
         # Store figure for exporting
@@ -385,33 +311,11 @@ class ReportsFrame(ctk.CTkFrame):
     
     def create_products_plot(self, data):
         """Create and display a plot showing top products."""
-        # Extract data
-        products = [item[0] for item in data]
-        quantities = [item[1] for item in data]
-        revenues = [float(item[2]) for item in data]
-        
-        # Create figure
-        fig, ax = plt.subplots(figsize=(8, 5), dpi=100)
-        
-        # Create horizontal bar chart
-        y_pos = range(len(products))
-        ax.barh(y_pos, quantities, align='center', color='tab:blue', alpha=0.7)
-        ax.set_yticks(y_pos)
-        ax.set_yticklabels(products)
-        ax.invert_yaxis()  # Labels read top-to-bottom
-        
-        # Add labels and title
-        ax.set_xlabel('Quantity Sold')
-        ax.set_title('Top Products by Quantity Sold')
-        
-        # Add quantity values at the end of each bar
-        for i, v in enumerate(quantities):
-            ax.text(v + 0.5, i, str(v), va='center')
-        
-        # Tight layout to ensure everything fits
-        fig.tight_layout()
+        if self.display_cached_figure():
+            return
         
-        # Display the plot
+        from admin.report_plots import products_figure
+        fig = products_figure(data)
         self.display_matplotlib_figure(fig)
         
         # Store figure for exporting
@@ -424,19 +328,43 @@ class ReportsFrame(ctk.CTkFrame):
             self.canvas.get_tk_widget().destroy()
         
         # Create a canvas widget to display the figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
         canvas = FigureCanvasTkAgg(figure, master=self.report_display_frame)
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
         # Store the canvas reference
         self.canvas = canvas
+        
+        # Keep the rendered figure with the report for the cache
+        if self.current_entry is not None:
+            buffer = io.BytesIO()
+            figure.savefig(buffer, format="png", dpi=figure.dpi)
+            self.current_entry.figure = figure
+            self.current_entry.figure_png = buffer.getvalue()
+    
+    def display_cached_figure(self):
+        """Show the current report's cached figure image. Returns False if it has none."""
+        entry = self.current_entry
+        if entry is None or entry.figure_png is None:
+            return False
+        
+        image = Image.open(io.BytesIO(entry.figure_png))
+        photo = ctk.CTkImage(light_image=image, size=image.size)
+        image_label = ctk.CTkLabel(self.report_display_frame, image=photo, text="")
+        image_label.image = photo  # Keep a reference
+        image_label.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        # The figure itself is kept for exporting at full resolution
+        self.current_figure = entry.figure
+        return True
     
     def display_revenue_summary(self, revenue_data, category_data):
         """Display the revenue summary report."""
         # Create title
         title_label = ctk.CTkLabel(
             self.report_display_frame,
-            text="Revenue Summary - Last 3 Months",
+            text=f"Revenue Summary - {self.current_period_text}",
             font=("Arial", 18, "bold"),
             text_color="#1a73e8"
         )
@@ -543,30 +471,9 @@ class ReportsFrame(ctk.CTkFrame):
         lowest_order_value.grid(row=4, column=1, padx=20, pady=10, sticky="w")
         
         # If we have category data, create a pie chart
-        if category_data:
-            # Extract data
-            categories = [item["product_category"] for item in category_data]
-            revenues = [float(item["category_revenue"]) for item in category_data]
-            
-            # Create figure
-            fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
-            
-            # Create pie chart
-            wedges, texts, autotexts = ax.pie(
-                revenues, 
-                labels=categories, 
-                autopct='%1.1f%%',
-                startangle=90,
-                shadow=False
-            )
-            
-            # Equal aspect ratio ensures that pie is drawn as a circle
-            ax.axis('equal')
-            
-            # Add title
-            plt.title('Revenue by Category')
-            
-            # Display the plot
+        if category_data and not self.display_cached_figure():
+            from admin.report_plots import category_revenue_figure
+            fig = category_revenue_figure(category_data)
             self.display_matplotlib_figure(fig)
             
             # Store figure for exporting
@@ -687,44 +594,11 @@ class ReportsFrame(ctk.CTkFrame):
     
     def create_low_stock_plot(self, data):
         """Create and display a bar chart of low stock items."""
-        # Extract data (limit to top 10 lowest stock items)
-        sorted_data = sorted(data, key=lambda x: x["stock_quantity"])[:10]
-        products = [item["product_name"] for item in sorted_data]
-        stock_levels = [item["stock_quantity"] for item in sorted_data]
-        
-        # Create figure
-        fig, ax = plt.subplots(figsize=(8, 4), dpi=100)
-        
-        # Create horizontal bar chart
-        y_pos = range(len(products))
-        bars = ax.barh(y_pos, stock_levels, align='center')
-        
-        # Color bars based on stock level
-        for i, bar in enumerate(bars):
-            if stock_levels[i] < 5:
-                bar.set_color('#f44336')  # Red for very low stock
-            else:
-                bar.set_color('#ff9800')  # Orange for low stock
-        
-        ax.set_yticks(y_pos)
-        ax.set_yticklabels(products)
-        ax.invert_yaxis()  # Labels read top-to-bottom
-        
-        # Add labels and title
-        ax.set_xlabel('Stock Quantity')
-        ax.set_title('Lowest Stock Items')
-        
-        # Add stock values at the end of each bar
-        for i, v in enumerate(stock_levels):
-            ax.text(v + 0.1, i, str(v), va='center')
-        
-        # Set x-axis limit for better visibility
-        ax.set_xlim(0, max(stock_levels) + 2)
-        
-        # Tight layout to ensure everything fits
-        fig.tight_layout()
+        if self.display_cached_figure():
+            return
         
-        # Display the plot
+        from admin.report_plots import low_stock_figure
+        fig = low_stock_figure(data)
         self.display_matplotlib_figure(fig)
         
         # Store figure for exporting
@@ -781,12 +655,7 @@ class ReportsFrame(ctk.CTkFrame):
         os.makedirs("reports", exist_ok=True)
         
         # Generate a filename based on report type and date
-        report_name = {
-            "sales": "Sales_Report",
-            "products": "Top_Products_Report",
-            "revenue": "Revenue_Summary",
-            "stock": "Low_Stock_Report"
-        }.get(self.current_report_type, "Report")
+        report_name = REPORT_NAMES.get(self.current_report_type, "Report")
         
         today = datetime.now().strftime("%Y-%m-%d")
         default_filename = f"{report_name}_{today}.png"
@@ -814,17 +683,60 @@ class ReportsFrame(ctk.CTkFrame):
             print(f"Error exporting report: {e}")
             messagebox.showerror("Export Error", f"Failed to export report: {e}")
     
+    def export_data(self):
+        """Stream the data behind the current report to a CSV, Parquet or Arrow file."""
+        if self.current_entry is None:
+            messagebox.showinfo("No Report", "Please generate a report first before exporting.")
+            return
+        
+        report_type, start_date, end_date, _ = self.current_entry.key
+        os.makedirs("reports", exist_ok=True)
+        
+        report_name = REPORT_NAMES.get(report_type, "Report")
+        default_filename = f"{report_name}_Data_{start_date:%Y-%m-%d}_{end_date:%Y-%m-%d}.csv"
+        
+        descriptions = {"csv": "CSV files", "parquet": "Parquet files", "arrow": "Arrow files"}
+        file_path = filedialog.asksaveasfilename(
+            initialdir="reports",
+            initialfile=default_filename,
+            defaultextension=".csv",
+            filetypes=[(descriptions[ext], f"*.{ext}") for ext in export_formats()]
+        )
+        
+        if not file_path:
+            return  # User cancelled
+        
+        def done(row_count):
+            self.export_data_btn.configure(text="Export Report Data", state="normal")
+            messagebox.showinfo("Export Successful", f"{row_count} rows exported to {file_path}")
+            self.log_report_export(file_path)
+        
+        def failed(err):
+            self.export_data_btn.configure(text="Export Report Data", state="normal")
+            print(f"Error exporting report data: {err}")
+            messagebox.showerror("Export Error", f"Failed to export report data: {err}")
+        
+        # Large exports take a while; they stream in the background
+        self.export_data_btn.configure(text="Exporting...", state="disabled")
+        background_tasks.submit(
+            self.export_data_btn,
+            export_report_data,
+            report_type,
+            start_date,
+            end_date,
+            file_path,
+            on_success=done,
+            on_error=failed
+        )
+    
     def log_report_export(self, file_path):
         """Log the report export in the database."""
         try:
-            conn = connect_to_database()
+            conn = get_connection()
             cursor = conn.cursor()
             
             # Insert the report record
-            cursor.execute(
-                "INSERT INTO admin_reports (user_id, date_generated, path_stored) VALUES (%s, NOW(), %s)",
-                (self.master.user_id, file_path)
-            )
+            log_reports(cursor, self.master.user_id, [file_path])
             
             conn.commit()
             cursor.close()
@@ -1,8 +1,9 @@
 import customtkinter as ctk
 from tkinter import ttk, messagebox
-from utils import connect_to_database, center_window
+from utils import get_connection, center_window
+from background import background_tasks, password_tasks
+from passwords import hash_password
 import mysql.connector
-import bcrypt
 import re
 
 
@@ -100,39 +101,51 @@ class UserManagementFrame(ctk.CTkFrame):
         self.user_tree.bind("<Double-1>", self.edit_selected_user)  # Double-click
     
     def load_users(self):
-        """Load users from database and display them in the Treeview."""
-        # Clear existing rows
-        for row in self.user_tree.get_children():
-            self.user_tree.delete(row)
-        
+        """Load users from database in the background and display them in the Treeview."""
+        background_tasks.cancel_group(self)
+        background_tasks.submit(
+            self,
+            self.fetch_users,
+            on_success=self.display_users,
+            on_error=self.display_load_error
+        )
+    
+    def fetch_users(self):
+        """Return all users; runs on a worker thread."""
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
         try:
-            conn = connect_to_database()
-            cursor = conn.cursor(dictionary=True)
-            
             # Get all users
             cursor.execute("SELECT user_id, first_name, last_name, email, user_role FROM users ORDER BY user_id")
-            users = cursor.fetchall()
-            
+            return cursor.fetchall()
+        finally:
             cursor.close()
             conn.close()
-            
-            # Add users to the Treeview
-            for user in users:
-                self.user_tree.insert(
-                    "",
-                    "end",
-                    values=(
-                        user["user_id"],
-                        user["first_name"],
-                        user["last_name"],
-                        user["email"],
-                        user["user_role"]
-                    )
+    
+    def display_users(self, users):
+        """Replace the Treeview rows with the loaded users."""
+        # Clear existing rows
+        for row in self.user_tree.get_children():
+            self.user_tree.delete(row)
+        
+        # Add users to the Treeview
+        for user in users:
+            self.user_tree.insert(
+                "",
+                "end",
+                values=(
+                    user["user_id"],
+                    user["first_name"],
+                    user["last_name"],
+                    user["email"],
+                    user["user_role"]
                 )
-            
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            messagebox.showerror("Database Error", f"Failed to load users: {err}")
+            )
+    
+    def display_load_error(self, err):
+        """Report a failed user load."""
+        print(f"Database error: {err}")
+        messagebox.showerror("Database Error", f"Failed to load users: {err}")
     
     def open_add_user_window(self):
         """Open a new window for adding a user."""
@@ -266,32 +279,13 @@ class UserManagementFrame(ctk.CTkFrame):
                 error_label.configure(text="Password must be at least 8 characters long")
                 return
             
-            try:
-                conn = connect_to_database()
-                cursor = conn.cursor()
-                
-                # Check if email already exists
-                cursor.execute("SELECT user_id FROM users WHERE email = %s", (email,))
-                if cursor.fetchone():
-                    error_label.configure(text="Email already exists")
-                    cursor.close()
-                    conn.close()
+            def on_saved(result):
+                success, message = result
+                if not success:
+                    save_button.configure(state="normal")
+                    error_label.configure(text=message)
                     return
                 
-                # Hash the password
-                hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-                
-                # Insert the new user
-                cursor.execute(
-                    "INSERT INTO users (first_name, last_name, email, password, user_role, date_registered) "
-                    "VALUES (%s, %s, %s, %s, %s, NOW())",
-                    (first_name, last_name, email, hashed_password, role)
-                )
-                
-                conn.commit()
-                cursor.close()
-                conn.close()
-                
                 # Reload users
                 self.load_users()
                 
@@ -300,10 +294,19 @@ class UserManagementFrame(ctk.CTkFrame):
                 
                 # Show success message
                 messagebox.showinfo("Success", "User added successfully")
-                
-            except mysql.connector.Error as err:
-                print(f"Database error: {err}")
-                error_label.configure(text=f"Error: {err}")
+            
+            # Hashing runs on the password workers so the dialog stays responsive
+            save_button.configure(state="disabled")
+            password_tasks.submit(
+                save_button,
+                self.create_user,
+                first_name,
+                last_name,
+                email,
+                password,
+                role,
+                on_success=on_saved
+            )
         
         save_button = ctk.CTkButton(
             form_frame,
@@ -317,8 +320,42 @@ class UserManagementFrame(ctk.CTkFrame):
         )
         save_button.pack(pady=(0, 20))
     
+    def create_user(self, first_name, last_name, email, password, role):
+        """Insert a new user with a hashed password; runs on a password worker thread.
+        
+        Returns (success, message).
+        """
+        # Hashed before a pooled connection is checked out
+        hashed_password = hash_password(password)
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            
+            # Check if email already exists
+            cursor.execute("SELECT user_id FROM users WHERE email = %s", (email,))
+            if cursor.fetchone():
+                cursor.close()
+                conn.close()
+                return False, "Email already exists"
+            
+            # Insert the new user
+            cursor.execute(
+                "INSERT INTO users (first_name, last_name, email, password, user_role, date_registered) "
+                "VALUES (%s, %s, %s, %s, %s, NOW())",
+                (first_name, last_name, email, hashed_password, role)
+            )
+            
+            conn.commit()
+            cursor.close()
+            conn.close()
+            return True, "User added successfully"
+            
+        except mysql.connector.Error as err:
+            print(f"Database error: {err}")
+            return False, f"Error: {err}"
+    
     def edit_selected_user(self, event=None):
-        """Open a window to edit the selected user."""
+        """Load the selected user in the background and open a window to edit them."""
         selected = self.user_tree.selection()
         if not selected:
             messagebox.showinfo("Selection Required", "Please select a user to edit")
@@ -327,189 +364,227 @@ class UserManagementFrame(ctk.CTkFrame):
         # Get the selected user's information
         user_id = self.user_tree.item(selected, "values")[0]
         
+        def on_loaded(user):
+            if not user:
+                messagebox.showerror("Error", "User not found")
+                return
+            self.open_edit_window(user_id, user)
+        
+        def on_error(err):
+            print(f"Database error: {err}")
+            messagebox.showerror("Database Error", f"Error: {err}")
+        
+        background_tasks.submit(
+            self.user_tree,
+            self.fetch_user,
+            user_id,
+            on_success=on_loaded,
+            on_error=on_error
+        )
+    
+    def fetch_user(self, user_id):
+        """Return one user's row; runs on a worker thread."""
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
         try:
-            conn = connect_to_database()
-            cursor = conn.cursor(dictionary=True)
-            
             cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
-            user = cursor.fetchone()
-            
+            return cursor.fetchone()
+        finally:
             cursor.close()
             conn.close()
+    
+    def open_edit_window(self, user_id, user):
+        """Open a window to edit a loaded user."""
+        # Create edit window
+        edit_window = ctk.CTkToplevel(self)
+        edit_window.title("Edit User")
+        edit_window.geometry("400x450")
+        edit_window.resizable(False, False)
+        center_window(edit_window, width=400, height=450)
+        
+        # Set this window as modal
+        edit_window.grab_set()
+        
+        # Form container
+        form_frame = ctk.CTkFrame(edit_window, fg_color="white")
+        form_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Title
+        title_label = ctk.CTkLabel(
+            form_frame,
+            text="Edit User",
+            font=("Arial", 18, "bold"),
+            text_color="#1a73e8"
+        )
+        title_label.pack(pady=(20, 30))
+        
+        # First Name
+        first_name_label = ctk.CTkLabel(form_frame, text="First Name:", font=("Arial", 14))
+        first_name_label.pack(anchor="w", padx=20, pady=(0, 5))
+        
+        first_name_entry = ctk.CTkEntry(
+            form_frame,
+            placeholder_text="Enter first name",
+            width=340,
+            height=35,
+            border_width=1,
+            corner_radius=8
+        )
+        first_name_entry.insert(0, user["first_name"])
+        first_name_entry.pack(padx=20, pady=(0, 15))
+        
+        # Last Name
+        last_name_label = ctk.CTkLabel(form_frame, text="Last Name:", font=("Arial", 14))
+        last_name_label.pack(anchor="w", padx=20, pady=(0, 5))
+        
+        last_name_entry = ctk.CTkEntry(
+            form_frame,
+            placeholder_text="Enter last name",
+            width=340,
+            height=35,
+            border_width=1,
+            corner_radius=8
+        )
+        last_name_entry.insert(0, user["last_name"])
+        last_name_entry.pack(padx=20, pady=(0, 15))
+        
+        # Email
+        email_label = ctk.CTkLabel(form_frame, text="Email:", font=("Arial", 14))
+        email_label.pack(anchor="w", padx=20, pady=(0, 5))
+        
+        email_entry = ctk.CTkEntry(
+            form_frame,
+            placeholder_text="Enter email",
+            width=340,
+            height=35,
+            border_width=1,
+            corner_radius=8
+        )
+        email_entry.insert(0, user["email"])
+        email_entry.pack(padx=20, pady=(0, 15))
+        
+        # Role
+        role_label = ctk.CTkLabel(form_frame, text="Role:", font=("Arial", 14))
+        role_label.pack(anchor="w", padx=20, pady=(0, 5))
+        
+        role_var = ctk.StringVar(value=user["user_role"])
+        role_combobox = ctk.CTkOptionMenu(
+            form_frame,
+            variable=role_var,
+            values=["customer", "admin"],
+            width=340,
+            height=35,
+            fg_color="white",
+            button_color="#1a73e8",
+            button_hover_color="#005cb2",
+            dropdown_fg_color="white",
+            dropdown_hover_color="#f0f0f0",
+            dropdown_text_color="black"
+        )
+        role_combobox.pack(padx=20, pady=(0, 15))
+        
+        # Error label
+        error_label = ctk.CTkLabel(
+            form_frame,
+            text="",
+            font=("Arial", 12),
+            text_color="red",
+            wraplength=340
+        )
+        error_label.pack(pady=(0, 15))
+        
+        # Save button
+        def save_changes():
+            # Validate fields
+            first_name = first_name_entry.get().strip()
+            last_name = last_name_entry.get().strip()
+            email = email_entry.get().strip()
+            role = role_var.get()
             
-            if not user:
-                messagebox.showerror("Error", "User not found")
+            if not first_name or not last_name or not email:
+                error_label.configure(text="All fields are required")
                 return
             
-            # Create edit window
-            edit_window = ctk.CTkToplevel(self)
-            edit_window.title("Edit User")
-            edit_window.geometry("400x450")
-            edit_window.resizable(False, False)
-            center_window(edit_window, width=400, height=450)
-            
-            # Set this window as modal
-            edit_window.grab_set()
-            
-            # Form container
-            form_frame = ctk.CTkFrame(edit_window, fg_color="white")
-            form_frame.pack(fill="both", expand=True, padx=20, pady=20)
-            
-            # Title
-            title_label = ctk.CTkLabel(
-                form_frame,
-                text="Edit User",
-                font=("Arial", 18, "bold"),
-                text_color="#1a73e8"
-            )
-            title_label.pack(pady=(20, 30))
-            
-            # First Name
-            first_name_label = ctk.CTkLabel(form_frame, text="First Name:", font=("Arial", 14))
-            first_name_label.pack(anchor="w", padx=20, pady=(0, 5))
-            
-            first_name_entry = ctk.CTkEntry(
-                form_frame,
-                placeholder_text="Enter first name",
-                width=340,
-                height=35,
-                border_width=1,
-                corner_radius=8
-            )
-            first_name_entry.insert(0, user["first_name"])
-            first_name_entry.pack(padx=20, pady=(0, 15))
-            
-            # Last Name
-            last_name_label = ctk.CTkLabel(form_frame, text="Last Name:", font=("Arial", 14))
-            last_name_label.pack(anchor="w", padx=20, pady=(0, 5))
-            
-            last_name_entry = ctk.CTkEntry(
-                form_frame,
-                placeholder_text="Enter last name",
-                width=340,
-                height=35,
-                border_width=1,
-                corner_radius=8
-            )
-            last_name_entry.insert(0, user["last_name"])
-            last_name_entry.pack(padx=20, pady=(0, 15))
-            
-            # Email
-            email_label = ctk.CTkLabel(form_frame, text="Email:", font=("Arial", 14))
-            email_label.pack(anchor="w", padx=20, pady=(0, 5))
-            
-            email_entry = ctk.CTkEntry(
-                form_frame,
-                placeholder_text="Enter email",
-                width=340,
-                height=35,
-                border_width=1,
-                corner_radius=8
-            )
-            email_entry.insert(0, user["email"])
-            email_entry.pack(padx=20, pady=(0, 15))
-            
-            # Role
-            role_label = ctk.CTkLabel(form_frame, text="Role:", font=("Arial", 14))
-            role_label.pack(anchor="w", padx=20, pady=(0, 5))
-            
-            role_var = ctk.StringVar(value=user["user_role"])
-            role_combobox = ctk.CTkOptionMenu(
-                form_frame,
-                variable=role_var,
-                values=["customer", "admin"],
-                width=340,
-                height=35,
-                fg_color="white",
-                button_color="#1a73e8",
-                button_hover_color="#005cb2",
-                dropdown_fg_color="white",
-                dropdown_hover_color="#f0f0f0",
-                dropdown_text_color="black"
-            )
-            role_combobox.pack(padx=20, pady=(0, 15))
-            
-            # Error label
-            error_label = ctk.CTkLabel(
-                form_frame,
-                text="",
-                font=("Arial", 12),
-                text_color="red",
-                wraplength=340
-            )
-            error_label.pack(pady=(0, 15))
+            if not self.is_valid_email(email):
+                error_label.configure(text="Please enter a valid email address")
+                return
             
-            # Save button
-            def save_changes():
-                # Validate fields
-                first_name = first_name_entry.get().strip()
-                last_name = last_name_entry.get().strip()
-                email = email_entry.get().strip()
-                role = role_var.get()
-                
-                if not first_name or not last_name or not email:
-                    error_label.configure(text="All fields are required")
+            def on_saved(result):
+                success, message = result
+                if not success:
+                    save_button.configure(state="normal")
+                    error_label.configure(text=message)
                     return
                 
-                if not self.is_valid_email(email):
-                    error_label.configure(text="Please enter a valid email address")
-                    return
+                # Reload users
+                self.load_users()
                 
-                try:
-                    conn = connect_to_database()
-                    cursor = conn.cursor()
-                    
-                    # Check if email already exists and is not the current user's email
-                    if email != user["email"]:
-                        cursor.execute("SELECT user_id FROM users WHERE email = %s", (email,))
-                        if cursor.fetchone():
-                            error_label.configure(text="Email already exists")
-                            cursor.close()
-                            conn.close()
-                            return
-                    
-                    # Update the user
-                    cursor.execute(
-                        "UPDATE users SET first_name = %s, last_name = %s, email = %s, user_role = %s "
-                        "WHERE user_id = %s",
-                        (first_name, last_name, email, role, user_id)
-                    )
-                    
-                    conn.commit()
+                # Close the window
+                edit_window.destroy()
+                
+                # Show success message
+                messagebox.showinfo("Success", "User updated successfully")
+            
+            save_button.configure(state="disabled")
+            background_tasks.submit(
+                save_button,
+                self.update_user,
+                user_id,
+                user["email"],
+                first_name,
+                last_name,
+                email,
+                role,
+                on_success=on_saved
+            )
+        
+        save_button = ctk.CTkButton(
+            form_frame,
+            text="Save Changes",
+            command=save_changes,
+            width=340,
+            height=40,
+            corner_radius=8,
+            fg_color="#4CAF50",
+            hover_color="#388E3C"
+        )
+        save_button.pack(pady=(0, 20))
+    
+    def update_user(self, user_id, old_email, first_name, last_name, email, role):
+        """Update a user's details; runs on a worker thread.
+        
+        Returns (success, message).
+        """
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            
+            # Check if email already exists and is not the current user's email
+            if email != old_email:
+                cursor.execute("SELECT user_id FROM users WHERE email = %s", (email,))
+                if cursor.fetchone():
                     cursor.close()
                     conn.close()
-                    
-                    # Reload users
-                    self.load_users()
-                    
-                    # Close the window
-                    edit_window.destroy()
-                    
-                    # Show success message
-                    messagebox.showinfo("Success", "User updated successfully")
-                    
-                except mysql.connector.Error as err:
-                    print(f"Database error: {err}")
-                    error_label.configure(text=f"Error: {err}")
+                    return False, "Email already exists"
             
-            save_button = ctk.CTkButton(
-                form_frame,
-                text="Save Changes",
-                command=save_changes,
-                width=340,
-                height=40,
-                corner_radius=8,
-                fg_color="#4CAF50",
-                hover_color="#388E3C"
+            # Update the user
+            cursor.execute(
+                "UPDATE users SET first_name = %s, last_name = %s, email = %s, user_role = %s "
+                "WHERE user_id = %s",
+                (first_name, last_name, email, role, user_id)
             )
-            save_button.pack(pady=(0, 20))
+            
+            conn.commit()
+            cursor.close()
+            conn.close()
+            return True, "User updated successfully"
             
         except mysql.connector.Error as err:
             print(f"Database error: {err}")
-            messagebox.showerror("Database Error", f"Error: {err}")
+            return False, f"Error: {err}"
     
     def delete_selected_user(self):
-        """Delete the selected user."""
+        """Delete the selected user in the background."""
         selected = self.user_tree.selection()
         if not selected:
             messagebox.showinfo("Selection Required", "Please select a user to delete")
@@ -524,26 +599,35 @@ class UserManagementFrame(ctk.CTkFrame):
         if not confirm:
             return
         
-        try:
-            conn = connect_to_database()
-            cursor = conn.cursor()
-            
-            # Delete the user
-            cursor.execute("DELETE FROM users WHERE user_id = %s", (user_id,))
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
+        def on_deleted(_):
             # Reload users
             self.load_users()
             
             # Show success message
             messagebox.showinfo("Success", "User deleted successfully")
-            
-        except mysql.connector.Error as err:
+        
+        def on_error(err):
             print(f"Database error: {err}")
             messagebox.showerror("Database Error", f"Failed to delete user: {err}")
+        
+        background_tasks.submit(
+            self.user_tree,
+            self.delete_user,
+            user_id,
+            on_success=on_deleted,
+            on_error=on_error
+        )
+    
+    def delete_user(self, user_id):
+        """Delete one user; runs on a worker thread."""
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM users WHERE user_id = %s", (user_id,))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
     
     def show_context_menu(self, event):
         """Show a context menu when right-clicking on a user."""
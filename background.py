@@ -0,0 +1,133 @@
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+
+
+class BackgroundTask:
+    """Handle for work submitted to the background executor."""
+    
+    def __init__(self, widget, group, on_success, on_error):
+        self.widget = widget
+        self.group = group
+        self.on_success = on_success
+        self.on_error = on_error
+        self.future = None
+        self.cancelled = False
+    
+    def cancel(self):
+        """Drop the task's result; the work is skipped if it has not started yet."""
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class BackgroundTasks:
+    """Runs blocking work (queries, hashing) off the Tk event thread.
+    
+    Work runs on a small thread pool. Finished tasks are put on a queue that
+    the Tk thread drains with after(), so callbacks always run on the thread
+    that owns the widgets. Tasks belong to a group (usually the frame that
+    submitted them); cancelling the group discards results that are no
+    longer wanted, e.g. when the user switches to another tab.
+    """
+    
+    def __init__(self, max_workers=None, poll_interval=20):
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.background_workers,
+            thread_name_prefix="background"
+        )
+        self._results = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._poll_widget = None
+    
+    def submit(self, widget, func, *args, on_success=None, on_error=None, group=None, **kwargs):
+        """Run func(*args, **kwargs) in the background.
+        
+        on_success(result) or on_error(exception) is then called on the Tk
+        thread, unless the task was cancelled or widget has been destroyed.
+        Must be called from the Tk thread.
+        """
+        task = BackgroundTask(widget, group if group is not None else widget, on_success, on_error)
+        with self._lock:
+            self._pending.add(task)
+        
+        def run():
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._results.put((task, False, e))
+            else:
+                self._results.put((task, True, result))
+        
+        task.future = self._executor.submit(run)
+        self._ensure_polling(widget)
+        return task
+    
+    def cancel_group(self, group):
+        """Cancel every pending task submitted for group."""
+        with self._lock:
+            tasks = [task for task in self._pending if task.group is group]
+        for task in tasks:
+            task.cancel()
+    
+    def _ensure_polling(self, widget):
+        if self._poll_widget is not None and self._widget_alive(self._poll_widget):
+            return
+        # Poll from the window so closing a single frame does not stop delivery
+        self._poll_widget = widget.winfo_toplevel()
+        self._poll_widget.after(self.poll_interval, self._poll)
+    
+    def _widget_alive(self, widget):
+        try:
+            return bool(widget.winfo_exists())
+        except tk.TclError:
+            return False
+    
+    def _poll(self):
+        """Deliver finished tasks on the Tk thread."""
+        while True:
+            try:
+                task, succeeded, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            
+            with self._lock:
+                self._pending.discard(task)
+            if task.cancelled or not self._widget_alive(task.widget):
+                continue
+            
+            callback = task.on_success if succeeded else task.on_error
+            if callback is None:
+                if not succeeded:
+                    print(f"Background task failed: {value}")
+                continue
+            try:
+                callback(value)
+            except Exception as e:
+                print(f"Error in background task callback: {e}")
+        
+        # Cancelled tasks that never started produce no result
+        with self._lock:
+            self._pending = {task for task in self._pending if not task.future.cancelled()}
+            pending = bool(self._pending)
+        
+        if pending and self._widget_alive(self._poll_widget):
+            self._poll_widget.after(self.poll_interval, self._poll)
+        else:
+            self._poll_widget = None
+    
+    def shutdown(self):
+        """Stop accepting work; queued tasks that have not started are dropped."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Process-wide executor shared by all frames
+background_tasks = BackgroundTasks()
+
+# Dedicated to password hashing (login, signup, resets, admin user creation)
+password_tasks = BackgroundTasks(max_workers=Config.bcrypt_workers)
@@ -0,0 +1,147 @@
+"""Render the admin reports without a display, e.g. from a nightly cron job.
+
+Usage: python batch_reports.py [--range START:END ...] [--granularity day|week|month]
+                               [--types sales,products,revenue,stock]
+                               [--output-dir reports] [--workers N] [--user-id ID]
+
+Dates are YYYY-MM-DD and both ends are inclusive; without --range the last
+90 days are reported, as in the GUI. Every (report, range) pair is rendered
+in its own worker process to a PNG chart (300 dpi, as exported from the GUI)
+and a CSV of the underlying data. The files are recorded in admin_reports
+under --user-id, or the first admin account if none is given.
+"""
+import matplotlib
+matplotlib.use("Agg")  # Before anything imports pyplot
+
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+
+from utils import get_connection
+from admin.report_data import REPORT_NAMES, REPORT_TYPES, GRANULARITIES, default_range, fetch_report_data, has_data, report_rows, log_reports
+from admin.report_plots import report_figure
+
+
+def parse_range(text):
+    start, _, end = text.partition(":")
+    try:
+        start_date = datetime.strptime(start, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected START:END as YYYY-MM-DD:YYYY-MM-DD, got {text!r}")
+    if end_date < start_date:
+        raise argparse.ArgumentTypeError(f"range ends before it starts: {text!r}")
+    return start_date, end_date
+
+
+def positive_int(text):
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, got {text!r}")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def render_report(report_type, start_date, end_date, granularity, output_dir):
+    """Fetch, draw and write one report; runs in a worker process. Returns the written paths."""
+    data = fetch_report_data(report_type, start_date, end_date, granularity)
+    
+    if report_type == "stock":
+        # A snapshot of current stock, not a range
+        base_name = f"{REPORT_NAMES[report_type]}_{date.today()}"
+    else:
+        base_name = f"{REPORT_NAMES[report_type]}_{start_date}_{end_date}"
+    base_path = os.path.join(output_dir, base_name)
+    paths = []
+    
+    header, rows = report_rows(report_type, data)
+    with open(f"{base_path}.csv", "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        writer.writerows(rows)
+    paths.append(f"{base_path}.csv")
+    
+    figure = report_figure(report_type, data, granularity) if has_data(report_type, data) else None
+    if figure is not None:
+        figure.savefig(f"{base_path}.png", dpi=300, bbox_inches='tight')
+        paths.append(f"{base_path}.png")
+    return paths
+
+
+def find_admin_user(cursor):
+    cursor.execute("SELECT MIN(user_id) FROM users WHERE user_role = 'admin'")
+    return cursor.fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render admin reports to PNG and CSV files.")
+    parser.add_argument("--range", dest="ranges", action="append", type=parse_range,
+                        help="START:END dates to report on; may be repeated")
+    parser.add_argument("--granularity", choices=GRANULARITIES, default="month",
+                        help="period of the sales over time report (default: month)")
+    parser.add_argument("--types", default=",".join(REPORT_TYPES),
+                        help="comma-separated report types (default: all)")
+    parser.add_argument("--output-dir", default="reports")
+    parser.add_argument("--workers", type=positive_int, default=os.cpu_count() or 1)
+    parser.add_argument("--user-id", type=int, help="admin recorded as generating the reports")
+    args = parser.parse_args()
+    
+    report_types = [name.strip() for name in args.types.split(",") if name.strip()]
+    unknown = set(report_types) - set(REPORT_TYPES)
+    if not report_types:
+        parser.error("no report types given")
+    if unknown:
+        parser.error(f"unknown report types: {', '.join(sorted(unknown))}")
+    ranges = args.ranges or [default_range()]
+    
+    jobs = []
+    for report_type in report_types:
+        # The stock report ignores the range, so it is rendered once
+        for start_date, end_date in (ranges[:1] if report_type == "stock" else ranges):
+            jobs.append((report_type, start_date, end_date))
+    
+    os.makedirs(args.output_dir, exist_ok=True)
+    paths = []
+    failures = 0
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs))) as executor:
+        futures = {
+            executor.submit(render_report, report_type, start_date, end_date, args.granularity, args.output_dir): (report_type, start_date, end_date)
+            for report_type, start_date, end_date in jobs
+        }
+        for future in as_completed(futures):
+            report_type, start_date, end_date = futures[future]
+            try:
+                written = future.result()
+            except Exception as e:
+                print(f"Failed: {report_type} {start_date}..{end_date}: {e}")
+                failures += 1
+                continue
+            for path in written:
+                print(f"Wrote {path}")
+            paths += written
+    
+    if paths:
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            user_id = args.user_id or find_admin_user(cursor)
+            if user_id is None:
+                print("No admin account to record the reports under; skipping admin_reports")
+            else:
+                log_reports(cursor, user_id, [os.path.abspath(path) for path in paths])
+                conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+    
+    print(f"{len(jobs) - failures} of {len(jobs)} reports generated, {len(paths)} files")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Measure bcrypt throughput at each cost factor.
+
+Usage: python benchmarks/bcrypt_benchmark.py [min_rounds] [max_rounds]
+
+Reports hashes per second and milliseconds per hash for a single thread and
+for Config.bcrypt_workers threads, to help choose Config.bcrypt_rounds. A
+login costs one hash check (plus one hash when an old hash is upgraded).
+"""
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from config import Config
+from passwords import hash_password, check_password
+
+PASSWORD = "Benchmark#Password1"
+
+
+def measure(rounds, workers, min_seconds=1.0):
+    """Return hashes per second at the given cost across the given number of threads."""
+    stored = hash_password(PASSWORD, rounds)
+    count = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while time.perf_counter() - start < min_seconds:
+            results = list(executor.map(lambda _: check_password(PASSWORD, stored), range(workers)))
+            assert all(results)
+            count += workers
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    min_rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    max_rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 14
+    workers = Config.bcrypt_workers
+    
+    print(f"Configured cost: {Config.bcrypt_rounds}, password workers: {workers}")
+    print(f"{'rounds':>6} {'hashes/s (1)':>14} {'ms/hash':>9} {f'hashes/s ({workers})':>14}")
+    for rounds in range(min_rounds, max_rounds + 1):
+        single = measure(rounds, 1)
+        pooled = measure(rounds, workers)
+        marker = "  <- configured" if rounds == Config.bcrypt_rounds else ""
+        print(f"{rounds:>6} {single:>14.1f} {1000 / single:>9.1f} {pooled:>14.1f}{marker}")
+
+
+if __name__ == "__main__":
+    main()
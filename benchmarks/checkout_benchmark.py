@@ -0,0 +1,174 @@
+"""Compare row-by-row checkout writes with the batched checkout pipeline.
+
+Usage: python benchmarks/checkout_benchmark.py <user_id>
+
+Creates temporary products, then each run commits a real order for the
+given user against them. The statements and the commit are timed
+separately, so the commit column includes flushing the redo log. Both
+strategies finish with the same sales rollup upserts. All rows created by
+the run are deleted at the end and the rollups are rebuilt for every day
+the run wrote orders on.
+"""
+import sys
+import os
+import time
+from decimal import Decimal
+
+# Add the parent directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from utils import get_connection
+from customer.checkout import merge_cart_lines, order_total, write_order
+from sales_rollups import record_order, rebuild_rollups
+
+MAX_LINES = 200
+
+
+class CountingCursor:
+    """Cursor proxy that counts statements sent to the server."""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.statements = 0
+    
+    def execute(self, *args, **kwargs):
+        self.statements += 1
+        return self._cursor.execute(*args, **kwargs)
+    
+    def executemany(self, *args, **kwargs):
+        # mysql.connector rewrites INSERT ... VALUES batches into one statement
+        self.statements += 1
+        return self._cursor.executemany(*args, **kwargs)
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def write_row_by_row(cursor, user_id, cart_id, lines, total_amount, categories):
+    """The original checkout loop: two statements per cart line, then the rollups."""
+    cursor.execute(
+        "INSERT INTO orders (user_id, order_date, total_price) VALUES (%s, NOW(), %s)",
+        (user_id, total_amount)
+    )
+    order_id = cursor.lastrowid
+    for product_id, (quantity, sub_total) in lines.items():
+        cursor.execute(
+            "INSERT INTO order_details (order_id, product_id, quantity, sub_total, product_category) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            (order_id, product_id, quantity, sub_total, categories[product_id])
+        )
+        cursor.execute(
+            "UPDATE products SET stock_quantity = stock_quantity - %s WHERE product_id = %s",
+            (quantity, product_id)
+        )
+    cursor.execute("UPDATE shopping_carts SET status = 'completed' WHERE cart_id = %s", (cart_id,))
+    record_order(cursor, order_id)
+    return order_id
+
+
+def create_products(count):
+    """Insert count temporary products with plenty of stock and return them as cart rows."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    products = []
+    for n in range(count):
+        cursor.execute(
+            "INSERT INTO products (product_name, product_price, stock_quantity, product_category) "
+            "VALUES (%s, %s, %s, %s)",
+            (f"Checkout benchmark product {n}", Decimal("1.00"), 1000000, "Benchmark")
+        )
+        products.append({
+            "product_id": cursor.lastrowid,
+            "product_price": Decimal("1.00"),
+            "product_category": "Benchmark"
+        })
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return products
+
+
+def cleanup(product_ids, order_ids):
+    conn = get_connection()
+    cursor = conn.cursor()
+    # Days the run wrote orders on, usually just today
+    first_day = last_day = None
+    if order_ids:
+        placeholders = ", ".join(["%s"] * len(order_ids))
+        cursor.execute(
+            f"SELECT MIN(DATE(order_date)), MAX(DATE(order_date)) FROM orders WHERE order_id IN ({placeholders})",
+            tuple(order_ids)
+        )
+        first_day, last_day = cursor.fetchone()
+    for ids, queries in (
+        (order_ids, ["DELETE FROM order_details WHERE order_id IN ({})", "DELETE FROM orders WHERE order_id IN ({})"]),
+        (product_ids, ["DELETE FROM products WHERE product_id IN ({})"]),
+    ):
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            for query in queries:
+                cursor.execute(query.format(", ".join(["%s"] * len(chunk))), tuple(chunk))
+    # The benchmark orders were counted in the sales rollups
+    if first_day is not None:
+        rebuild_rollups(cursor, first_day, last_day)
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def measure(strategy, user_id, cart_items, order_ids, repeat=5):
+    """Commit repeat orders; returns (statements, statement ms, commit ms) per order."""
+    prices = {item['product_id']: item['product_price'] for item in cart_items}
+    lines = {
+        product_id: (quantity, prices[product_id] * quantity)
+        for product_id, quantity in merge_cart_lines(cart_items).items()
+    }
+    total = order_total(lines)
+    categories = {item['product_id']: item['product_category'] for item in cart_items}
+    write_time = 0.0
+    commit_time = 0.0
+    statements = 0
+    for _ in range(repeat):
+        conn = get_connection()
+        cursor = CountingCursor(conn.cursor())
+        try:
+            start = time.perf_counter()
+            order_ids.append(strategy(cursor, user_id, 0, lines, total, categories))
+            written = time.perf_counter()
+            conn.commit()
+            committed = time.perf_counter()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+        write_time += written - start
+        commit_time += committed - written
+        statements = cursor.statements
+    return statements, write_time * 1000 / repeat, commit_time * 1000 / repeat
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    user_id = int(sys.argv[1])
+    
+    products = create_products(MAX_LINES)
+    order_ids = []
+    try:
+        print(f"{'lines':>6} {'strategy':>12} {'statements':>11} {'write ms':>10} {'commit ms':>10}")
+        for size in (1, 5, 20, 50, 100, 200):
+            cart_items = [dict(product, quantity=1) for product in products[:size]]
+            for name, strategy in (("row-by-row", write_row_by_row), ("batched", write_order)):
+                statements, write_ms, commit_ms = measure(strategy, user_id, cart_items, order_ids)
+                print(f"{size:>6} {name:>12} {statements:>11} {write_ms:>10.2f} {commit_ms:>10.2f}")
+    finally:
+        cleanup([product['product_id'] for product in products], order_ids)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Hammer checkout from many threads to check that stock never oversells.
+
+Usage: python benchmarks/checkout_stress.py <user_id> [threads] [stock] [attempts_per_thread]
+
+Creates a temporary product with the given stock, then every thread places
+one-unit orders for it, each from its own cart, until its attempts run out.
+Afterwards the script checks that exactly `stock` units were sold, the
+stock level is zero rather than negative, and reports throughput. All rows
+created by the run are deleted at the end.
+"""
+import sys
+import os
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+
+# Add the parent directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import mysql.connector
+
+from utils import get_connection
+from db_pool import get_pool
+from customer.checkout import place_order, OutOfStockError
+from sales_rollups import rebuild_rollups
+
+
+def create_product(stock):
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO products (product_name, product_price, stock_quantity, product_category) "
+        "VALUES (%s, %s, %s, %s)",
+        ("Checkout stress product", 1.00, stock, "Stress")
+    )
+    product_id = cursor.lastrowid
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return product_id
+
+
+def create_cart(conn, user_id):
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO shopping_carts (user_id, status) VALUES (%s, 'completed')", (user_id,))
+    cart_id = cursor.lastrowid
+    conn.commit()
+    cursor.close()
+    return cart_id
+
+
+def buyer(user_id, product_id, attempts, results, lock):
+    cart_item = {'product_id': product_id, 'product_price': Decimal('1.00'), 'quantity': 1}
+    sold = rejected = failed = 0
+    order_ids = []
+    cart_ids = []
+    
+    # A dedicated connection per thread: the pool is sized for the app, not for this many buyers
+    try:
+        conn = mysql.connector.connect(**get_pool().connect_args)
+    except mysql.connector.Error as e:
+        print(f"Buyer could not connect: {e}")
+        return
+    
+    for _ in range(attempts):
+        try:
+            cart_id = create_cart(conn, user_id)
+            cart_ids.append(cart_id)
+            order_ids.append(place_order(conn, user_id, cart_id, [cart_item]))
+            sold += 1
+        except OutOfStockError:
+            rejected += 1
+        except Exception as e:
+            print(f"Checkout failed: {e}")
+            failed += 1
+    conn.close()
+    
+    with lock:
+        results['sold'] += sold
+        results['rejected'] += rejected
+        results['failed'] += failed
+        results['order_ids'] += order_ids
+        results['cart_ids'] += cart_ids
+
+
+def cleanup(product_id, order_ids, cart_ids):
+    conn = get_connection()
+    cursor = conn.cursor()
+    for ids, queries in (
+        (order_ids, ["DELETE FROM order_details WHERE order_id IN ({})", "DELETE FROM orders WHERE order_id IN ({})"]),
+        (cart_ids, ["DELETE FROM shopping_carts WHERE cart_id IN ({})"]),
+    ):
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            for query in queries:
+                cursor.execute(query.format(", ".join(["%s"] * len(chunk))), tuple(chunk))
+    cursor.execute("DELETE FROM products WHERE product_id = %s", (product_id,))
+    # The test orders were counted in today's sales rollups
+    rebuild_rollups(cursor, date.today(), date.today())
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    user_id = int(sys.argv[1])
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    stock = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    attempts = int(sys.argv[4]) if len(sys.argv) > 4 else stock // threads + 10
+    
+    product_id = create_product(stock)
+    results = {'sold': 0, 'rejected': 0, 'failed': 0, 'order_ids': [], 'cart_ids': []}
+    lock = threading.Lock()
+    workers = [
+        threading.Thread(target=buyer, args=(user_id, product_id, attempts, results, lock))
+        for _ in range(threads)
+    ]
+    
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT stock_quantity FROM products WHERE product_id = %s", (product_id,))
+    remaining = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    
+    try:
+        # Only attempts that actually ran; a thread that could not connect ran none
+        total = results['sold'] + results['rejected'] + results['failed']
+        print(f"Threads: {threads}, initial stock: {stock}, checkout attempts: {total} of {threads * attempts}")
+        print(f"Sold: {results['sold']}, rejected: {results['rejected']}, failed: {results['failed']}")
+        print(f"Remaining stock: {remaining}")
+        print(f"Throughput: {total / elapsed:.1f} checkouts/s ({elapsed:.2f}s)")
+        
+        expected_sold = min(stock, total)
+        if remaining < 0 or results['sold'] + remaining != stock or (results['failed'] == 0 and results['sold'] != expected_sold):
+            print("FAIL: stock and orders do not add up")
+            sys.exit(1)
+        print("OK: no overselling")
+    finally:
+        cleanup(product_id, results['order_ids'], results['cart_ids'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Measure time to first paint after login for the customer and admin dashboards.
+
+Usage: python benchmarks/dashboard_startup.py <customer|admin> <user_id> [repeat]
+
+Each run builds the dashboard, as the login window does, and forces Tk to
+lay out and draw it; that is the time to first paint. The remaining frames
+are then built as well, which is the work the dashboards used to do before
+showing anything, so the two columns compare deferred against eager
+construction. Needs a display and a populated database.
+"""
+import sys
+import os
+import statistics
+import time
+
+# Add the parent directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+
+def measure(dashboard_class, user_id):
+    start = time.perf_counter()
+    dashboard = dashboard_class(user_id)
+    dashboard.update()
+    first_paint = time.perf_counter() - start
+    
+    # What eager construction added before the first paint
+    start = time.perf_counter()
+    for frame_name in dashboard.frame_factories:
+        dashboard.get_frame(frame_name)
+    dashboard.update()
+    remaining = time.perf_counter() - start
+    
+    dashboard.destroy()
+    return first_paint, remaining
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("customer", "admin"):
+        print(__doc__)
+        sys.exit(1)
+    kind = sys.argv[1]
+    user_id = int(sys.argv[2])
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    
+    if kind == "customer":
+        from customer.customer_dashboard import CustomerDashboard as dashboard_class
+    else:
+        from admin.admin_dashboard import AdminDashboard as dashboard_class
+    
+    # The first build pays for imports and connection setup; leave it out
+    measure(dashboard_class, user_id)
+    
+    runs = [measure(dashboard_class, user_id) for _ in range(repeat)]
+    first_paint = statistics.median(run[0] for run in runs) * 1000
+    remaining = statistics.median(run[1] for run in runs) * 1000
+    
+    print(f"{kind} dashboard, median of {repeat} runs")
+    print(f"  first paint, frames deferred:      {first_paint:8.1f} ms")
+    print(f"  first paint, all frames up front:  {first_paint + remaining:8.1f} ms")
+    print(f"  saved before first paint:          {remaining:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Measure how long the app's entry modules take to import.
+
+Usage: python benchmarks/import_benchmark.py [module ...] [--repeat N] [--top N]
+
+Each module is imported in a fresh interpreter under `python -X importtime`
+and the log is broken down by top-level package, heaviest first. The
+default modules are the login window, both dashboards and the reports
+screen, so the output shows what a login costs and what is deferred until
+the reports tab is first opened (matplotlib should appear only under
+admin.reports).
+"""
+import sys
+import os
+import re
+import statistics
+import subprocess
+
+# Add the parent directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+DEFAULT_MODULES = ["login_signup", "admin.admin_dashboard", "customer.customer_dashboard", "admin.reports"]
+
+# import time:   self [us] | cumulative | imported package
+LINE_PATTERN = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile(module):
+    """Import module in a fresh interpreter and return {top-level package: microseconds}.
+    
+    Each module's self time is charged to its top-level package, so the
+    values add up to the whole import and nested imports such as
+    matplotlib under admin.reports get their own line.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=parent_dir,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    
+    packages = {}
+    for line in result.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if not match:
+            continue
+        self_us, _, _, name = match.groups()
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + int(self_us)
+    return packages
+
+
+def main():
+    args = sys.argv[1:]
+    repeat = 5
+    top = 10
+    modules = []
+    while args:
+        arg = args.pop(0)
+        if arg == "--repeat":
+            repeat = int(args.pop(0))
+        elif arg == "--top":
+            top = int(args.pop(0))
+        else:
+            modules.append(arg)
+    modules = modules or DEFAULT_MODULES
+    
+    for module in modules:
+        try:
+            runs = [import_profile(module) for _ in range(repeat)]
+        except RuntimeError as e:
+            print(e)
+            continue
+        
+        # Median per package across runs smooths out disk cache effects
+        packages = {name: statistics.median(run.get(name, 0) for run in runs) for name in runs[0]}
+        total = statistics.median(sum(run.values()) for run in runs)
+        
+        print(f"import {module}: {total / 1000:.1f} ms (median of {repeat})")
+        for name, elapsed in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            print(f"  {name:<30} {elapsed / 1000:>8.1f} ms")
+        print(f"  matplotlib imported: {'yes' if 'matplotlib' in packages else 'no'}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare per-order detail queries with the batched order history loader.
+
+Usage: python benchmarks/orders_benchmark.py <user_id>
+
+Runs against the configured database, read-only. Pick a customer with
+many orders to see the difference.
+"""
+import sys
+import os
+import time
+
+# Add the parent directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from utils import get_connection
+from customer.orders import fetch_order_history
+
+
+class CountingCursor:
+    """Cursor proxy that counts execute() round-trips."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.round_trips = 0
+
+    def execute(self, *args, **kwargs):
+        self.round_trips += 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def load_per_order(cursor, user_id, limit):
+    """The original N+1 loading strategy."""
+    cursor.execute(
+        "SELECT order_id, order_date, total_price FROM orders "
+        "WHERE user_id = %s ORDER BY order_date DESC LIMIT %s",
+        (user_id, limit)
+    )
+    orders = cursor.fetchall()
+    for order in orders:
+        cursor.execute("""
+            SELECT od.product_id, od.quantity, od.sub_total, p.product_name, p.product_price
+            FROM order_details od
+            JOIN products p ON od.product_id = p.product_id
+            WHERE od.order_id = %s
+        """, (order['order_id'],))
+        cursor.fetchall()
+    return orders
+
+
+def load_batched(cursor, user_id, limit):
+    orders, _ = fetch_order_history(cursor, user_id, limit=limit)
+    return orders
+
+
+def measure(strategy, user_id, limit, repeat=5):
+    conn = get_connection()
+    cursor = CountingCursor(conn.cursor(dictionary=True))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        orders = strategy(cursor, user_id, limit)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+    cursor.close()
+    conn.close()
+    return len(orders), cursor.round_trips // repeat, elapsed_ms
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    user_id = int(sys.argv[1])
+
+    print(f"{'orders':>8} {'strategy':>10} {'queries':>8} {'ms':>10}")
+    for limit in (1, 10, 50, 100, 500):
+        for name, strategy in (("per-order", load_per_order), ("batched", load_batched)):
+            count, round_trips, elapsed_ms = measure(strategy, user_id, limit)
+            print(f"{count:>8} {name:>10} {round_trips:>8} {elapsed_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
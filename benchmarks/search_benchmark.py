@@ -0,0 +1,109 @@
+"""Measure product search latency on a synthetic catalog.
+
+Usage: python benchmarks/search_benchmark.py [product_count]
+
+Builds a catalog of random products (100,000 by default, no database
+needed), then times each query against the previous substring scan and the
+ranked inverted index, including typo and multi-word queries the scan
+cannot answer, and the per-keystroke cost of searching as you type.
+"""
+import sys
+import os
+import random
+import statistics
+import time
+
+# Add the parent directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from customer.search import ProductSearchIndex
+
+CATEGORIES = ["Dairy", "Bakery", "Fruits", "Vegetables", "Meat", "Seafood", "Beverages", "Snacks",
+              "Frozen", "Pantry", "Household", "Personal Care"]
+ADJECTIVES = ["Organic", "Fresh", "Whole", "Low Fat", "Sparkling", "Roasted", "Smoked", "Sweet",
+              "Spicy", "Classic", "Premium", "Family Size", "Gluten Free", "Creamy", "Crunchy"]
+NOUNS = ["Milk", "Bread", "Apple", "Banana", "Chicken", "Salmon", "Coffee", "Tea", "Chips", "Yogurt",
+         "Cheese", "Butter", "Rice", "Pasta", "Tomato", "Spinach", "Orange Juice", "Cookies",
+         "Almonds", "Shampoo", "Detergent", "Ice Cream", "Cereal", "Honey", "Granola"]
+BRANDS = ["Acme", "Sunrise", "Greenfield", "Harbor", "Maple", "Northstar", "Bluebell", "Golden"]
+
+QUERIES = [
+    ("single word", "milk"),
+    ("category", "seafood"),
+    ("prefix", "gran"),
+    ("multi-word", "organic whole milk"),
+    ("typo", "bananna"),
+    ("typo, multi-word", "smokd salmon"),
+    ("brand + product", "maple granola"),
+    ("no match", "xylophone"),
+]
+
+
+def make_catalog(count, seed=42):
+    rng = random.Random(seed)
+    products = []
+    for product_id in range(1, count + 1):
+        name = f"{rng.choice(BRANDS)} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.randint(100, 999)}g"
+        products.append({
+            "product_id": product_id,
+            "product_name": name,
+            "product_category": rng.choice(CATEGORIES),
+            "product_price": round(rng.uniform(0.5, 50), 2),
+            "stock_quantity": rng.randint(0, 200),
+        })
+    products.sort(key=lambda p: (p["product_category"], p["product_name"]))
+    return products
+
+
+def substring_search(products, search_term):
+    """The previous catalog search: unranked substring match on name or category."""
+    term = search_term.casefold()
+    return [
+        product for product in products
+        if term in product["product_name"].casefold() or term in product["product_category"].casefold()
+    ]
+
+
+def time_query(search, query, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return len(results), statistics.median(timings), max(timings)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeat = 5
+    
+    products = make_catalog(count)
+    
+    start = time.perf_counter()
+    index = ProductSearchIndex(products)
+    print(f"Catalog: {count} products, index built in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+    
+    print(f"{'query':<28} {'scan hits':>9} {'scan ms':>8} {'index hits':>10} {'p50 ms':>8} {'max ms':>8}")
+    for label, query in QUERIES:
+        scan_hits, scan_ms, _ = time_query(lambda q: substring_search(products, q), query, repeat)
+        index_hits, p50, worst = time_query(index.search, query, repeat)
+        print(f"{label + ': ' + query:<28} {scan_hits:>9} {scan_ms:>8.1f} {index_hits:>10} {p50:>8.1f} {worst:>8.1f}")
+    
+    # Search-as-you-type issues a query per (debounced) keystroke
+    typed = "organic whole milk"
+    timings = []
+    for length in range(1, len(typed) + 1):
+        _, p50, _ = time_query(index.search, typed[:length], repeat)
+        timings.append(p50)
+    print(f"\nTyping '{typed}': median {statistics.median(timings):.1f} ms, "
+          f"worst {max(timings):.1f} ms per keystroke")
+    
+    print("\nTop results for 'smokd salmon':")
+    for product in index.search("smokd salmon", limit=5):
+        print(f"  {product['product_name']} ({product['product_category']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,23 @@ class Config:
     password = 'new_password'  # Change this to your actual MySQL password
     database = 'supermarketdb'
 
+    # Connection pool settings
+    pool_size = 5  # Maximum number of open connections
+    pool_max_idle_time = 300  # Seconds an idle connection is kept before it is closed
+    pool_checkout_timeout = 10  # Seconds to wait for a free connection
+    pool_health_check_interval = 30  # Ping connections idle for longer than this
+
+    # Background work
+    background_workers = 4  # Threads running queries off the UI thread; keep <= pool_size
+
+    # Password hashing
+    bcrypt_rounds = 12  # Work factor for new hashes; older hashes are upgraded at login
+    bcrypt_workers = 2  # Threads dedicated to hashing so logins don't queue behind screen loads
+
+    # Admin reports
+    report_cache_ttl = 300  # Seconds a generated report is reused while no new orders arrive
+    report_raw_max_days = 7  # Ranges up to this many days query orders directly instead of the rollups
+
     @classmethod
     def get_domain(cls):
         return cls.domain
\ No newline at end of file
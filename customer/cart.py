@@ -1,9 +1,18 @@
 import customtkinter as ctk
-from utils import connect_to_database, format_currency
-import mysql.connector
+from utils import get_connection, format_currency
+from thumbnails import thumbnail_cache
 from tkinter import messagebox
-from PIL import Image
-import os
+from background import background_tasks
+
+try:
+    from customer.checkout import place_order, OutOfStockError, PriceChangedError, TAX_RATE
+    from customer.cart_repository import cart_repository
+except ImportError:
+    from checkout import place_order, OutOfStockError, PriceChangedError, TAX_RATE
+    from cart_repository import cart_repository
+
+# Delay before queued quantity changes are written, so rapid clicks coalesce
+WRITE_DELAY_MS = 400
 
 
 class CartFrame(ctk.CTkFrame):
@@ -54,71 +63,96 @@ class CartFrame(ctk.CTkFrame):
         )
         self.cart_summary_frame.grid(row=0, column=1, padx=(10, 0), pady=0, sticky="n")
         
+        # Version of the cart currently drawn, to skip redundant rebuilds
+        self.displayed_version = None
+        
+        # Quantity changes are applied to the widgets at once and written later
+        self.cart_items = []
+        self.item_rows = {}  # cart_item_id -> (frame, quantity label, price label)
+        self.summary_labels = {}
+        self.pending_quantities = {}  # cart_item_id -> quantity waiting to be written
+        self.write_after_id = None
+        self.write_task = None
+        self.write_group = object()  # Not cancelled on tab switches, unlike loads
+        self.checkout_task = None
+        self.checkout_button = None
+        
         # Load cart items
         self.load_cart()
     
     def load_cart(self):
-        """Load cart items from the database."""
+        """Show the user's cart, loading it in the background if it is not cached."""
+        # Results of an earlier load would overwrite this one
+        background_tasks.cancel_group(self)
+        
+        cart = cart_repository.get_cached(self.user_id)
+        if cart is not None:
+            # Unchanged since it was last drawn: keep the existing widgets
+            if cart["version"] != self.displayed_version:
+                self.display_cart(cart)
+            return
+        
         # Clear existing items
         for widget in self.cart_items_frame.winfo_children():
             widget.destroy()
         
         for widget in self.cart_summary_frame.winfo_children():
             widget.destroy()
+        self.displayed_version = None
         
-        try:
-            conn = connect_to_database()
-            cursor = conn.cursor(dictionary=True)
-            
-            # Check if user has an active cart
-            cursor.execute("""
-                SELECT cart_id FROM shopping_carts 
-                WHERE user_id = %s AND status = 'active'
-            """, (self.user_id,))
-            
-            cart_result = cursor.fetchone()
-            
-            if not cart_result:
-                self.display_empty_cart()
-                cursor.close()
-                conn.close()
-                return
-            
-            cart_id = cart_result['cart_id']
-            
-            # Get cart items with product details
-            cursor.execute("""
-                SELECT ci.cart_item_id, ci.product_id, ci.quantity, 
-                       p.product_name, p.product_price, p.stock_quantity
-                FROM cart_items ci
-                JOIN products p ON ci.product_id = p.product_id
-                WHERE ci.cart_id = %s
-                ORDER BY ci.added_at DESC
-            """, (cart_id,))
-            
-            cart_items = cursor.fetchall()
-            cursor.close()
-            conn.close()
-            
-            if not cart_items:
-                self.display_empty_cart()
-                return
-            
-            # Display cart items
-            self.display_cart_items(cart_items)
-            
-            # Display cart summary
-            self.display_cart_summary(cart_items)
-            
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            error_label = ctk.CTkLabel(
-                self.cart_items_frame,
-                text=f"Error loading cart: {err}",
-                font=("Arial", 14),
-                text_color="red"
-            )
-            error_label.pack(pady=50)
+        loading_label = ctk.CTkLabel(
+            self.cart_items_frame,
+            text="Loading cart...",
+            font=("Arial", 14),
+            text_color="#555"
+        )
+        loading_label.pack(pady=50)
+        
+        background_tasks.submit(
+            self,
+            cart_repository.get_cart,
+            self.user_id,
+            on_success=self.display_cart,
+            on_error=self.display_load_error
+        )
+    
+    def display_cart(self, cart):
+        """Draw the cart's items and summary, replacing what is shown."""
+        for widget in self.cart_items_frame.winfo_children():
+            widget.destroy()
+        
+        for widget in self.cart_summary_frame.winfo_children():
+            widget.destroy()
+        self.displayed_version = cart["version"]
+        
+        self.cart_items = cart["items"]
+        self.item_rows = {}
+        self.summary_labels = {}
+        
+        if not self.cart_items:
+            self.display_empty_cart()
+            return
+        
+        # Display cart items
+        self.display_cart_items(self.cart_items)
+        
+        # Display cart summary
+        self.display_cart_summary(self.cart_items)
+    
+    def display_load_error(self, err):
+        """Show a failed cart load in place of the items."""
+        for widget in self.cart_items_frame.winfo_children():
+            widget.destroy()
+        self.displayed_version = None
+        
+        print(f"Database error: {err}")
+        error_label = ctk.CTkLabel(
+            self.cart_items_frame,
+            text=f"Error loading cart: {err}",
+            font=("Arial", 14),
+            text_color="red"
+        )
+        error_label.pack(pady=50)
     
     def display_empty_cart(self):
         """Display message when cart is empty."""
@@ -173,123 +207,129 @@ class CartFrame(ctk.CTkFrame):
     def display_cart_items(self, cart_items):
         """Display the items in the cart."""
         # Cart Items Header
-        items_header = ctk.CTkLabel(
+        self.items_header = ctk.CTkLabel(
             self.cart_items_frame,
             text=f"Cart Items ({len(cart_items)})",
             font=("Arial", 16, "bold"),
             text_color="#333"
         )
-        items_header.pack(pady=(10, 20), padx=20, anchor="w")
+        self.items_header.pack(pady=(10, 20), padx=20, anchor="w")
         
         # Display each cart item
         for item in cart_items:
-            item_frame = ctk.CTkFrame(
-                self.cart_items_frame,
-                fg_color="#f9f9f9",
-                corner_radius=8,
-                height=80
-            )
-            item_frame.pack(fill="x", padx=10, pady=5)
-            
-            # Configure item frame grid
-            item_frame.grid_columnconfigure(1, weight=1)  # Product info column expands
-            
-            # Try to load product image thumbnail
-            image_path = os.path.join("images", "products", f"{item['product_id']}.png")
-            if os.path.exists(image_path):
-                try:
-                    product_image = Image.open(image_path)
-                    product_image = product_image.resize((60, 60))
-                    photo = ctk.CTkImage(light_image=product_image, size=(60, 60))
-                    image_label = ctk.CTkLabel(item_frame, image=photo, text="")
-                    image_label.image = photo  # Keep a reference
-                    image_label.grid(row=0, column=0, rowspan=2, padx=(10, 15), pady=10)
-                except Exception as e:
-                    print(f"Error loading image {image_path}: {e}")
-                    # Fallback to text-only if image fails to load
-                    self._create_item_text_only(item_frame, item)
-            else:
-                # If no image exists, use text-only layout
-                self._create_item_text_only(item_frame, item)
-            
-            # Product name
-            name_label = ctk.CTkLabel(
-                item_frame,
-                text=item['product_name'],
-                font=("Arial", 14, "bold"),
-                text_color="#333",
-                anchor="w"
-            )
-            name_label.grid(row=0, column=1, padx=5, pady=(10, 0), sticky="w")
-            
-            # Price and quantity
-            price_qty_label = ctk.CTkLabel(
-                item_frame,
-                text=f"{format_currency(item['product_price'])} × {item['quantity']} = {format_currency(item['product_price'] * item['quantity'])}",
-                font=("Arial", 12),
-                text_color="#555",
-                anchor="w"
-            )
-            price_qty_label.grid(row=1, column=1, padx=5, pady=(0, 10), sticky="w")
-            
-            # Buttons frame
-            buttons_frame = ctk.CTkFrame(item_frame, fg_color="transparent")
-            buttons_frame.grid(row=0, column=2, rowspan=2, padx=10, pady=10)
-            
-            # Adjust quantity frame
-            qty_frame = ctk.CTkFrame(buttons_frame, fg_color="transparent")
-            qty_frame.pack(pady=(0, 5))
-            
-            # Decrease quantity button
-            decrease_button = ctk.CTkButton(
-                qty_frame,
-                text="-",
-                command=lambda id=item['cart_item_id'], qty=item['quantity']: self.update_item_quantity(id, qty - 1),
-                width=30,
-                height=30,
-                corner_radius=4,
-                fg_color="#e0e0e0",
-                text_color="#333",
-                hover_color="#c0c0c0"
-            )
-            decrease_button.pack(side="left", padx=(0, 5))
-            
-            # Quantity label
-            qty_label = ctk.CTkLabel(
-                qty_frame,
-                text=str(item['quantity']),
-                font=("Arial", 12, "bold"),
-                width=30,
-                text_color="#333"
-            )
-            qty_label.pack(side="left")
-            
-            # Increase quantity button
-            increase_button = ctk.CTkButton(
-                qty_frame,
-                text="+",
-                command=lambda id=item['cart_item_id'], qty=item['quantity'], max_qty=item['stock_quantity']: self.update_item_quantity(id, qty + 1, max_qty),
-                width=30,
-                height=30,
-                corner_radius=4,
-                fg_color="#e0e0e0",
-                text_color="#333",
-                hover_color="#c0c0c0"
-            )
-            increase_button.pack(side="left", padx=(5, 0))
-            
-            # Remove button
-            remove_button = ctk.CTkButton(
-                buttons_frame,
-                text="Remove",
-                command=lambda id=item['cart_item_id']: self.remove_item(id),
-                width=80,
-                height=30,
-                corner_radius=4,
-                fg_color="#f44336",
-                hover_color="#d32f2f"
-            )
-            remove_button.pack()
+            self.create_item_row(item)
+    
+    def create_item_row(self, item):
+        """Create the row for one cart item."""
+        item_frame = ctk.CTkFrame(
+            self.cart_items_frame,
+            fg_color="#f9f9f9",
+            corner_radius=8,
+            height=80
+        )
+        item_frame.pack(fill="x", padx=10, pady=5)
+        
+        # Configure item frame grid
+        item_frame.grid_columnconfigure(1, weight=1)  # Product info column expands
+        
+        # Product image thumbnail
+        photo = thumbnail_cache.get(item['product_id'], (60, 60))
+        if photo:
+            image_label = ctk.CTkLabel(item_frame, image=photo, text="")
+            image_label.image = photo  # Keep a reference
+            image_label.grid(row=0, column=0, rowspan=2, padx=(10, 15), pady=10)
+        else:
+            # If no image exists, use text-only layout
+            self._create_item_text_only(item_frame, item)
+        
+        # Product name
+        name_label = ctk.CTkLabel(
+            item_frame,
+            text=item['product_name'],
+            font=("Arial", 14, "bold"),
+            text_color="#333",
+            anchor="w"
+        )
+        name_label.grid(row=0, column=1, padx=5, pady=(10, 0), sticky="w")
+        
+        # Price and quantity
+        price_qty_label = ctk.CTkLabel(
+            item_frame,
+            text=f"{format_currency(item['product_price'])} × {item['quantity']} = {format_currency(item['product_price'] * item['quantity'])}",
+            font=("Arial", 12),
+            text_color="#555",
+            anchor="w"
+        )
+        price_qty_label.grid(row=1, column=1, padx=5, pady=(0, 10), sticky="w")
+        
+        # Buttons frame
+        buttons_frame = ctk.CTkFrame(item_frame, fg_color="transparent")
+        buttons_frame.grid(row=0, column=2, rowspan=2, padx=10, pady=10)
+        
+        # Adjust quantity frame
+        qty_frame = ctk.CTkFrame(buttons_frame, fg_color="transparent")
+        qty_frame.pack(pady=(0, 5))
+        
+        # Decrease quantity button
+        decrease_button = ctk.CTkButton(
+            qty_frame,
+            text="-",
+            command=lambda: self.change_quantity(item['cart_item_id'], -1),
+            width=30,
+            height=30,
+            corner_radius=4,
+            fg_color="#e0e0e0",
+            text_color="#333",
+            hover_color="#c0c0c0"
+        )
+        decrease_button.pack(side="left", padx=(0, 5))
+        
+        # Quantity label
+        qty_label = ctk.CTkLabel(
+            qty_frame,
+            text=str(item['quantity']),
+            font=("Arial", 12, "bold"),
+            width=30,
+            text_color="#333"
+        )
+        qty_label.pack(side="left")
+        
+        # Increase quantity button
+        increase_button = ctk.CTkButton(
+            qty_frame,
+            text="+",
+            command=lambda: self.change_quantity(item['cart_item_id'], 1),
+            width=30,
+            height=30,
+            corner_radius=4,
+            fg_color="#e0e0e0",
+            text_color="#333",
+            hover_color="#c0c0c0"
+        )
+        increase_button.pack(side="left", padx=(5, 0))
+        
+        # Remove button
+        remove_button = ctk.CTkButton(
+            buttons_frame,
+            text="Remove",
+            command=lambda: self.remove_item(item['cart_item_id']),
+            width=80,
+            height=30,
+            corner_radius=4,
+            fg_color="#f44336",
+            hover_color="#d32f2f"
+        )
+        remove_button.pack()
+        
+        self.item_rows[item['cart_item_id']] = (item_frame, qty_label, price_qty_label)
+    
+    def update_item_row(self, item):
+        """Show an item's new quantity and line total on its existing row."""
+        _, qty_label, price_qty_label = self.item_rows[item['cart_item_id']]
+        qty_label.configure(text=str(item['quantity']))
+        price_qty_label.configure(
+            text=f"{format_currency(item['product_price'])} × {item['quantity']} = {format_currency(item['product_price'] * item['quantity'])}"
+        )
     
     def _create_item_text_only(self, parent_frame, item):
         """Create a text-only placeholder for product image."""
@@ -308,9 +348,7 @@ class CartFrame(ctk.CTkFrame):
     def display_cart_summary(self, cart_items):
         """Display the cart summary with total and checkout button."""
         # Calculate totals
-        subtotal = sum(item['product_price'] * item['quantity'] for item in cart_items)
-        tax = subtotal * 0.07  # Assuming 7% tax
-        total = subtotal + tax
+        subtotal, tax, total = self.cart_totals(cart_items)
         
         # Summary header
         summary_header = ctk.CTkLabel(
@@ -351,6 +389,8 @@ class CartFrame(ctk.CTkFrame):
             anchor="e"
         )
         items_amount.grid(row=0, column=1, pady=5, sticky="e")
+        self.summary_labels["items"] = items_label
+        self.summary_labels["subtotal"] = items_amount
         
         # Tax
         tax_label = ctk.CTkLabel(
@@ -370,6 +410,7 @@ class CartFrame(ctk.CTkFrame):
             anchor="e"
         )
         tax_amount.grid(row=1, column=1, pady=5, sticky="e")
+        self.summary_labels["tax"] = tax_amount
         
         # Second horizontal line
         separator2 = ctk.CTkFrame(self.cart_summary_frame, height=1, fg_color="#e0e0e0")
@@ -399,12 +440,13 @@ class CartFrame(ctk.CTkFrame):
             anchor="e"
         )
         total_amount.grid(row=0, column=1, pady=5, sticky="e")
+        self.summary_labels["total"] = total_amount
         
         # Checkout button
-        checkout_button = ctk.CTkButton(
+        self.checkout_button = ctk.CTkButton(
             self.cart_summary_frame,
-            text="Proceed to Checkout",
-            command=lambda: self.checkout(cart_items, total),
+            text="Placing Order..." if self.checkout_task is not None else "Proceed to Checkout",
+            command=self.start_checkout,
             width=220,
             height=45,
             corner_radius=8,
@@ -412,38 +454,58 @@ class CartFrame(ctk.CTkFrame):
             hover_color="#388E3C",
             font=("Arial", 14, "bold")
         )
-        checkout_button.pack(pady=20)
+        if self.checkout_task is not None:
+            self.checkout_button.configure(state="disabled")
+        self.checkout_button.pack(pady=20)
+    
+    def cart_totals(self, cart_items):
+        """Return (subtotal, tax, total) for the given items."""
+        subtotal = sum(item['product_price'] * item['quantity'] for item in cart_items)
+        tax = subtotal * TAX_RATE
+        return subtotal, tax, subtotal + tax
+    
+    def refresh_summary(self):
+        """Update the item count and totals in place."""
+        subtotal, tax, total = self.cart_totals(self.cart_items)
+        self.items_header.configure(text=f"Cart Items ({len(self.cart_items)})")
+        self.summary_labels["items"].configure(text=f"Items ({sum(item['quantity'] for item in self.cart_items)}):")
+        self.summary_labels["subtotal"].configure(text=format_currency(subtotal))
+        self.summary_labels["tax"].configure(text=format_currency(tax))
+        self.summary_labels["total"].configure(text=format_currency(total))
+    
+    def find_item(self, cart_item_id):
+        """Return the displayed item with this cart_item_id, or None."""
+        return next((item for item in self.cart_items if item['cart_item_id'] == cart_item_id), None)
+    
+    def change_quantity(self, cart_item_id, delta):
+        """Handle the - and + buttons."""
+        item = self.find_item(cart_item_id)
+        if item is not None:
+            self.update_item_quantity(cart_item_id, item['quantity'] + delta)
     
-    def update_item_quantity(self, cart_item_id, new_quantity, max_quantity=None):
-        """Update the quantity of an item in the cart."""
+    def update_item_quantity(self, cart_item_id, new_quantity):
+        """Update the quantity of an item in the cart.
+        
+        The row and summary change immediately; the write is queued and
+        coalesced with any further changes made within WRITE_DELAY_MS.
+        """
         if new_quantity <= 0:
             # If quantity becomes 0 or negative, remove the item
             self.remove_item(cart_item_id)
             return
         
-        if max_quantity is not None and new_quantity > max_quantity:
-            messagebox.showwarning("Maximum Quantity", f"Sorry, only {max_quantity} items available in stock.")
+        item = self.find_item(cart_item_id)
+        if item is None:
             return
         
-        try:
-            conn = connect_to_database()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "UPDATE cart_items SET quantity = %s WHERE cart_item_id = %s",
-                (new_quantity, cart_item_id)
-            )
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
-            # Reload cart to reflect changes
-            self.load_cart()
-            
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            messagebox.showerror("Error", f"Could not update item quantity: {err}")
+        if new_quantity > item['stock_quantity']:
+            messagebox.showwarning("Maximum Quantity", f"Sorry, only {item['stock_quantity']} items available in stock.")
+            return
+        
+        item['quantity'] = new_quantity
+        self.update_item_row(item)
+        self.refresh_summary()
+        self.queue_write(cart_item_id, new_quantity)
     
     def remove_item(self, cart_item_id):
         """Remove an item from the cart."""
@@ -451,98 +513,198 @@ class CartFrame(ctk.CTkFrame):
         if not confirm:
             return
         
-        try:
-            conn = connect_to_database()
-            cursor = conn.cursor()
-            
-            cursor.execute("DELETE FROM cart_items WHERE cart_item_id = %s", (cart_item_id,))
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
-            # Reload cart to reflect changes
-            self.load_cart()
-            
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            messagebox.showerror("Error", f"Could not remove item: {err}")
+        item = self.find_item(cart_item_id)
+        if item is None:
+            return
+        
+        self.cart_items.remove(item)
+        item_frame, _, _ = self.item_rows.pop(cart_item_id)
+        item_frame.destroy()
+        
+        if self.cart_items:
+            self.refresh_summary()
+        else:
+            for widget in self.cart_items_frame.winfo_children():
+                widget.destroy()
+            for widget in self.cart_summary_frame.winfo_children():
+                widget.destroy()
+            self.display_empty_cart()
+        self.queue_write(cart_item_id, 0)
+    
+    def queue_write(self, cart_item_id, quantity):
+        """Queue a quantity change (0 removes the item) and restart the write timer."""
+        self.pending_quantities[cart_item_id] = quantity
+        if self.write_after_id is not None:
+            self.after_cancel(self.write_after_id)
+        self.write_after_id = self.after(WRITE_DELAY_MS, self.flush_writes)
+    
+    def flush_writes(self):
+        """Write all queued quantity changes in one background transaction."""
+        if self.write_after_id is not None:
+            self.after_cancel(self.write_after_id)
+            self.write_after_id = None
+        
+        # One write at a time keeps them in order; the next flush follows this one
+        if not self.pending_quantities or self.write_task is not None:
+            return
+        
+        quantities = self.pending_quantities
+        self.pending_quantities = {}
+        self.write_task = background_tasks.submit(
+            self,
+            cart_repository.write_quantities,
+            self.user_id,
+            quantities,
+            on_success=self.on_write_done,
+            on_error=self.on_write_failed,
+            group=self.write_group
+        )
+    
+    def write_pending_now(self):
+        """Write queued changes before the cart goes away, blocking until they are saved.
+        
+        Callbacks are not delivered once the window is destroyed, so the write
+        in flight is waited for here and whatever was queued behind it is
+        written directly rather than chained from on_write_done.
+        """
+        if self.write_after_id is not None:
+            self.after_cancel(self.write_after_id)
+            self.write_after_id = None
+        
+        if self.write_task is not None:
+            try:
+                self.write_task.future.result()
+            except Exception as e:
+                print(f"Database error: {e}")
+            self.write_task = None
+        
+        if self.pending_quantities:
+            quantities = self.pending_quantities
+            self.pending_quantities = {}
+            try:
+                cart_repository.write_quantities(self.user_id, quantities)
+            except Exception as e:
+                print(f"Database error: {e}")
+    
+    def destroy(self):
+        self.write_pending_now()
+        super().destroy()
+    
+    def on_write_done(self, version):
+        """Record a finished write and send anything queued meanwhile."""
+        self.write_task = None
+        if not self.pending_quantities:
+            # The cached cart now matches what is drawn
+            self.displayed_version = version
+        self.flush_writes()
+    
+    def on_write_failed(self, err):
+        """Put the cart back the way it is in the database."""
+        self.write_task = None
+        self.pending_quantities = {}
+        print(f"Database error: {err}")
+        messagebox.showerror("Error", f"Could not update your cart: {err}")
+        
+        cart_repository.invalidate(self.user_id)
+        self.load_cart()
+    
+    def start_checkout(self):
+        """Check out the cart as currently shown."""
+        if self.checkout_task is not None:
+            return
+        _, _, total = self.cart_totals(self.cart_items)
+        self.checkout(list(self.cart_items), total)
     
     def checkout(self, cart_items, total_amount):
-        """Process the checkout."""
+        """Confirm the checkout and place the order in the background."""
         # Confirm checkout
         confirm = messagebox.askyesno("Confirm Checkout", f"Proceed with checkout for {format_currency(total_amount)}?")
         if not confirm:
             return
         
+        # Keep the stored cart in step with the order being placed
+        self.flush_writes()
+        
+        self.checkout_button.configure(text="Placing Order...", state="disabled")
+        self.checkout_task = background_tasks.submit(
+            self,
+            self.place_cart_order,
+            cart_items,
+            on_success=self.on_checkout_done,
+            on_error=self.on_checkout_failed,
+            group=self.write_group
+        )
+    
+    def place_cart_order(self, cart_items):
+        """Turn the active cart into an order; runs on a worker thread.
+        
+        Returns the new order_id, or None when the user has no active cart.
+        """
+        conn = get_connection()
         try:
-            conn = connect_to_database()
             cursor = conn.cursor()
-            
-            # Get cart ID
-            cursor.execute("""
-                SELECT cart_id FROM shopping_carts 
-                WHERE user_id = %s AND status = 'active'
-            """, (self.user_id,))
-            
-            cart_result = cursor.fetchone()
+            try:
+                cursor.execute("""
+                    SELECT cart_id FROM shopping_carts 
+                    WHERE user_id = %s AND status = 'active'
+                """, (self.user_id,))
+                cart_result = cursor.fetchone()
+            finally:
+                cursor.close()
             
             if not cart_result:
-                messagebox.showerror("Error", "Shopping cart not found.")
-                return
+                return None
             
-            cart_id = cart_result[0]
-            
-            # Begin transaction
-            conn.start_transaction()
-            
-            # Create a new order
-            cursor.execute(
-                "INSERT INTO orders (user_id, order_date, total_price) VALUES (%s, NOW(), %s)",
-                (self.user_id, total_amount)
+            # Order, line items, stock and cart status in one transaction
+            return place_order(conn, self.user_id, cart_result[0], cart_items)
+        finally:
+            conn.close()
+    
+    def restore_checkout_button(self):
+        if self.checkout_button is not None and self.checkout_button.winfo_exists():
+            self.checkout_button.configure(text="Proceed to Checkout", state="normal")
+    
+    def on_checkout_done(self, order_id):
+        self.checkout_task = None
+        if order_id is None:
+            self.restore_checkout_button()
+            messagebox.showerror("Error", "Shopping cart not found.")
+            return
+        
+        cart_repository.invalidate(self.user_id)
+        
+        # Show success message
+        messagebox.showinfo("Checkout Complete", "Your order has been placed successfully!")
+        
+        # Navigate to orders page
+        self.master.show_frame("orders")
+    
+    def on_checkout_failed(self, err):
+        self.checkout_task = None
+        
+        if isinstance(err, OutOfStockError):
+            details = "\n".join(
+                f"{item['product_name']}: requested {item['requested']}, available {item['available']}"
+                for item in err.shortfalls
             )
+            messagebox.showerror("Insufficient Stock", f"Some items are no longer available:\n\n{details}")
             
-            order_id = cursor.lastrowid
-            
-            # Add order details for each item
-            for item in cart_items:
-                subtotal = item['product_price'] * item['quantity']
-                
-                cursor.execute(
-                    "INSERT INTO order_details (order_id, product_id, quantity, sub_total) VALUES (%s, %s, %s, %s)",
-                    (order_id, item['product_id'], item['quantity'], subtotal)
-                )
-                
-                # Update product stock
-                cursor.execute(
-                    "UPDATE products SET stock_quantity = stock_quantity - %s WHERE product_id = %s",
-                    (item['quantity'], item['product_id'])
-                )
-            
-            # Mark cart as completed
-            cursor.execute(
-                "UPDATE shopping_carts SET status = 'completed' WHERE cart_id = %s",
-                (cart_id,)
+            # Show the current stock levels
+            cart_repository.invalidate(self.user_id)
+            self.load_cart()
+        
+        elif isinstance(err, PriceChangedError):
+            details = "\n".join(
+                f"{item['product_name']}: {format_currency(item['old_price'])} is now {format_currency(item['new_price'])}"
+                for item in err.changes
             )
+            messagebox.showwarning("Prices Changed", f"Some prices have changed since your cart was loaded:\n\n{details}")
             
-            # Commit transaction
-            conn.commit()
-            
-            cursor.close()
-            conn.close()
-            
-            # Show success message
-            messagebox.showinfo("Checkout Complete", "Your order has been placed successfully!")
-            
-            # Navigate to orders page
-            self.master.show_frame("orders")
-            
-        except mysql.connector.Error as err:
+            # Show the current prices before the customer confirms again
+            cart_repository.invalidate(self.user_id)
+            self.load_cart()
+        
+        else:
+            self.restore_checkout_button()
             print(f"Database error: {err}")
             messagebox.showerror("Error", f"Checkout failed: {err}")
-            
-            # Rollback transaction in case of error
-            try:
-                conn.rollback()
-            except:
-                pass
\ No newline at end of file
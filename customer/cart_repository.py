@@ -0,0 +1,357 @@
+import threading
+import time
+import mysql.connector
+from utils import get_connection
+
+try:
+    from customer.checkout import RETRYABLE_ERRORS
+except ImportError:
+    from checkout import RETRYABLE_ERRORS
+
+
+class CartRepository:
+    """Per-user cache of the active shopping cart.
+    
+    A cart is read with a single query joining the active cart, its items and
+    their products, then served from memory until something changes it.
+    Items are added and changed through this class, which keeps the cache
+    current; checkout calls invalidate() so the next read goes back to the
+    database.
+    """
+    
+    def __init__(self):
+        self._carts = {}  # user_id -> cart dict
+        self._versions = {}  # user_id -> count of invalidations
+        self._lock = threading.Lock()
+        
+        # Counters for monitoring
+        self.hits = 0
+        self.loads = 0
+    
+    def get_cached(self, user_id):
+        """Return the cached cart for user_id, or None without touching the database."""
+        with self._lock:
+            cart = self._carts.get(user_id)
+            if cart is not None:
+                self.hits += 1
+                return self._copy(cart)
+            return None
+    
+    def get_cart(self, user_id):
+        """Return the user's active cart, loading it if it is not cached.
+        
+        The cart is a dict with cart_id (None when the user has no active
+        cart), items (newest first) and version, which changes whenever the
+        cart is reloaded after a mutation.
+        """
+        cart = self.get_cached(user_id)
+        if cart is not None:
+            return cart
+        
+        with self._lock:
+            version = self._versions.get(user_id, 0)
+        
+        cart = self._load(user_id)
+        cart["version"] = version
+        
+        with self._lock:
+            # Don't cache a read that raced with a write
+            if self._versions.get(user_id, 0) == version:
+                self._carts[user_id] = cart
+            self.loads += 1
+        return self._copy(cart)
+    
+    def _load(self, user_id):
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            # Cart header and items in one round-trip
+            cursor.execute("""
+                SELECT sc.cart_id, ci.cart_item_id, ci.product_id, ci.quantity,
+                       p.product_name, p.product_price, p.stock_quantity
+                FROM shopping_carts sc
+                LEFT JOIN cart_items ci ON ci.cart_id = sc.cart_id
+                LEFT JOIN products p ON p.product_id = ci.product_id
+                WHERE sc.cart_id = (
+                    SELECT MIN(cart_id) FROM shopping_carts
+                    WHERE user_id = %s AND status = 'active'
+                )
+                ORDER BY ci.added_at DESC, ci.cart_item_id DESC
+            """, (user_id,))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+        
+        cart_id = rows[0]["cart_id"] if rows else None
+        items = [
+            {key: row[key] for key in ("cart_item_id", "product_id", "quantity",
+                                       "product_name", "product_price", "stock_quantity")}
+            for row in rows if row["cart_item_id"] is not None and row["product_name"] is not None
+        ]
+        return {"cart_id": cart_id, "items": items}
+    
+    def _copy(self, cart):
+        return dict(cart, items=[dict(item) for item in cart["items"]])
+    
+    def _active_cart_id(self, cursor, user_id):
+        """Return the id of the user's active cart, creating it if needed.
+        
+        The user's row is locked first, so concurrent calls for the same user
+        serialize and only one of them creates a cart. Callers lock product
+        rows before calling this, the same order place_order takes its locks.
+        """
+        cursor.execute("SELECT user_id FROM users WHERE user_id = %s FOR UPDATE", (user_id,))
+        cursor.fetchall()
+        
+        cursor.execute("""
+            SELECT MIN(cart_id) AS cart_id FROM shopping_carts
+            WHERE user_id = %s AND status = 'active'
+            FOR UPDATE
+        """, (user_id,))
+        row = cursor.fetchone()
+        cart_id = row["cart_id"] if isinstance(row, dict) else row[0]
+        if cart_id is None:
+            cursor.execute(
+                "INSERT INTO shopping_carts (user_id, status, created_at) VALUES (%s, 'active', NOW())",
+                (user_id,)
+            )
+            cart_id = cursor.lastrowid
+        return cart_id
+    
+    def add_item(self, user_id, product_id, quantity=1, max_attempts=3):
+        """Add quantity units of a product to the user's active cart.
+        
+        The common case, a user who already has an active cart adding an
+        in-stock product, is one INSERT ... SELECT ... ON DUPLICATE KEY
+        UPDATE and the commit (one line per product, enforced by
+        uq_cart_items_cart_product). Only when that inserts nothing does it
+        fall back to reading the product under a shared lock and finding or
+        creating the cart under a lock on the user's row. Deadlocks and lock
+        wait timeouts are retried with a short backoff. Returns False when
+        the product is out of stock.
+        """
+        conn = get_connection()
+        try:
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    added = self._write_item(conn, user_id, product_id, quantity)
+                    break
+                except mysql.connector.Error as err:
+                    if err.errno not in RETRYABLE_ERRORS or attempt == max_attempts:
+                        raise
+                    time.sleep(0.05 * attempt)
+        finally:
+            conn.close()
+        
+        if added:
+            self.invalidate(user_id)
+        return added
+    
+    def _write_item(self, conn, user_id, product_id, quantity):
+        """One attempt of add_item. Returns whether the item was added."""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO cart_items (cart_id, product_id, quantity, added_at)
+                SELECT sc.cart_id, p.product_id, %s, NOW()
+                FROM shopping_carts sc
+                JOIN products p ON p.product_id = %s AND p.stock_quantity > 0
+                WHERE sc.cart_id = (
+                    SELECT MIN(cart_id) FROM shopping_carts
+                    WHERE user_id = %s AND status = 'active'
+                )
+                ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)
+            """, (quantity, product_id, user_id))
+            added = cursor.rowcount > 0
+            
+            if not added:
+                # No active cart yet, or the product is out of stock
+                cursor.execute(
+                    "SELECT stock_quantity FROM products WHERE product_id = %s FOR SHARE",
+                    (product_id,)
+                )
+                row = cursor.fetchone()
+                added = row is not None and row[0] > 0
+                
+                if added:
+                    cart_id = self._active_cart_id(cursor, user_id)
+                    cursor.execute("""
+                        INSERT INTO cart_items (cart_id, product_id, quantity, added_at)
+                        VALUES (%s, %s, %s, NOW())
+                        ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)
+                    """, (cart_id, product_id, quantity))
+            
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return added
+    
+    def add_order(self, user_id, order_id, max_attempts=3):
+        """Add every line of one of the user's past orders to their active cart.
+        
+        Runs in one transaction: the order's products are locked in
+        product_id order, the same order place_order locks them, then the
+        active cart is found or created. Quantities are clamped so the cart
+        never holds more than is in stock, and everything is written with a
+        single multi-row upsert. Deadlocks and lock wait timeouts are retried
+        with a short backoff.
+        
+        Returns one dict per product with product_id, product_name, requested,
+        added and status ("added", "partial", "out_of_stock" or "unavailable"
+        for products that no longer exist).
+        """
+        conn = get_connection()
+        try:
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    results, added_any = self._write_order_lines(conn, user_id, order_id)
+                    break
+                except mysql.connector.Error as err:
+                    if err.errno not in RETRYABLE_ERRORS or attempt == max_attempts:
+                        raise
+                    time.sleep(0.05 * attempt)
+        finally:
+            conn.close()
+        
+        if added_any:
+            self.invalidate(user_id)
+        return results
+    
+    def _write_order_lines(self, conn, user_id, order_id):
+        """One attempt of add_order. Returns (results, whether anything was added)."""
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT od.product_id, SUM(od.quantity) AS requested
+                FROM orders o
+                JOIN order_details od ON od.order_id = o.order_id
+                WHERE o.order_id = %s AND o.user_id = %s
+                GROUP BY od.product_id
+                ORDER BY MIN(od.order_detail_id)
+            """, (order_id, user_id))
+            lines = cursor.fetchall()
+            product_ids = sorted(line["product_id"] for line in lines)
+            
+            products = {}
+            in_cart = {}
+            cart_id = None
+            if product_ids:
+                # Product rows are locked so concurrent reorders can't both claim the last units
+                placeholders = ", ".join(["%s"] * len(product_ids))
+                cursor.execute(
+                    f"SELECT product_id, product_name, stock_quantity FROM products "
+                    f"WHERE product_id IN ({placeholders}) ORDER BY product_id FOR UPDATE",
+                    tuple(product_ids)
+                )
+                products = {row["product_id"]: row for row in cursor.fetchall()}
+                
+                cart_id = self._active_cart_id(cursor, user_id)
+                cursor.execute(
+                    f"SELECT product_id, quantity FROM cart_items "
+                    f"WHERE cart_id = %s AND product_id IN ({placeholders}) FOR UPDATE",
+                    (cart_id, *product_ids)
+                )
+                in_cart = {row["product_id"]: row["quantity"] for row in cursor.fetchall()}
+            
+            results = []
+            rows = []
+            for line in lines:
+                requested = int(line["requested"])
+                product = products.get(line["product_id"])
+                if product is None:
+                    added, status = 0, "unavailable"
+                else:
+                    available = max(product["stock_quantity"] - in_cart.get(line["product_id"], 0), 0)
+                    added = min(requested, available)
+                    if added == requested:
+                        status = "added"
+                    elif added:
+                        status = "partial"
+                    else:
+                        status = "out_of_stock"
+                results.append({
+                    "product_id": line["product_id"],
+                    "product_name": product["product_name"] if product else None,
+                    "requested": requested,
+                    "added": added,
+                    "status": status
+                })
+                if added:
+                    rows.append((cart_id, line["product_id"], added))
+            
+            if rows:
+                values = ", ".join(["(%s, %s, %s, NOW())"] * len(rows))
+                params = [value for row in rows for value in row]
+                cursor.execute(f"""
+                    INSERT INTO cart_items (cart_id, product_id, quantity, added_at)
+                    VALUES {values}
+                    ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)
+                """, tuple(params))
+            
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return results, bool(rows)
+    
+    def write_quantities(self, user_id, quantities):
+        """Persist {cart_item_id: quantity} changes in one transaction; 0 removes the item.
+        
+        The cached cart is patched rather than dropped, and its new version
+        is returned.
+        """
+        removed = [cart_item_id for cart_item_id, quantity in quantities.items() if quantity <= 0]
+        updated = {cart_item_id: quantity for cart_item_id, quantity in quantities.items() if quantity > 0}
+        
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            if removed:
+                placeholders = ", ".join(["%s"] * len(removed))
+                cursor.execute(f"DELETE FROM cart_items WHERE cart_item_id IN ({placeholders})", tuple(removed))
+            if updated:
+                cases = " ".join(["WHEN %s THEN %s"] * len(updated))
+                placeholders = ", ".join(["%s"] * len(updated))
+                params = []
+                for cart_item_id, quantity in updated.items():
+                    params += [cart_item_id, quantity]
+                cursor.execute(
+                    f"UPDATE cart_items SET quantity = CASE cart_item_id {cases} END "
+                    f"WHERE cart_item_id IN ({placeholders})",
+                    tuple(params + list(updated))
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+        
+        with self._lock:
+            version = self._versions.get(user_id, 0) + 1
+            self._versions[user_id] = version
+            cart = self._carts.get(user_id)
+            if cart is not None:
+                cart["items"] = [
+                    dict(item, quantity=updated.get(item["cart_item_id"], item["quantity"]))
+                    for item in cart["items"] if item["cart_item_id"] not in removed
+                ]
+                cart["version"] = version
+        return version
+    
+    def invalidate(self, user_id):
+        """Forget the user's cached cart after it has been written."""
+        with self._lock:
+            self._carts.pop(user_id, None)
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+
+# Process-wide cart cache shared by all frames
+cart_repository = CartRepository()
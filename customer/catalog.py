@@ -0,0 +1,123 @@
+import threading
+from utils import get_connection
+
+try:
+    from customer.search import ProductSearchIndex, INDEXED_FIELDS
+except ImportError:
+    from search import ProductSearchIndex, INDEXED_FIELDS
+
+
+class ProductCatalog:
+    """In-memory cache of the products table, shared by every shopping screen.
+
+    The cache is keyed by a stamp of (product_count, catalog_version) from
+    store_stats, where triggers bump catalog_version on every products write
+    and stamp the row with it (see store_stats.CATALOG_VERSION_TRIGGERS).
+    When the stamp is unchanged the cached rows are served as-is; when it
+    moves only rows with a newer row_version are refetched. Versions are
+    handed out in commit order, so a row committed late is never skipped.
+    A row count that still disagrees after merging means products were
+    deleted, which triggers a full reload. Searches use an inverted index
+    that is rebuilt the first time the catalog is searched after a product
+    is added, removed or renamed; stock and price changes are patched into
+    the existing index.
+    """
+
+    def __init__(self):
+        self._products = {}  # product_id -> product row
+        self._sorted = []
+        self._stamp = None
+        self._index = None
+        self._lock = threading.Lock()
+
+        # Counters for monitoring
+        self.hits = 0
+        self.delta_loads = 0
+        self.full_loads = 0
+
+    def get_products(self):
+        """Return all products ordered by category and name."""
+        with self._lock:
+            conn = get_connection()
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute("SELECT product_count, catalog_version FROM store_stats WHERE stats_id = 1")
+                stamp_row = cursor.fetchone()
+                stamp = (stamp_row["product_count"], stamp_row["catalog_version"])
+
+                if self._stamp is not None and stamp == self._stamp:
+                    self.hits += 1
+                    return list(self._sorted)
+
+                changes = None if self._stamp is None else self._apply_changes(cursor, stamp)
+                if changes is None:
+                    self._full_load(cursor)
+                    renamed = True
+                else:
+                    rows, renamed = changes
+
+                self._stamp = stamp
+                if renamed:
+                    self._index = None
+                    self._sorted = sorted(
+                        self._products.values(),
+                        key=lambda p: (p["product_category"], p["product_name"])
+                    )
+                else:
+                    # Stock and price changes keep the order and the index terms
+                    if self._index is not None:
+                        self._index.update_products(rows)
+                    self._sorted = [self._products[p["product_id"]] for p in self._sorted]
+                return list(self._sorted)
+            finally:
+                cursor.close()
+                conn.close()
+
+    def _apply_changes(self, cursor, stamp):
+        """Merge rows updated since the last sync.
+
+        Returns (merged rows, whether any product was added or had its name
+        or category changed), or None if a full reload is needed.
+        """
+        product_count, _ = stamp
+        _, last_synced = self._stamp
+
+        cursor.execute("SELECT * FROM products WHERE row_version > %s", (last_synced,))
+        rows = cursor.fetchall()
+        renamed = False
+        for product in rows:
+            previous = self._products.get(product["product_id"])
+            if previous is None or any(previous[field] != product[field] for field in INDEXED_FIELDS):
+                renamed = True
+            self._products[product["product_id"]] = product
+
+        self.delta_loads += 1
+        if len(self._products) != product_count:
+            return None
+        return rows, renamed
+
+    def _full_load(self, cursor):
+        cursor.execute("SELECT * FROM products")
+        self._products = {product["product_id"]: product for product in cursor.fetchall()}
+        self.full_loads += 1
+
+    def search(self, search_term, limit=None):
+        """Return products matching the search term, most relevant first."""
+        self.get_products()
+        with self._lock:
+            if self._index is None:
+                self._index = ProductSearchIndex(self._sorted)
+            index = self._index
+        return index.search(search_term, limit)
+
+    def invalidate(self):
+        """Drop the cached catalog so the next read reloads it."""
+        with self._lock:
+            self._products = {}
+            self._sorted = []
+            self._stamp = None
+            self._index = None
+
+
+# Process-wide catalog shared by all frames
+product_catalog = ProductCatalog()
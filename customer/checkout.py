@@ -0,0 +1,196 @@
+import time
+from decimal import Decimal
+import mysql.connector
+from sales_rollups import record_order
+
+# Lock errors worth retrying: ER_LOCK_DEADLOCK and ER_LOCK_WAIT_TIMEOUT
+RETRYABLE_ERRORS = (1213, 1205)
+
+TAX_RATE = Decimal("0.07")
+
+
+class OutOfStockError(Exception):
+    """Raised when a checkout asks for more units than are in stock.
+    
+    shortfalls is a list of dicts with product_id, product_name, requested
+    and available for every line that cannot be filled.
+    """
+    
+    def __init__(self, shortfalls):
+        self.shortfalls = shortfalls
+        names = ", ".join(item['product_name'] for item in shortfalls)
+        super().__init__(f"Insufficient stock for: {names}")
+
+
+class PriceChangedError(Exception):
+    """Raised when a product's price changed after the cart was loaded.
+    
+    changes is a list of dicts with product_id, product_name, old_price and
+    new_price for every line whose price is no longer current.
+    """
+    
+    def __init__(self, changes):
+        self.changes = changes
+        names = ", ".join(item['product_name'] for item in changes)
+        super().__init__(f"Prices have changed for: {names}")
+
+
+def merge_cart_lines(cart_items):
+    """Combine cart lines by product, returning {product_id: quantity}."""
+    quantities = {}
+    for item in cart_items:
+        quantities[item['product_id']] = quantities.get(item['product_id'], 0) + item['quantity']
+    return quantities
+
+
+def price_lines(quantities, stock):
+    """Return {product_id: (quantity, sub_total)} priced from the locked product rows."""
+    return {
+        product_id: (quantity, stock[product_id][2] * quantity)
+        for product_id, quantity in quantities.items()
+    }
+
+
+def order_total(lines):
+    """Return the order total including tax, rounded to cents."""
+    subtotal = sum(sub_total for _, sub_total in lines.values())
+    return (subtotal * (1 + TAX_RATE)).quantize(Decimal("0.01"))
+
+
+def write_order(cursor, user_id, cart_id, lines, total_amount, categories):
+    """Issue the checkout statements without committing. Returns the new order_id.
+    
+    Uses a fixed number of statements however many lines the cart has: the
+    order, one multi-row INSERT for order_details, one CASE-based stock
+    UPDATE, the cart status update and three sales rollup upserts. Each
+    order line records the product's category from categories, so reports
+    group sales by the category at the time of sale.
+    """
+    # Create a new order
+    cursor.execute(
+        "INSERT INTO orders (user_id, order_date, total_price) VALUES (%s, NOW(), %s)",
+        (user_id, total_amount)
+    )
+    order_id = cursor.lastrowid
+    
+    # executemany sends a single multi-row INSERT
+    cursor.executemany(
+        "INSERT INTO order_details (order_id, product_id, quantity, sub_total, product_category) "
+        "VALUES (%s, %s, %s, %s, %s)",
+        [
+            (order_id, product_id, quantity, sub_total, categories[product_id])
+            for product_id, (quantity, sub_total) in lines.items()
+        ]
+    )
+    
+    # Update stock for every product at once
+    product_ids = list(lines)
+    cases = " ".join(["WHEN %s THEN %s"] * len(product_ids))
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    params = []
+    for product_id in product_ids:
+        params += [product_id, lines[product_id][0]]
+    cursor.execute(
+        f"UPDATE products SET stock_quantity = stock_quantity - CASE product_id {cases} END "
+        f"WHERE product_id IN ({placeholders})",
+        tuple(params + product_ids)
+    )
+    
+    # Mark cart as completed
+    cursor.execute(
+        "UPDATE shopping_carts SET status = 'completed' WHERE cart_id = %s",
+        (cart_id,)
+    )
+    
+    # Reports read the daily rollups instead of scanning orders
+    record_order(cursor, order_id)
+    return order_id
+
+
+def lock_stock(cursor, product_ids):
+    """Lock the products' rows and return {product_id: (product_name, stock_quantity, product_price, product_category)}.
+    
+    Rows are locked in product_id order so concurrent checkouts always take
+    locks in the same order and cannot deadlock on each other.
+    """
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    cursor.execute(
+        f"SELECT product_id, product_name, stock_quantity, product_price, product_category FROM products "
+        f"WHERE product_id IN ({placeholders}) ORDER BY product_id FOR UPDATE",
+        tuple(sorted(product_ids))
+    )
+    return {
+        product_id: (product_name, stock, price, category)
+        for product_id, product_name, stock, price, category in cursor.fetchall()
+    }
+
+
+def find_shortfalls(quantities, stock):
+    """Return the lines whose requested quantity exceeds the locked stock."""
+    shortfalls = []
+    for product_id, quantity in quantities.items():
+        product_name, available, _, _ = stock.get(product_id, (f"Product #{product_id}", 0, None, None))
+        if quantity > available:
+            shortfalls.append({
+                'product_id': product_id,
+                'product_name': product_name,
+                'requested': quantity,
+                'available': available
+            })
+    return shortfalls
+
+
+def find_price_changes(cart_items, stock):
+    """Return the cart lines whose price differs from the locked product row."""
+    changes = []
+    for item in cart_items:
+        product_name, _, price, _ = stock[item['product_id']]
+        if item['product_price'] != price:
+            changes.append({
+                'product_id': item['product_id'],
+                'product_name': product_name,
+                'old_price': item['product_price'],
+                'new_price': price
+            })
+    return changes
+
+
+def place_order(conn, user_id, cart_id, cart_items, max_attempts=3):
+    """Turn a cart into an order without ever overselling.
+    
+    The stock rows are locked with SELECT ... FOR UPDATE before anything is
+    written, so two terminals buying the last unit serialize and the second
+    one gets an OutOfStockError listing every short line. Sub-totals and the
+    total are priced from the locked rows; if a price no longer matches the
+    one the customer saw, nothing is written and PriceChangedError is
+    raised. Deadlocks and lock wait timeouts are retried with a short
+    backoff. Returns the new order_id.
+    """
+    quantities = merge_cart_lines(cart_items)
+    
+    for attempt in range(1, max_attempts + 1):
+        cursor = conn.cursor()
+        try:
+            stock = lock_stock(cursor, list(quantities))
+            shortfalls = find_shortfalls(quantities, stock)
+            if shortfalls:
+                conn.rollback()
+                raise OutOfStockError(shortfalls)
+            
+            changes = find_price_changes(cart_items, stock)
+            if changes:
+                conn.rollback()
+                raise PriceChangedError(changes)
+            
+            lines = price_lines(quantities, stock)
+            categories = {product_id: row[3] for product_id, row in stock.items()}
+            order_id = write_order(cursor, user_id, cart_id, lines, order_total(lines), categories)
+            conn.commit()
+            return order_id
+        except mysql.connector.Error as err:
+            conn.rollback()
+            if err.errno not in RETRYABLE_ERRORS or attempt == max_attempts:
+                raise
+            time.sleep(0.05 * attempt)
+        finally:
+            cursor.close()
@@ -31,6 +31,7 @@ except ImportError:
     except ImportError as e:
         print(f"Utils import error: {e}")
 
+from background import background_tasks
 import mysql.connector
 
 class CustomerDashboard(ctk.CTk):
@@ -41,7 +42,8 @@ class CustomerDashboard(ctk.CTk):
         self.geometry("900x600")
         center_window(self)
         
-        self.user_info = self.get_user_info()
+        # Filled in by load_user_info once the query returns
+        self.user_info = None
         
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
@@ -49,47 +51,85 @@ class CustomerDashboard(ctk.CTk):
         self.navigation_frame = CustomerNavigationFrame(master=self, signout_command=self.sign_out)
         self.navigation_frame.grid(row=0, column=0, sticky="nsew")
         
-        self.home_frame = HomeFrame(master=self, user_id=self.user_id, user_info=self.user_info)
-        self.shopping_frame = ShoppingFrame(master=self, user_id=self.user_id)
-        self.cart_frame = CartFrame(master=self, user_id=self.user_id)
-        self.orders_frame = OrdersFrame(master=self, user_id=self.user_id)
+        # Frames are built the first time they are shown, so only the home
+        # screen's widgets and queries stand between login and the first paint
+        self.frame_factories = {
+            "home": lambda: HomeFrame(master=self, user_id=self.user_id, user_info=self.user_info),
+            "shopping": lambda: ShoppingFrame(master=self, user_id=self.user_id),
+            "cart": lambda: CartFrame(master=self, user_id=self.user_id),
+            "orders": lambda: OrdersFrame(master=self, user_id=self.user_id),
+        }
+        self.frames = {}
         
         self.show_frame("home")
+        self.load_user_info()
+    
+    def load_user_info(self):
+        """Load the user's details in the background."""
+        background_tasks.submit(
+            self,
+            self.get_user_info,
+            on_success=self.display_user_info,
+            on_error=lambda err: print(f"Error fetching user info: {err}")
+        )
     
     def get_user_info(self):
-        """Fetch user information from the database."""
+        """Fetch user information from the database; runs on a worker thread."""
+        conn = connect_to_database()
+        if not conn:
+            raise mysql.connector.Error(msg="Failed to connect to database")
+        
+        cursor = conn.cursor(dictionary=True)
         try:
-            conn = connect_to_database()
-            if not conn:
-                print("Failed to connect to database")
-                return None
-            cursor = conn.cursor(dictionary=True)
             query = "SELECT * FROM users WHERE user_id = %s"
             cursor.execute(query, (self.user_id,))
-            user_info = cursor.fetchone()
+            return cursor.fetchone()
+        finally:
             cursor.close()
             conn.close()
-            return user_info
-        except mysql.connector.Error as err:
-            print(f"Error fetching user info: {err}")
-            return None
+    
+    def display_user_info(self, user_info):
+        """Store the loaded user details and greet the user by name."""
+        self.user_info = user_info
+        home = self.frames.get("home")
+        if home is not None:
+            home.set_user_info(user_info)
+    
+    def get_frame(self, frame_name):
+        """Return the named frame, building it on first use. Returns (frame, created)."""
+        frame = self.frames.get(frame_name)
+        if frame is not None:
+            return frame, False
+        frame = self.frames[frame_name] = self.frame_factories[frame_name]()
+        return frame, True
     
     def show_frame(self, frame_name):
         """Display the selected frame."""
-        for frame in [self.home_frame, self.shopping_frame, self.cart_frame, self.orders_frame]:
+        # Queued quantity changes are written as soon as the user leaves the cart
+        cart_frame = self.frames.get("cart")
+        if cart_frame is not None and frame_name != "cart":
+            cart_frame.flush_writes()
+        
+        for frame in self.frames.values():
             frame.grid_forget()
         
-        if frame_name == "home":
-            self.home_frame.grid(row=0, column=1, sticky="nsew")
-        elif frame_name == "shopping":
-            self.shopping_frame.grid(row=0, column=1, sticky="nsew")
-            self.shopping_frame.load_products()
+        # Loads started for a tab the user left are stale; each tab reloads when shown again
+        for name, frame in self.frames.items():
+            if name != frame_name and name != "home":
+                background_tasks.cancel_group(frame)
+        
+        frame, created = self.get_frame(frame_name)
+        frame.grid(row=0, column=1, sticky="nsew")
+        
+        # A frame that was just built started its own load
+        if created:
+            return
+        if frame_name == "shopping":
+            frame.search_products()  # Keeps any search the user typed
         elif frame_name == "cart":
-            self.cart_frame.grid(row=0, column=1, sticky="nsew")
-            self.cart_frame.load_cart()
+            frame.load_cart()
         elif frame_name == "orders":
-            self.orders_frame.grid(row=0, column=1, sticky="nsew")
-            self.orders_frame.load_orders()
+            frame.load_orders()
     
     def sign_out(self):
         """Handle sign-out process."""
@@ -196,15 +236,29 @@ class HomeFrame(ctk.CTkFrame):
         
         self.load_recent_orders()
     
+    def set_user_info(self, user_info):
+        """Greet the user by name once their details have loaded."""
+        self.user_info = user_info
+        if user_info:
+            self.welcome_label.configure(text=f"Welcome to SuperMarket, {user_info['first_name']}!")
+    
     def load_recent_orders(self):
-        """Load and display recent orders summary."""
+        """Load the recent orders summary in the background."""
+        background_tasks.submit(
+            self,
+            self.fetch_recent_order,
+            on_success=self.display_recent_order,
+            on_error=self.display_recent_order_error
+        )
+    
+    def fetch_recent_order(self):
+        """Return the user's most recent order with its item count; runs on a worker thread."""
+        conn = connect_to_database()
+        if not conn:
+            raise mysql.connector.Error(msg="Failed to connect to database")
+        
+        cursor = conn.cursor(dictionary=True)
         try:
-            conn = connect_to_database()
-            if not conn:
-                print("Failed to connect to database")
-                return
-                
-            cursor = conn.cursor(dictionary=True)
             query = """
                 SELECT o.order_id, o.order_date, o.total_price, COUNT(od.product_id) as item_count
                 FROM orders o
@@ -215,87 +269,86 @@ class HomeFrame(ctk.CTkFrame):
                 LIMIT 1
             """
             cursor.execute(query, (self.user_id,))
-            recent_order = cursor.fetchone()
-            
+            return cursor.fetchone()
+        finally:
             cursor.close()
             conn.close()
+    
+    def display_recent_order(self, recent_order):
+        """Display the recent order summary."""
+        if recent_order:
+            self.recent_order_frame = ctk.CTkFrame(self.inner_frame, fg_color="#f5f5f5", corner_radius=10)
+            self.recent_order_frame.pack(fill="x", padx=30, pady=(0, 20))
             
-            if recent_order:
-                self.recent_order_frame = ctk.CTkFrame(self.inner_frame, fg_color="#f5f5f5", corner_radius=10)
-                self.recent_order_frame.pack(fill="x", padx=30, pady=(0, 20))
-                
-                self.order_title = ctk.CTkLabel(
-                    self.recent_order_frame,
-                    text="Your Recent Order",
-                    font=("Arial", 16, "bold"),
-                    text_color="#333"
-                )
-                self.order_title.grid(row=0, column=0, columnspan=2, padx=20, pady=(15, 5), sticky="w")
-                
-                self.order_id_label = ctk.CTkLabel(
-                    self.recent_order_frame,
-                    text=f"Order #{recent_order['order_id']}",
-                    font=("Arial", 14),
-                    text_color="#555"
-                )
-                self.order_id_label.grid(row=1, column=0, padx=20, pady=5, sticky="w")
-                
-                order_date = recent_order['order_date']
-                date_str = order_date.strftime('%Y-%m-%d %H:%M') if order_date else "N/A"
-                
-                self.order_date_label = ctk.CTkLabel(
-                    self.recent_order_frame,
-                    text=f"Date: {date_str}",
-                    font=("Arial", 14),
-                    text_color="#555"
-                )
-                self.order_date_label.grid(row=2, column=0, padx=20, pady=5, sticky="w")
-                
-                self.order_items_label = ctk.CTkLabel(
-                    self.recent_order_frame,
-                    text=f"Items: {recent_order['item_count']}",
-                    font=("Arial", 14),
-                    text_color="#555"
-                )
-                self.order_items_label.grid(row=1, column=1, padx=20, pady=5, sticky="w")
-                
-                total_price = recent_order['total_price'] if recent_order['total_price'] is not None else 0
-                
-                self.order_total_label = ctk.CTkLabel(
-                    self.recent_order_frame,
-                    text=f"Total: ${total_price:.2f}",
-                    font=("Arial", 14, "bold"),
-                    text_color="#1a73e8"
-                )
-                self.order_total_label.grid(row=2, column=1, padx=20, pady=5, sticky="w")
-                
-                self.view_order_button = ctk.CTkButton(
-                    self.recent_order_frame,
-                    text="View Details",
-                    command=lambda: self.master.show_frame("orders"),
-                    width=120,
-                    height=30,
-                    corner_radius=8,
-                    fg_color="#1a73e8",
-                    hover_color="#005cb2"
-                )
-                self.view_order_button.grid(row=3, column=0, columnspan=2, padx=20, pady=(5, 15))
-                
-        except mysql.connector.Error as err:
-            print(f"Error fetching recent orders: {err}")
-            error_label = ctk.CTkLabel(
-                self.inner_frame,
-                text="Could not load recent orders",
+            self.order_title = ctk.CTkLabel(
+                self.recent_order_frame,
+                text="Your Recent Order",
+                font=("Arial", 16, "bold"),
+                text_color="#333"
+            )
+            self.order_title.grid(row=0, column=0, columnspan=2, padx=20, pady=(15, 5), sticky="w")
+            
+            self.order_id_label = ctk.CTkLabel(
+                self.recent_order_frame,
+                text=f"Order #{recent_order['order_id']}",
+                font=("Arial", 14),
+                text_color="#555"
+            )
+            self.order_id_label.grid(row=1, column=0, padx=20, pady=5, sticky="w")
+            
+            order_date = recent_order['order_date']
+            date_str = order_date.strftime('%Y-%m-%d %H:%M') if order_date else "N/A"
+            
+            self.order_date_label = ctk.CTkLabel(
+                self.recent_order_frame,
+                text=f"Date: {date_str}",
                 font=("Arial", 14),
-                text_color="#f44336"
+                text_color="#555"
             )
-            error_label.pack(pady=10)
-        except Exception as e:
-            print(f"Unexpected error in load_recent_orders: {e}")
-            error_label = ctk.CTkLabel(
-                self.inner_frame,
-                text="An error occurred loading order data",
+            self.order_date_label.grid(row=2, column=0, padx=20, pady=5, sticky="w")
+            
+            self.order_items_label = ctk.CTkLabel(
+                self.recent_order_frame,
+                text=f"Items: {recent_order['item_count']}",
                 font=("Arial", 14),
-                text_color="#f44336"
+                text_color="#555"
+            )
+            self.order_items_label.grid(row=1, column=1, padx=20, pady=5, sticky="w")
+            
+            total_price = recent_order['total_price'] if recent_order['total_price'] is not None else 0
+            
+            self.order_total_label = ctk.CTkLabel(
+                self.recent_order_frame,
+                text=f"Total: ${total_price:.2f}",
+                font=("Arial", 14, "bold"),
+                text_color="#1a73e8"
+            )
+            self.order_total_label.grid(row=2, column=1, padx=20, pady=5, sticky="w")
+            
+            self.view_order_button = ctk.CTkButton(
+                self.recent_order_frame,
+                text="View Details",
+                command=lambda: self.master.show_frame("orders"),
+                width=120,
+                height=30,
+                corner_radius=8,
+                fg_color="#1a73e8",
+                hover_color="#005cb2"
             )
-            error_label.pack(pady=10)
\ No newline at end of file
+            self.view_order_button.grid(row=3, column=0, columnspan=2, padx=20, pady=(5, 15))
+    
+    def display_recent_order_error(self, err):
+        """Show that the recent order summary could not be loaded."""
+        if isinstance(err, mysql.connector.Error):
+            print(f"Error fetching recent orders: {err}")
+            text = "Could not load recent orders"
+        else:
+            print(f"Unexpected error in load_recent_orders: {err}")
+            text = "An error occurred loading order data"
+        error_label = ctk.CTkLabel(
+            self.inner_frame,
+            text=text,
+            font=("Arial", 14),
+            text_color="#f44336"
+        )
+        error_label.pack(pady=10)
\ No newline at end of file
@@ -1,18 +1,126 @@
 import customtkinter as ctk
-from utils import connect_to_database, format_currency
-import mysql.connector
+from utils import get_connection, format_currency
+from thumbnails import thumbnail_cache
 from tkinter import messagebox
-from PIL import Image
-import os
+from background import background_tasks
+
+try:
+    from customer.cart_repository import cart_repository
+except ImportError:
+    from cart_repository import cart_repository
+
+
+def fetch_order_details(cursor, order_ids):
+    """Fetch the line items for several orders in one query, grouped by order_id."""
+    details_by_order = {order_id: [] for order_id in order_ids}
+    if not order_ids:
+        return details_by_order
+    
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    cursor.execute(f"""
+        SELECT 
+            od.order_id,
+            od.product_id, 
+            od.quantity, 
+            od.sub_total,
+            p.product_name, 
+            p.product_price 
+        FROM order_details od
+        JOIN products p ON od.product_id = p.product_id
+        WHERE od.order_id IN ({placeholders})
+        ORDER BY od.order_id, od.order_detail_id
+    """, tuple(order_ids))
+    
+    for item in cursor.fetchall():
+        details_by_order[item['order_id']].append(item)
+    return details_by_order
+
+
+def fetch_order_history(cursor, user_id, limit=None):
+    """Fetch a user's orders, most recent first, plus all their line items.
+    
+    Always two round-trips regardless of how many orders the user has.
+    Returns (orders, details_by_order).
+    """
+    query = """
+        SELECT 
+            order_id, 
+            order_date, 
+            total_price 
+        FROM orders 
+        WHERE user_id = %s 
+        ORDER BY order_date DESC
+    """
+    params = (user_id,)
+    if limit is not None:
+        query += " LIMIT %s"
+        params += (limit,)
+    
+    cursor.execute(query, params)
+    orders = cursor.fetchall()
+    
+    details_by_order = fetch_order_details(cursor, [order['order_id'] for order in orders])
+    return orders, details_by_order
+
+
+def fetch_order_page(cursor, user_id, after_key=None, limit=20):
+    """Fetch one page of a user's order headers using keyset pagination.
+    
+    Orders are sorted newest first by (order_date, order_id); after_key is the
+    (order_date, order_id) of the last order on the previous page. Each row
+    carries an item_count so cards can be drawn without loading line items.
+    The page of headers is picked first, straight off idx_orders_user_date,
+    and item counts are summed for those orders only, so a page costs the
+    same however long the user's history is.
+    """
+    query = """
+        SELECT order_id, order_date, total_price
+        FROM orders
+        WHERE user_id = %s
+    """
+    params = [user_id]
+    if after_key is not None:
+        last_date, last_id = after_key
+        query += " AND (order_date < %s OR (order_date = %s AND order_id < %s))"
+        params += [last_date, last_date, last_id]
+    query += """
+        ORDER BY order_date DESC, order_id DESC
+        LIMIT %s
+    """
+    params.append(limit)
+    
+    cursor.execute(f"""
+        SELECT 
+            page.order_id, 
+            page.order_date, 
+            page.total_price,
+            (
+                SELECT COALESCE(SUM(od.quantity), 0)
+                FROM order_details od
+                WHERE od.order_id = page.order_id
+            ) AS item_count
+        FROM ({query}) AS page
+        ORDER BY page.order_date DESC, page.order_id DESC
+    """, tuple(params))
+    return cursor.fetchall()
 
 
 class OrdersFrame(ctk.CTkFrame):
-    def __init__(self, master, user_id):
+    def __init__(self, master, user_id, page_size=20, infinite_scroll=True):
         super().__init__(master)
         self.master = master
         self.user_id = user_id
+        self.page_size = page_size
+        self.infinite_scroll = infinite_scroll
         self.configure(fg_color="#f0f0f0")
         
+        # Pagination state
+        self.last_order_key = None
+        self.has_more_orders = False
+        self.loading_page = False
+        self.loading_label = None
+        self.load_more_button = None
+        
         # Header frame
         self.header_frame = ctk.CTkFrame(self, fg_color="white", corner_radius=0, height=60)
         self.header_frame.pack(fill="x", pady=(0, 20))
@@ -34,71 +142,126 @@ class OrdersFrame(ctk.CTkFrame):
         )
         self.orders_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
+        # Fetch the next page when the user scrolls near the bottom
+        if self.infinite_scroll:
+            self.orders_frame._parent_canvas.configure(yscrollcommand=self.on_orders_scroll)
+        
         # Load orders
         self.load_orders()
     
     def load_orders(self):
-        """Load orders from the database and display them."""
+        """Reset the order list and load the first page."""
+        # Pages still loading for the old list are no longer wanted
+        background_tasks.cancel_group(self)
+        
         # Clear existing orders
         for widget in self.orders_frame.winfo_children():
             widget.destroy()
         
+        self.last_order_key = None
+        self.has_more_orders = False
+        self.loading_page = False
+        self.load_more_button = None
+        self.load_next_page()
+    
+    def load_next_page(self):
+        """Load the next page of orders in the background."""
+        if self.loading_page:
+            return
+        self.loading_page = True
+        
+        if self.load_more_button:
+            self.load_more_button.configure(text="Loading...", state="disabled")
+        elif self.last_order_key is None:
+            self.loading_label = ctk.CTkLabel(
+                self.orders_frame,
+                text="Loading orders...",
+                font=("Arial", 14),
+                text_color="#555"
+            )
+            self.loading_label.pack(pady=50)
+        
+        background_tasks.submit(
+            self,
+            self.fetch_next_page,
+            self.last_order_key,
+            on_success=self.display_page,
+            on_error=self.display_load_error
+        )
+    
+    def fetch_next_page(self, after_key):
+        """Fetch the page after after_key plus one extra row; runs on a worker thread."""
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
         try:
-            conn = connect_to_database()
-            cursor = conn.cursor(dictionary=True)
-            
-            # Get all user's orders, most recent first
-            cursor.execute("""
-                SELECT 
-                    order_id, 
-                    order_date, 
-                    total_price 
-                FROM orders 
-                WHERE user_id = %s 
-                ORDER BY order_date DESC
-            """, (self.user_id,))
-            
-            orders = cursor.fetchall()
-            
-            if not orders:
-                # No orders found
-                self.display_no_orders()
-                cursor.close()
-                conn.close()
-                return
-            
-            # Display each order
-            for order in orders:
-                # Get order details
-                cursor.execute("""
-                    SELECT 
-                        od.product_id, 
-                        od.quantity, 
-                        od.sub_total,
-                        p.product_name, 
-                        p.product_price 
-                    FROM order_details od
-                    JOIN products p ON od.product_id = p.product_id
-                    WHERE od.order_id = %s
-                """, (order['order_id'],))
-                
-                order_details = cursor.fetchall()
-                
-                # Create and display order card
-                self.create_order_card(order, order_details)
-            
+            # Ask for one extra row to learn whether another page exists
+            return fetch_order_page(cursor, self.user_id, after_key, self.page_size + 1)
+        finally:
             cursor.close()
             conn.close()
-            
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            error_label = ctk.CTkLabel(
+    
+    def display_page(self, orders):
+        """Append a loaded page of order cards."""
+        self.loading_page = False
+        if self.last_order_key is None:
+            self.loading_label.destroy()
+        
+        has_more = len(orders) > self.page_size
+        orders = orders[:self.page_size]
+        
+        if not orders and self.last_order_key is None:
+            # No orders found
+            self.display_no_orders()
+            return
+        
+        if self.load_more_button:
+            self.load_more_button.destroy()
+            self.load_more_button = None
+        
+        # Display each order
+        for order in orders:
+            self.create_order_card(order)
+        
+        if orders:
+            self.last_order_key = (orders[-1]['order_date'], orders[-1]['order_id'])
+        self.has_more_orders = has_more
+        
+        if has_more:
+            self.load_more_button = ctk.CTkButton(
                 self.orders_frame,
-                text=f"Error loading orders: {err}",
-                font=("Arial", 14),
-                text_color="red"
+                text="Load More",
+                command=self.load_next_page,
+                width=150,
+                height=36,
+                corner_radius=8,
+                fg_color="#1a73e8",
+                hover_color="#005cb2"
             )
-            error_label.pack(pady=50)
+            self.load_more_button.pack(pady=(10, 20))
+    
+    def display_load_error(self, err):
+        """Show a failed page load below the orders already listed."""
+        self.loading_page = False
+        if self.last_order_key is None:
+            self.loading_label.destroy()
+        if self.load_more_button:
+            self.load_more_button.configure(text="Load More", state="normal")
+        
+        print(f"Database error: {err}")
+        error_label = ctk.CTkLabel(
+            self.orders_frame,
+            text=f"Error loading orders: {err}",
+            font=("Arial", 14),
+            text_color="red"
+        )
+        error_label.pack(pady=50)
+    
+    def on_orders_scroll(self, first, last):
+        """Keep the scrollbar in sync and load more orders near the bottom."""
+        self.orders_frame._scrollbar.set(first, last)
+        if self.has_more_orders and not self.loading_page and float(last) >= 0.95:
+            # Defer so the page loads outside the scroll callback
+            self.after_idle(self.load_next_page)
     
     def display_no_orders(self):
         """Display message when no orders are found."""
@@ -130,8 +293,8 @@ class OrdersFrame(ctk.CTkFrame):
         )
         shop_button.pack(pady=10)
     
-    def create_order_card(self, order, order_details):
-        """Create and display an order card with its details."""
+    def create_order_card(self, order):
+        """Create and display an order card; line items load on first expand."""
         # Main order card
         order_card = ctk.CTkFrame(
             self.orders_frame,
@@ -163,18 +326,46 @@ class OrdersFrame(ctk.CTkFrame):
         
         # Order details container
         details_visible = ctk.BooleanVar(value=False)
+        details_loaded = ctk.BooleanVar(value=False)
         details_container = ctk.CTkFrame(order_card, fg_color="transparent")
         
         # Toggle button for expanding/collapsing details
+        def show_details():
+            details_container.pack(fill="x", padx=10, pady=(0, 10))
+            toggle_button.configure(text="Hide Details", state="normal")
+            details_visible.set(True)
+        
+        def on_details_loaded(order_details):
+            for item in order_details:
+                self.create_order_item(details_container, item)
+            details_loaded.set(True)
+            show_details()
+        
+        def on_details_error(err):
+            print(f"Database error: {err}")
+            toggle_button.configure(text="Show Details", state="normal")
+            messagebox.showerror("Error", f"Could not load order details: {err}")
+        
         def toggle_details():
+            if not details_loaded.get():
+                # Line items are fetched in the background on first expand
+                toggle_button.configure(text="Loading...", state="disabled")
+                background_tasks.submit(
+                    toggle_button,
+                    self.fetch_order_items,
+                    order['order_id'],
+                    on_success=on_details_loaded,
+                    on_error=on_details_error,
+                    group=self
+                )
+                return
+            
             if details_visible.get():
                 details_container.pack_forget()
                 toggle_button.configure(text="Show Details")
                 details_visible.set(False)
             else:
-                details_container.pack(fill="x", padx=10, pady=(0, 10))
-                toggle_button.configure(text="Hide Details")
-                details_visible.set(True)
+                show_details()
         
         toggle_button = ctk.CTkButton(
             order_card,
@@ -192,7 +383,7 @@ class OrdersFrame(ctk.CTkFrame):
         summary_frame = ctk.CTkFrame(order_card, fg_color="transparent")
         summary_frame.pack(fill="x", padx=15, pady=10)
         
-        items_count = sum(item['quantity'] for item in order_details)
+        items_count = int(order['item_count'])
         items_text = f"{items_count} item{'s' if items_count != 1 else ''}"
         
         items_label = ctk.CTkLabel(
@@ -211,65 +402,80 @@ class OrdersFrame(ctk.CTkFrame):
         )
         total_label.pack(side="right")
         
-        # Order details (initially hidden)
-        for item in order_details:
-            item_frame = ctk.CTkFrame(details_container, fg_color="#f9f9f9", corner_radius=5)
-            item_frame.pack(fill="x", padx=10, pady=5)
-            
-            # Product image or placeholder
-            image_path = os.path.join("images", "products", f"{item['product_id']}.png")
-            if os.path.exists(image_path):
-                try:
-                    product_image = Image.open(image_path)
-                    product_image = product_image.resize((50, 50))
-                    photo = ctk.CTkImage(light_image=product_image, size=(50, 50))
-                    image_label = ctk.CTkLabel(item_frame, image=photo, text="")
-                    image_label.image = photo  # Keep a reference
-                    image_label.pack(side="left", padx=(10, 15), pady=10)
-                except Exception as e:
-                    print(f"Error loading image {image_path}: {e}")
-                    # If image fails to load, show product name initials
-                    self._create_item_text_only(item_frame, item)
-            else:
-                # If no image exists, use text-only layout
-                self._create_item_text_only(item_frame, item)
-            
-            # Product info
-            info_frame = ctk.CTkFrame(item_frame, fg_color="transparent")
-            info_frame.pack(side="left", fill="both", expand=True, padx=0, pady=10)
-            
-            # Product name
-            name_label = ctk.CTkLabel(
-                info_frame,
-                text=item['product_name'],
-                font=("Arial", 14),
-                text_color="#333",
-                anchor="w"
-            )
-            name_label.pack(anchor="w")
-            
-            # Quantity and price
-            price_label = ctk.CTkLabel(
-                info_frame,
-                text=f"{format_currency(item['product_price'])} × {item['quantity']} = {format_currency(item['sub_total'])}",
-                font=("Arial", 12),
-                text_color="#555",
-                anchor="w"
-            )
-            price_label.pack(anchor="w")
-            
-            # Buy Again button
-            buy_again_button = ctk.CTkButton(
-                item_frame,
-                text="Buy Again",
-                command=lambda product_id=item['product_id']: self.add_to_cart(product_id),
-                width=100,
-                height=30,
-                corner_radius=8,
-                fg_color="#4CAF50",
-                hover_color="#388E3C"
-            )
-            buy_again_button.pack(side="right", padx=15, pady=10)
+        # Reorder adds every line of this order to the cart at once
+        reorder_button = ctk.CTkButton(
+            summary_frame,
+            text="Reorder",
+            width=100,
+            height=30,
+            corner_radius=8,
+            fg_color="#4CAF50",
+            hover_color="#388E3C"
+        )
+        reorder_button.configure(command=lambda: self.reorder(order['order_id'], reorder_button))
+        reorder_button.pack(side="right", padx=(0, 20))
+    
+    def fetch_order_items(self, order_id):
+        """Fetch an order's line items; runs on a worker thread."""
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            return fetch_order_details(cursor, [order_id])[order_id]
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def create_order_item(self, details_container, item):
+        """Create the row for a single order line item."""
+        item_frame = ctk.CTkFrame(details_container, fg_color="#f9f9f9", corner_radius=5)
+        item_frame.pack(fill="x", padx=10, pady=5)
+        
+        # Product image or placeholder
+        photo = thumbnail_cache.get(item['product_id'], (50, 50))
+        if photo:
+            image_label = ctk.CTkLabel(item_frame, image=photo, text="")
+            image_label.image = photo  # Keep a reference
+            image_label.pack(side="left", padx=(10, 15), pady=10)
+        else:
+            # If no image exists, use text-only layout
+            self._create_item_text_only(item_frame, item)
+        
+        # Product info
+        info_frame = ctk.CTkFrame(item_frame, fg_color="transparent")
+        info_frame.pack(side="left", fill="both", expand=True, padx=0, pady=10)
+        
+        # Product name
+        name_label = ctk.CTkLabel(
+            info_frame,
+            text=item['product_name'],
+            font=("Arial", 14),
+            text_color="#333",
+            anchor="w"
+        )
+        name_label.pack(anchor="w")
+        
+        # Quantity and price
+        price_label = ctk.CTkLabel(
+            info_frame,
+            text=f"{format_currency(item['product_price'])} × {item['quantity']} = {format_currency(item['sub_total'])}",
+            font=("Arial", 12),
+            text_color="#555",
+            anchor="w"
+        )
+        price_label.pack(anchor="w")
+        
+        # Buy Again button
+        buy_again_button = ctk.CTkButton(
+            item_frame,
+            text="Buy Again",
+            width=100,
+            height=30,
+            corner_radius=8,
+            fg_color="#4CAF50",
+            hover_color="#388E3C"
+        )
+        buy_again_button.configure(command=lambda: self.add_to_cart(item, buy_again_button))
+        buy_again_button.pack(side="right", padx=15, pady=10)
     
     def _create_item_text_only(self, parent_frame, item):
         """Create a text-only placeholder for product image."""
@@ -285,69 +491,78 @@ class OrdersFrame(ctk.CTkFrame):
         )
         text_label.pack(side="left", padx=(10, 15), pady=10)
     
-    def add_to_cart(self, product_id):
-        """Add a product to the cart from order history."""
-        try:
-            conn = connect_to_database()
-            cursor = conn.cursor(dictionary=True)
-            
-            # Get product details
-            cursor.execute("SELECT * FROM products WHERE product_id = %s", (product_id,))
-            product = cursor.fetchone()
-            
-            if not product:
-                messagebox.showerror("Error", "Product not found.")
-                cursor.close()
-                conn.close()
-                return
-            
-            if product['stock_quantity'] <= 0:
+    def add_to_cart(self, item, button):
+        """Add a product to the cart from order history in the background."""
+        button.configure(text="Adding...", state="disabled")
+        
+        def done(added):
+            button.configure(text="Buy Again", state="normal")
+            if not added:
                 messagebox.showerror("Out of Stock", "Sorry, this product is currently out of stock.")
-                cursor.close()
-                conn.close()
                 return
-            
-            # Check if user has an active cart
-            cursor.execute("SELECT cart_id FROM shopping_carts WHERE user_id = %s AND status = 'active'", (self.user_id,))
-            cart_result = cursor.fetchone()
-            
-            if cart_result:
-                cart_id = cart_result['cart_id']
-            else:
-                # Create a new cart
-                cursor.execute(
-                    "INSERT INTO shopping_carts (user_id, status, created_at) VALUES (%s, 'active', NOW())",
-                    (self.user_id,)
-                )
-                cart_id = cursor.lastrowid
-            
-            # Check if the product is already in the cart
-            cursor.execute(
-                "SELECT quantity FROM cart_items WHERE cart_id = %s AND product_id = %s",
-                (cart_id, product_id)
-            )
-            existing_item = cursor.fetchone()
-            
-            if existing_item:
-                # Update quantity of existing item
-                new_quantity = existing_item['quantity'] + 1
-                cursor.execute(
-                    "UPDATE cart_items SET quantity = %s WHERE cart_id = %s AND product_id = %s",
-                    (new_quantity, cart_id, product_id)
-                )
-            else:
-                # Add new item to cart
-                cursor.execute(
-                    "INSERT INTO cart_items (cart_id, product_id, quantity, added_at) VALUES (%s, %s, %s, NOW())",
-                    (cart_id, product_id, 1)
-                )
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
-            messagebox.showinfo("Added to Cart", f"{product['product_name']} has been added to your cart.")
-            
-        except mysql.connector.Error as err:
+            messagebox.showinfo("Added to Cart", f"{item['product_name']} has been added to your cart.")
+        
+        def failed(err):
+            button.configure(text="Buy Again", state="normal")
             print(f"Database error: {err}")
-            messagebox.showerror("Error", f"Could not add item to cart: {err}")
\ No newline at end of file
+            messagebox.showerror("Error", f"Could not add item to cart: {err}")
+        
+        # Finds or creates the active cart and upserts the line in one transaction
+        background_tasks.submit(
+            button,
+            cart_repository.add_item,
+            self.user_id,
+            item['product_id'],
+            on_success=done,
+            on_error=failed
+        )
+    
+    def reorder(self, order_id, button):
+        """Add all items of a past order to the cart in the background."""
+        button.configure(text="Adding...", state="disabled")
+        
+        def done(results):
+            button.configure(text="Reorder", state="normal")
+            self.show_reorder_summary(results)
+        
+        def failed(err):
+            button.configure(text="Reorder", state="normal")
+            print(f"Database error: {err}")
+            messagebox.showerror("Error", f"Could not reorder: {err}")
+        
+        # Own group so switching tabs doesn't hide the outcome of a write
+        background_tasks.submit(
+            button,
+            cart_repository.add_order,
+            self.user_id,
+            order_id,
+            on_success=done,
+            on_error=failed
+        )
+    
+    def show_reorder_summary(self, results):
+        """Tell the user what was added and what could not be."""
+        if not results:
+            messagebox.showinfo("Reorder", "This order has no items to add.")
+            return
+        
+        lines = []
+        for result in results:
+            name = result['product_name'] or f"Product #{result['product_id']}"
+            if result['status'] == "added":
+                lines.append(f"✓ {name} × {result['added']}")
+            elif result['status'] == "partial":
+                lines.append(f"~ {name} × {result['added']} (only {result['added']} of {result['requested']} in stock)")
+            elif result['status'] == "out_of_stock":
+                lines.append(f"✗ {name} (out of stock)")
+            else:
+                lines.append(f"✗ {name} (no longer available)")
+        
+        added = sum(1 for result in results if result['added'])
+        if added == len(results):
+            title = "Added to Cart"
+        elif added:
+            title = "Partially Added to Cart"
+        else:
+            title = "Nothing Added"
+        messagebox.showinfo(title, "\n".join(lines))
\ No newline at end of file
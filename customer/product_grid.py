@@ -0,0 +1,249 @@
+import customtkinter as ctk
+import tkinter as tk
+from utils import format_currency
+from thumbnails import thumbnail_cache
+
+
+class ProductCard(ctk.CTkFrame):
+    """A reusable product card whose widgets are rebound to different products."""
+    
+    def __init__(self, master, on_add_to_cart):
+        super().__init__(master, width=240, height=340, fg_color="white", corner_radius=10)
+        self.on_add_to_cart = on_add_to_cart
+        self.product = None
+        self.busy = False  # An add to cart for this product is in flight
+        self.grid_propagate(False)
+        
+        # Image area
+        self.image_frame = ctk.CTkFrame(self, fg_color="#f5f5f5", width=200, height=150, corner_radius=5)
+        self.image_frame.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="nsew")
+        
+        self.image_label = ctk.CTkLabel(
+            self.image_frame,
+            text="",
+            font=("Arial", 14, "bold"),
+            text_color="#555"
+        )
+        self.image_label.place(relx=0.5, rely=0.5, anchor="center")
+        
+        # Product name
+        self.name_label = ctk.CTkLabel(self, text="", font=("Arial", 16, "bold"), text_color="#333")
+        self.name_label.grid(row=1, column=0, padx=20, pady=(10, 5), sticky="w")
+        
+        # Product price
+        self.price_label = ctk.CTkLabel(self, text="", font=("Arial", 14), text_color="#1a73e8")
+        self.price_label.grid(row=2, column=0, padx=20, pady=5, sticky="w")
+        
+        # Product stock
+        self.stock_label = ctk.CTkLabel(self, text="", font=("Arial", 12))
+        self.stock_label.grid(row=3, column=0, padx=20, pady=5, sticky="w")
+        
+        # Add to cart button - disabled if out of stock
+        self.add_to_cart_button = ctk.CTkButton(
+            self,
+            text="Add to Cart",
+            command=lambda: self.on_add_to_cart(self.product),
+            width=200,
+            height=35,
+            corner_radius=8,
+            fg_color="#4CAF50",
+            hover_color="#388E3C"
+        )
+        self.add_to_cart_button.grid(row=4, column=0, padx=20, pady=(10, 20))
+    
+    def bind_product(self, product):
+        """Show the given product on this card."""
+        if product == self.product:
+            return  # Already showing this exact row
+        self.product = product
+        
+        product_name = product["product_name"]
+        product_stock = product["stock_quantity"]
+        
+        photo = self.load_product_image(product["product_id"])
+        if photo:
+            self.image_label.configure(image=photo, text="")
+            self.image_label.image = photo  # Keep a reference
+        else:
+            # If no image exists, display text with product name
+            self.image_label.configure(image=None, text=product_name)
+            self.image_label.image = None
+        
+        self.name_label.configure(text=product_name)
+        self.price_label.configure(text=format_currency(product["product_price"]))
+        
+        if product_stock > 0:
+            self.stock_label.configure(text=f"In Stock: {product_stock}", text_color="#4CAF50")
+        else:
+            self.stock_label.configure(text="Out of Stock", text_color="#f44336")
+        self.update_button()
+    
+    def set_busy(self, busy):
+        """Show or clear the in-progress state of the add to cart button."""
+        if busy != self.busy:
+            self.busy = busy
+            self.update_button()
+    
+    def update_button(self):
+        if self.busy:
+            self.add_to_cart_button.configure(text="Adding...", state="disabled")
+        elif self.product["stock_quantity"] > 0:
+            self.add_to_cart_button.configure(text="Add to Cart", state="normal")
+        else:
+            self.add_to_cart_button.configure(text="Add to Cart", state="disabled")
+    
+    def load_product_image(self, product_id):
+        """Return the cached product thumbnail, or None if the product has no image."""
+        return thumbnail_cache.get(product_id, (180, 140))
+
+
+class VirtualProductGrid(ctk.CTkFrame):
+    """A scrollable product grid that only materializes cards for visible rows.
+    
+    Cards scrolled out of view are hidden and rebound to the products that
+    scroll into view, so the widget count depends on the viewport size rather
+    than the catalog size. Cards are keyed by product, so when the result set
+    changes (e.g. while typing a search) products still in view keep their
+    card and only cards for products that appeared or disappeared change.
+    """
+    
+    def __init__(self, master, on_add_to_cart, columns=3, card_width=240, card_height=340, padding=10,
+                 fg_color="#f0f0f0"):
+        super().__init__(master, fg_color=fg_color)
+        self.on_add_to_cart = on_add_to_cart
+        self.columns = columns
+        self.card_width = card_width
+        self.card_height = card_height
+        self.padding = padding
+        self.row_height = card_height + 2 * padding
+        
+        self.products = []
+        self.busy_products = set()  # product_ids with an add to cart in flight
+        self.visible_cards = {}  # product_id -> card
+        self.spare_cards = []
+        self.card_windows = {}  # card -> canvas window id
+        self.card_positions = {}  # card -> product index it is placed at
+        
+        self.canvas = tk.Canvas(self, bg=fg_color, highlightthickness=0, yscrollincrement=20)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        
+        # Message shown instead of cards (empty results, errors)
+        self.message_label = ctk.CTkLabel(self.canvas, text="", font=("Arial", 16), text_color="#555")
+        
+        self.canvas.bind("<Configure>", lambda event: self.render())
+        
+        # Wheel events go to the widget under the pointer, usually a card
+        self.canvas.bind_all("<MouseWheel>", self.on_mousewheel, add="+")
+        self.canvas.bind_all("<Button-4>", self.on_mousewheel, add="+")
+        self.canvas.bind_all("<Button-5>", self.on_mousewheel, add="+")
+    
+    def set_products(self, products):
+        """Replace the products shown in the grid and scroll back to the top."""
+        products = list(products)
+        if products and products == self.products:
+            return  # Nothing changed; keep the scroll position
+        
+        self.message_label.place_forget()
+        self.products = products
+        rows = (len(self.products) + self.columns - 1) // self.columns
+        self.canvas.configure(scrollregion=(0, 0, self.columns * (self.card_width + 2 * self.padding),
+                                            rows * self.row_height))
+        self.canvas.yview_moveto(0)
+        self.render()
+    
+    def show_message(self, text, text_color="#555"):
+        """Hide all cards and show a message in the middle of the grid."""
+        self.set_products([])
+        self.message_label.configure(text=text, text_color=text_color)
+        self.message_label.place(relx=0.5, rely=0.2, anchor="center")
+    
+    def visible_range(self):
+        """Return the range of product indexes intersecting the viewport."""
+        if not self.products:
+            return range(0)
+        rows = (len(self.products) + self.columns - 1) // self.columns
+        total_height = rows * self.row_height
+        top = self.canvas.yview()[0] * total_height
+        bottom = top + max(self.canvas.winfo_height(), 1)
+        
+        first_row = max(int(top // self.row_height), 0)
+        last_row = min(int(bottom // self.row_height), rows - 1)
+        return range(first_row * self.columns, min((last_row + 1) * self.columns, len(self.products)))
+    
+    def render(self):
+        """Bind cards to the products in view and recycle the rest."""
+        wanted = {self.products[index]["product_id"]: index for index in self.visible_range()}
+        
+        # Recycle cards whose product scrolled out of view or left the results
+        for product_id in list(self.visible_cards):
+            if product_id not in wanted:
+                card = self.visible_cards.pop(product_id)
+                self.canvas.itemconfigure(self.card_windows[card], state="hidden")
+                self.spare_cards.append(card)
+        
+        for product_id, index in wanted.items():
+            card = self.visible_cards.get(product_id)
+            if card is None:
+                card = self.take_spare_card(product_id)
+                self.visible_cards[product_id] = card
+                self.canvas.itemconfigure(self.card_windows[card], state="normal")
+            if self.card_positions.get(card) != index:
+                self.card_positions[card] = index
+                row, column = divmod(index, self.columns)
+                self.canvas.coords(
+                    self.card_windows[card],
+                    column * (self.card_width + 2 * self.padding) + self.padding,
+                    row * self.row_height + self.padding
+                )
+            card.bind_product(self.products[index])
+            card.set_busy(product_id in self.busy_products)
+    
+    def set_busy(self, product_id, busy):
+        """Mark a product as being added to the cart, on its card if it is in view."""
+        if busy:
+            self.busy_products.add(product_id)
+        else:
+            self.busy_products.discard(product_id)
+        card = self.visible_cards.get(product_id)
+        if card is not None:
+            card.set_busy(busy)
+    
+    def take_spare_card(self, product_id):
+        """Return a hidden card, preferring one that last showed this product."""
+        for i, card in enumerate(self.spare_cards):
+            if card.product is not None and card.product["product_id"] == product_id:
+                return self.spare_cards.pop(i)
+        return self.spare_cards.pop() if self.spare_cards else self.create_card()
+    
+    def create_card(self):
+        card = ProductCard(self.canvas, on_add_to_cart=self.on_add_to_cart)
+        self.card_windows[card] = self.canvas.create_window(
+            0, 0,
+            window=card,
+            anchor="nw",
+            width=self.card_width,
+            height=self.card_height,
+            state="hidden"
+        )
+        return card
+    
+    def on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self.render()
+    
+    def on_mousewheel(self, event):
+        # Only scroll when the pointer is over this grid
+        if not self.winfo_ismapped() or not str(event.widget).startswith(str(self.canvas)):
+            return
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.canvas.yview_scroll(delta * 3, "units")
+        self.render()
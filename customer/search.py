@@ -0,0 +1,206 @@
+import math
+import re
+
+# Field weights: a hit in the product name counts more than one in the category
+NAME_WEIGHT = 2.0
+CATEGORY_WEIGHT = 1.0
+
+# How much a match is worth relative to an exact term match
+PREFIX_QUALITY = 0.7
+TYPO_QUALITY = 0.5
+
+# Shortest query token that is expanded to prefix and typo matches
+MIN_PREFIX_LENGTH = 2
+MIN_TYPO_LENGTH = 4
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Product columns the index is built from
+INDEXED_FIELDS = ("product_name", "product_category")
+
+
+def tokenize(text):
+    """Split text into casefolded word tokens."""
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+def deletes(term):
+    """Return every variant of term with one character removed."""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def edit_distance(a, b, limit=1):
+    """Optimal string alignment distance between a and b, capped at limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class PrefixTrie:
+    """Character trie over the index vocabulary for prefix lookups."""
+    
+    __slots__ = ("children", "is_term")
+    
+    def __init__(self):
+        self.children = {}
+        self.is_term = False
+    
+    def insert(self, term):
+        node = self
+        for char in term:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = PrefixTrie()
+            node = child
+        node.is_term = True
+    
+    def terms_with_prefix(self, prefix):
+        """Return every inserted term starting with prefix."""
+        node = self
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        
+        terms = []
+        stack = [(node, prefix)]
+        while stack:
+            node, term = stack.pop()
+            if node.is_term:
+                terms.append(term)
+            for char, child in node.children.items():
+                stack.append((child, term + char))
+        return terms
+
+
+class ProductSearchIndex:
+    """Inverted index over product names and categories with ranked results.
+    
+    Every query token must match a product, either exactly, as a prefix of
+    an indexed word or within one typo (insertion, deletion, substitution or
+    transposition). Matches are scored by field weight, match quality and
+    how rare the word is, with a bonus when the whole query appears in the
+    product name. Ties keep the order the products were indexed in. When no
+    product matches every token, products matching the most tokens are
+    returned instead.
+    """
+    
+    def __init__(self, products=()):
+        self._products = {}
+        self._position = {}
+        self._names = {}  # product_id -> normalized name for phrase bonuses
+        self._postings = {}  # term -> {product_id: weight}
+        self._trie = PrefixTrie()  # vocabulary, for prefix lookups
+        self._deletes = {}  # one-deletion variant -> terms, for typo lookups
+        self.build(products)
+    
+    def build(self, products):
+        """Index the given products, replacing anything indexed before."""
+        self._products = {}
+        self._position = {}
+        self._names = {}
+        self._postings = {}
+        for position, product in enumerate(products):
+            product_id = product["product_id"]
+            self._products[product_id] = product
+            self._position[product_id] = position
+            self._names[product_id] = " ".join(tokenize(product["product_name"] or ""))
+            for field, weight in zip(INDEXED_FIELDS, (NAME_WEIGHT, CATEGORY_WEIGHT)):
+                for term in tokenize(product[field] or ""):
+                    postings = self._postings.setdefault(term, {})
+                    postings[product_id] = postings.get(product_id, 0) + weight
+        
+        self._trie = PrefixTrie()
+        self._deletes = {}
+        for term in self._postings:
+            self._trie.insert(term)
+            if len(term) >= MIN_TYPO_LENGTH - 1:
+                for variant in deletes(term):
+                    self._deletes.setdefault(variant, []).append(term)
+    
+    def update_products(self, products):
+        """Swap in newer rows for indexed products whose name and category are unchanged."""
+        for product in products:
+            if product["product_id"] in self._products:
+                self._products[product["product_id"]] = product
+    
+    def __len__(self):
+        return len(self._products)
+    
+    def _idf(self, term):
+        return math.log(1 + len(self._products) / len(self._postings[term]))
+    
+    def expand(self, token):
+        """Return {term: quality} for every indexed term the query token matches."""
+        matches = {}
+        if token in self._postings:
+            matches[token] = 1.0
+        
+        if len(token) >= MIN_PREFIX_LENGTH:
+            for term in self._trie.terms_with_prefix(token):
+                matches.setdefault(term, PREFIX_QUALITY)
+        
+        if len(token) >= MIN_TYPO_LENGTH:
+            # Terms one edit away share a one-deletion variant with the token
+            candidates = set(self._deletes.get(token, ()))
+            for variant in deletes(token) | {token}:
+                if variant in self._postings:
+                    candidates.add(variant)
+                candidates.update(self._deletes.get(variant, ()))
+            for term in candidates:
+                if term not in matches and edit_distance(token, term) <= 1:
+                    matches[term] = TYPO_QUALITY
+        return matches
+    
+    def search(self, query, limit=None):
+        """Return the products matching query, best match first."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        
+        scores = {}  # product_id -> [tokens matched, score]
+        for token in tokens:
+            token_scores = {}
+            for term, quality in self.expand(token).items():
+                idf = self._idf(term)
+                for product_id, weight in self._postings[term].items():
+                    score = quality * weight * idf
+                    if score > token_scores.get(product_id, 0):
+                        token_scores[product_id] = score
+            for product_id, score in token_scores.items():
+                entry = scores.setdefault(product_id, [0, 0.0])
+                entry[0] += 1
+                entry[1] += score
+        
+        if not scores:
+            return []
+        
+        best_count = max(entry[0] for entry in scores.values())
+        phrase = " ".join(tokens)
+        ranked = []
+        for product_id, (count, score) in scores.items():
+            if count < best_count:
+                continue
+            name = self._names[product_id]
+            if name.startswith(phrase):
+                score *= 1.5
+            elif phrase in name:
+                score *= 1.2
+            ranked.append((-score, self._position[product_id], product_id))
+        
+        ranked.sort()
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self._products[product_id] for _, _, product_id in ranked]
@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector.errors import PoolError
+
+from config import Config
+
+
+class PoolTimeoutError(PoolError):
+    """Raised when no pooled connection becomes free within the checkout timeout."""
+
+
+class PooledConnection:
+    """Wraps a MySQL connection so that close() hands it back to the pool."""
+
+    def __init__(self, pool, raw_conn):
+        self._pool = pool
+        self._conn = raw_conn
+        self._closed = False
+
+    def __getattr__(self, name):
+        if self._closed:
+            raise PoolError("Connection has already been returned to the pool")
+        return getattr(self._conn, name)
+
+    def close(self):
+        """Return the connection to the pool instead of closing the socket."""
+        if self._closed:
+            return
+        self._closed = True
+        self._pool._release(self._conn)
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # Callers that return early without close() must not leak a pool slot
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """A size-bounded, thread-safe pool of MySQL connections."""
+
+    def __init__(self, size, max_idle_time, checkout_timeout, health_check_interval, **connect_args):
+        self.size = size
+        self.max_idle_time = max_idle_time
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self.connect_args = connect_args
+
+        self._idle = deque()  # (connection, last_used) pairs, most recently used on the right
+        self._total = 0
+        self._cond = threading.Condition()
+
+        # Counters exposed through stats()
+        self._created = 0
+        self._discarded = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+
+    def get_connection(self, timeout=None):
+        """Check out a connection, waiting up to `timeout` seconds if the pool is exhausted."""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._idle:
+                        raw_conn, last_used = self._idle.pop()
+                        break
+
+                    if self._total < self.size:
+                        # Reserve the slot now and open the socket outside the lock
+                        self._total += 1
+                        raw_conn = None
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available after {timeout} seconds "
+                            f"(pool size {self.size})"
+                        )
+                    self._waits += 1
+                    self._cond.wait(remaining)
+
+            if raw_conn is None:
+                break
+
+            # Checked outside the lock so a slow ping doesn't hold up other checkouts
+            if not self._is_usable(raw_conn, time.monotonic() - last_used):
+                self._discard(raw_conn)
+                continue
+
+            with self._cond:
+                self._checkouts += 1
+            return PooledConnection(self, raw_conn)
+
+        try:
+            raw_conn = mysql.connector.connect(**self.connect_args)
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._created += 1
+            self._checkouts += 1
+        return PooledConnection(self, raw_conn)
+
+    def _is_usable(self, raw_conn, idle_for):
+        """Return whether an idle connection can be handed out, pinging it if it sat for a while."""
+        if idle_for > self.max_idle_time:
+            return False
+        return idle_for <= self.health_check_interval or self._is_healthy(raw_conn)
+
+    def _is_healthy(self, raw_conn):
+        """Ping the server to make sure an idle connection is still usable."""
+        try:
+            raw_conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, raw_conn):
+        """Close a connection and free its slot. Caller must not hold the lock."""
+        try:
+            raw_conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._total -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+    def _release(self, raw_conn):
+        """Reset a returned connection and put it back in the idle queue."""
+        try:
+            # Never leak an open transaction (or its snapshot) to the next user
+            if raw_conn.in_transaction:
+                raw_conn.rollback()
+            reusable = raw_conn.is_connected()
+        except Exception:
+            reusable = False
+
+        if not reusable:
+            self._discard(raw_conn)
+            return
+        with self._cond:
+            self._idle.append((raw_conn, time.monotonic()))
+            self._cond.notify()
+
+    def stats(self):
+        """Return a snapshot of pool usage counters."""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self.size,
+                "open": self._total,
+                "idle": idle,
+                "in_use": self._total - idle,
+                "created": self._created,
+                "discarded": self._discarded,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+            }
+
+    def close_all(self):
+        """Close every idle connection. Checked-out connections are closed when released."""
+        with self._cond:
+            idle = [raw_conn for raw_conn, _ in self._idle]
+            self._idle.clear()
+        for raw_conn in idle:
+            self._discard(raw_conn)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        # A forked child must not share sockets with its parent
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool(
+                size=Config.pool_size,
+                max_idle_time=Config.pool_max_idle_time,
+                checkout_timeout=Config.pool_checkout_timeout,
+                health_check_interval=Config.pool_health_check_interval,
+                host=Config.db_host,
+                user=Config.user,
+                password=Config.password,
+                database=Config.database,
+                auth_plugin='mysql_native_password'
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def get_pool_stats():
+    """Return usage counters for the process-wide pool."""
+    return get_pool().stats()
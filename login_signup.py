@@ -1,7 +1,6 @@
 import customtkinter as ctk
 from PIL import Image
 import mysql.connector
-import bcrypt
 import re
 import os
 import sys
@@ -53,33 +52,60 @@ except ImportError:
                 print(f"Image not found: {image_path}")
                 return None
 
+from passwords import hash_password, check_password, needs_rehash
+from background import password_tasks
+
 
 def validate_user(email, password):
-    """Validate user credentials against the database."""
+    """Validate user credentials against the database.
+    
+    Runs on a password worker thread. A matching password stored with a
+    cost below Config.bcrypt_rounds is rehashed at the current cost.
+    Database errors are raised to the caller.
+    """
+    conn = connect_to_database()
+    if not conn:
+        raise mysql.connector.Error(msg="Could not connect to the database.")
+    
+    # The connection goes back to the pool before bcrypt runs
     try:
-        conn = connect_to_database()
-        if not conn:
-            messagebox.showerror("Database Error", "Could not connect to the database.")
-            return None
-            
         cursor = conn.cursor(dictionary=True)
         query = "SELECT * FROM users WHERE email = %s"
         cursor.execute(query, (email,))
         user = cursor.fetchone()
         cursor.close()
+    finally:
         conn.close()
-
-        if user and bcrypt.checkpw(password.encode('utf-8'), user['password'].encode('utf-8')):
-            return user
-        return None
-    except mysql.connector.Error as err:
-        print(f"Database Error: {err}")
-        messagebox.showerror("Database Error", f"An error occurred: {err}")
+    
+    if not user or not check_password(password, user['password']):
         return None
+    
+    if needs_rehash(user['password']):
+        new_hash = hash_password(password)
+        try:
+            conn = connect_to_database()
+            if not conn:
+                raise mysql.connector.Error(msg="Could not connect to the database.")
+            try:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "UPDATE users SET password = %s WHERE user_id = %s",
+                    (new_hash, user['user_id'])
+                )
+                conn.commit()
+                cursor.close()
+            finally:
+                conn.close()
+        except mysql.connector.Error as err:
+            # The old hash still works; try again next login
+            print(f"Could not upgrade password hash: {err}")
+    return user
 
 
 def add_user(first_name, last_name, email, password, user_role="customer"):
     """Add a new user to the database."""
+    # Hashed before a pooled connection is checked out
+    hashed_password = hash_password(password)
     try:
         conn = connect_to_database()
         if not conn:
@@ -93,7 +119,6 @@ def add_user(first_name, last_name, email, password, user_role="customer"):
             conn.close()
             return False, "Email already exists"
 
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
         query = """
         INSERT INTO users (first_name, last_name, email, password, user_role)
         VALUES (%s, %s, %s, %s, %s)
@@ -110,6 +135,7 @@ def add_user(first_name, last_name, email, password, user_role="customer"):
 
 def reset_password(email, new_password):
     """Reset a user's password."""
+    hashed_password = hash_password(new_password)
     try:
         conn = connect_to_database()
         if not conn:
@@ -123,7 +149,6 @@ def reset_password(email, new_password):
             conn.close()
             return False, "Email not found"
 
-        hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
         cursor.execute("UPDATE users SET password = %s WHERE email = %s", (hashed_password, email))
         conn.commit()
         cursor.close()
@@ -581,7 +606,20 @@ class LoginWindow(ctk.CTkFrame):
             self.error_label.configure(text="Please enter a valid email address")
             return
         
-        user = validate_user(email, password)
+        # Checking the hash takes a noticeable moment; keep the window responsive
+        self.login_button.configure(state="disabled", text="Signing in...")
+        password_tasks.submit(
+            self.login_button,
+            validate_user,
+            email,
+            password,
+            on_success=lambda user: self.on_login_result(user, user_role),
+            on_error=self.on_login_error
+        )
+    
+    def on_login_result(self, user, user_role):
+        """Finish a login once the credentials have been checked."""
+        self.login_button.configure(state="normal", text="Login")
         
         if user and user["user_role"] == user_role:
             self.error_label.configure(text="")
@@ -590,6 +628,12 @@ class LoginWindow(ctk.CTkFrame):
         else:
             self.error_label.configure(text="Invalid email, password, or role")
     
+    def on_login_error(self, err):
+        """Report a database failure during login."""
+        self.login_button.configure(state="normal", text="Login")
+        print(f"Database Error: {err}")
+        messagebox.showerror("Database Error", f"An error occurred: {err}")
+    
     def signup(self):
         """Handle user registration."""
         first_name = self.first_name_var.get().strip()
@@ -610,12 +654,26 @@ class LoginWindow(ctk.CTkFrame):
             self.error_label.configure(text=message)
             return
         
-        success, message = add_user(first_name, last_name, email, password)
+        self.signup_button.configure(state="disabled")
+        password_tasks.submit(
+            self.signup_button,
+            add_user,
+            first_name,
+            last_name,
+            email,
+            password,
+            on_success=self.on_signup_result
+        )
+    
+    def on_signup_result(self, result):
+        """Finish a registration once the user has been stored."""
+        success, message = result
         
         if success:
             messagebox.showinfo("Registration Successful", "Your account has been created successfully!")
             self.create_login_view()
         else:
+            self.signup_button.configure(state="normal")
             self.error_label.configure(text=message)
     
     def perform_password_reset(self):
@@ -641,12 +699,24 @@ class LoginWindow(ctk.CTkFrame):
             self.error_label.configure(text=message)
             return
         
-        success, message = reset_password(email, new_password)
+        self.reset_button.configure(state="disabled")
+        password_tasks.submit(
+            self.reset_button,
+            reset_password,
+            email,
+            new_password,
+            on_success=self.on_password_reset_result
+        )
+    
+    def on_password_reset_result(self, result):
+        """Finish a password reset once the new hash has been stored."""
+        success, message = result
         
         if success:
             messagebox.showinfo("Password Reset", "Your password has been reset successfully!")
             self.create_login_view()
         else:
+            self.reset_button.configure(state="normal")
             self.error_label.configure(text=message)
     
     def navigate_to_dashboard(self, role, user_id):
@@ -2,6 +2,7 @@ import customtkinter as ctk
 from PIL import Image
 from login_signup import LoginWindow
 from utils import connect_to_database, center_window
+from migrations import apply_migrations
 import os
 import tkinter as tk
 import mysql.connector
@@ -31,7 +32,8 @@ def create_tables():
                 product_category VARCHAR(50) NOT NULL,
                 product_price DECIMAL(10, 2) NOT NULL,
                 stock_quantity INT NOT NULL,
-                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                row_version BIGINT NOT NULL DEFAULT 0
             );
         """,
         "inventory": """
@@ -79,6 +81,7 @@ def create_tables():
                 product_id INT NOT NULL,
                 quantity INT NOT NULL,
                 sub_total DECIMAL(10, 2) NOT NULL,
+                product_category VARCHAR(50) NOT NULL,
                 FOREIGN KEY (order_id) REFERENCES orders(order_id),
                 FOREIGN KEY (product_id) REFERENCES products(product_id)
             );
@@ -103,6 +106,9 @@ def create_tables():
                 print(f"Creating table: {table_name}")
                 cursor.execute(query)
             
+            # Bring older databases up to the current schema
+            apply_migrations(conn)
+            
             # Insert some default products if the products table is empty
             cursor.execute("SELECT COUNT(*) FROM products")
             product_count = cursor.fetchone()[0]
@@ -140,9 +146,9 @@ def create_tables():
             admin_count = cursor.fetchone()[0]
             
             if admin_count == 0:
-                import bcrypt
+                from passwords import hash_password
                 password = "admin123"
-                hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+                hashed_password = hash_password(password)
                 
                 cursor.execute(
                     "INSERT INTO users (first_name, last_name, email, password, user_role) VALUES (%s, %s, %s, %s, %s)",
@@ -0,0 +1,164 @@
+import mysql.connector
+from store_stats import install_stats_counters, install_catalog_version
+from sales_rollups import install_sales_rollups
+
+# Versioned schema changes applied on top of the CREATE TABLE IF NOT EXISTS
+# definitions in main.create_tables. Each migration runs once, in order, and
+# is recorded in schema_version. Migrations check the current schema before
+# changing it, so they are safe on databases that already have the change.
+
+
+def column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+
+def index_exists(cursor, table, index_name):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (table, index_name))
+    return cursor.fetchone()[0] > 0
+
+
+def add_index(cursor, table, index_name, columns, unique=False):
+    """Create an index unless one with the same name already exists."""
+    if index_exists(cursor, table, index_name):
+        return
+    print(f"Creating index: {table}.{index_name}")
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    cursor.execute(f"CREATE {kind} {index_name} ON {table} ({', '.join(columns)})")
+
+
+def add_hot_path_indexes(cursor):
+    # Customer order history, newest first
+    add_index(cursor, "orders", "idx_orders_user_date", ["user_id", "order_date"])
+    # Date-range filters in every admin report
+    add_index(cursor, "orders", "idx_orders_date", ["order_date"])
+    # Active cart lookup
+    add_index(cursor, "shopping_carts", "idx_carts_user_status", ["user_id", "status"])
+    # Cart item lookups by product
+    add_index(cursor, "cart_items", "idx_cart_items_cart_product", ["cart_id", "product_id"])
+    # Catalog ordering
+    add_index(cursor, "products", "idx_products_category_name", ["product_category", "product_name"])
+    # Low stock queries
+    add_index(cursor, "products", "idx_products_stock", ["stock_quantity"])
+
+
+def add_cart_unique_keys(cursor):
+    # Merge duplicate lines for the same product into the oldest one
+    cursor.execute("""
+        UPDATE cart_items ci
+        JOIN (
+            SELECT MIN(cart_item_id) AS keep_id, SUM(quantity) AS total_quantity
+            FROM cart_items
+            GROUP BY cart_id, product_id
+            HAVING COUNT(*) > 1
+        ) dup ON ci.cart_item_id = dup.keep_id
+        SET ci.quantity = dup.total_quantity
+    """)
+    cursor.execute("""
+        DELETE ci FROM cart_items ci
+        JOIN (
+            SELECT cart_id, product_id, MIN(cart_item_id) AS keep_id
+            FROM cart_items
+            GROUP BY cart_id, product_id
+            HAVING COUNT(*) > 1
+        ) dup ON ci.cart_id = dup.cart_id AND ci.product_id = dup.product_id AND ci.cart_item_id <> dup.keep_id
+    """)
+    # Created before the old index is dropped so the cart_id foreign key always has an index
+    add_index(cursor, "cart_items", "uq_cart_items_cart_product", ["cart_id", "product_id"], unique=True)
+    if index_exists(cursor, "cart_items", "idx_cart_items_cart_product"):
+        cursor.execute("DROP INDEX idx_cart_items_cart_product ON cart_items")
+    
+    # Keep the oldest active cart per user, which is the one the app reads
+    cursor.execute("""
+        UPDATE shopping_carts sc
+        JOIN (
+            SELECT user_id, MIN(cart_id) AS keep_id
+            FROM shopping_carts
+            WHERE status = 'active'
+            GROUP BY user_id
+            HAVING COUNT(*) > 1
+        ) dup ON sc.user_id = dup.user_id AND sc.cart_id <> dup.keep_id
+        SET sc.status = 'abandoned'
+        WHERE sc.status = 'active'
+    """)
+    # New carts are created under a lock on the user's row (see
+    # CartRepository._active_cart_id). A generated active_user_id column
+    # with a unique index can't be used: InnoDB rejects stored generated
+    # columns over user_id, whose foreign key cascades on delete.
+
+
+def add_catalog_version(cursor):
+    if not column_exists(cursor, "store_stats", "catalog_version"):
+        cursor.execute("ALTER TABLE store_stats ADD COLUMN catalog_version BIGINT NOT NULL DEFAULT 0")
+    if not column_exists(cursor, "products", "row_version"):
+        cursor.execute("ALTER TABLE products ADD COLUMN row_version BIGINT NOT NULL DEFAULT 0")
+    # Catalog cache delta fetches
+    add_index(cursor, "products", "idx_products_row_version", ["row_version"])
+    install_catalog_version(cursor)
+
+
+def add_sales_rollups(cursor):
+    # Category revenue is grouped by the category recorded on each order
+    # line. Past lines never recorded one, so they take the product's
+    # current category.
+    if not column_exists(cursor, "order_details", "product_category"):
+        cursor.execute("ALTER TABLE order_details ADD COLUMN product_category VARCHAR(50) NULL")
+        cursor.execute("""
+            UPDATE order_details od
+            JOIN products p ON p.product_id = od.product_id
+            SET od.product_category = p.product_category
+        """)
+        cursor.execute("ALTER TABLE order_details MODIFY product_category VARCHAR(50) NOT NULL")
+    install_sales_rollups(cursor)
+
+
+MIGRATIONS = [
+    (1, "Install dashboard statistics counters", install_stats_counters),
+    (2, "Add secondary indexes for hot query paths", add_hot_path_indexes),
+    (3, "One line per product per cart and one active cart per user", add_cart_unique_keys),
+    (4, "Daily sales rollups for admin reports", add_sales_rollups),
+    (5, "Catalog version counter for the shopping cache", add_catalog_version),
+]
+
+
+def apply_migrations(conn):
+    """Apply every migration newer than the database's recorded schema version."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    
+    # Serialize migrations when several app instances start at once
+    cursor.execute("SELECT GET_LOCK('supermarket_schema_migrations', 60)")
+    if cursor.fetchone()[0] != 1:
+        cursor.close()
+        raise mysql.connector.Error(msg="Timed out waiting for another instance to finish migrating the schema")
+    
+    try:
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        current_version = cursor.fetchone()[0]
+        
+        for version, description, migrate in MIGRATIONS:
+            if version <= current_version:
+                continue
+            print(f"Applying migration {version}: {description}")
+            migrate(cursor)
+            cursor.execute(
+                "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                (version, description)
+            )
+            conn.commit()
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK('supermarket_schema_migrations')")
+        cursor.fetchone()
+        cursor.close()
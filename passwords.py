@@ -0,0 +1,38 @@
+import bcrypt
+
+from config import Config
+
+# Password hashing helpers. bcrypt is deliberately slow, so callers in the UI
+# run these through background.password_tasks rather than on the Tk thread.
+
+
+def hash_password(password, rounds=None):
+    """Hash a password at the configured bcrypt cost and return it as a string."""
+    salt = bcrypt.gensalt(rounds=rounds or Config.bcrypt_rounds)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+def check_password(password, hashed_password):
+    """Return True if the password matches the stored bcrypt hash."""
+    if isinstance(hashed_password, str):
+        hashed_password = hashed_password.encode('utf-8')
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+
+def hash_rounds(hashed_password):
+    """Return the cost factor a bcrypt hash was made with, e.g. 12 for $2b$12$..."""
+    if isinstance(hashed_password, bytes):
+        hashed_password = hashed_password.decode('utf-8')
+    try:
+        return int(hashed_password.split('$')[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def needs_rehash(hashed_password):
+    """Return True if the hash is weaker than the configured cost."""
+    return hash_rounds(hashed_password) < Config.bcrypt_rounds
@@ -0,0 +1,167 @@
+# Daily sales rollups for the admin reports. Each checkout adds its order to
+# three small tables (sales per day, per product per day and per category per
+# day) in the same transaction, so reports sum at most one row per day per
+# product or category instead of scanning orders and order_details.
+# rebuild_rollups recomputes a date range from the raw tables; it seeds the
+# tables when they are installed and repairs them after orders are edited or
+# deleted by hand. Category revenue is grouped by order_details.product_category,
+# the category recorded at checkout, so renaming or recategorizing a product
+# does not move its past sales.
+#
+# Usage: python sales_rollups.py [start_date [end_date]]   (dates as YYYY-MM-DD)
+import sys
+from datetime import date, datetime, timedelta
+
+ROLLUP_TABLES = {
+    "sales_daily": """
+        CREATE TABLE IF NOT EXISTS sales_daily (
+            sale_date DATE PRIMARY KEY,
+            order_count INT NOT NULL DEFAULT 0,
+            revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+            highest_order DECIMAL(10, 2) NOT NULL DEFAULT 0,
+            lowest_order DECIMAL(10, 2) NOT NULL DEFAULT 0
+        );
+    """,
+    "product_sales_daily": """
+        CREATE TABLE IF NOT EXISTS product_sales_daily (
+            sale_date DATE NOT NULL,
+            product_id INT NOT NULL,
+            quantity INT NOT NULL DEFAULT 0,
+            revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (sale_date, product_id)
+        );
+    """,
+    "category_sales_daily": """
+        CREATE TABLE IF NOT EXISTS category_sales_daily (
+            sale_date DATE NOT NULL,
+            product_category VARCHAR(50) NOT NULL,
+            revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (sale_date, product_category)
+        );
+    """,
+}
+
+
+def record_order(cursor, order_id):
+    """Add one order to the rollups; call in the transaction that writes the order.
+    
+    Rows are upserted in key order so concurrent checkouts lock them in the
+    same order.
+    """
+    cursor.execute("""
+        INSERT INTO sales_daily (sale_date, order_count, revenue, highest_order, lowest_order)
+        SELECT DATE(order_date), 1, total_price, total_price, total_price
+        FROM orders WHERE order_id = %s
+        ON DUPLICATE KEY UPDATE
+            order_count = order_count + 1,
+            revenue = revenue + VALUES(revenue),
+            highest_order = GREATEST(highest_order, VALUES(highest_order)),
+            lowest_order = LEAST(lowest_order, VALUES(lowest_order))
+    """, (order_id,))
+    cursor.execute("""
+        INSERT INTO product_sales_daily (sale_date, product_id, quantity, revenue)
+        SELECT DATE(o.order_date), od.product_id, SUM(od.quantity), SUM(od.sub_total)
+        FROM orders o
+        JOIN order_details od ON od.order_id = o.order_id
+        WHERE o.order_id = %s
+        GROUP BY DATE(o.order_date), od.product_id
+        ORDER BY od.product_id
+        ON DUPLICATE KEY UPDATE
+            quantity = quantity + VALUES(quantity),
+            revenue = revenue + VALUES(revenue)
+    """, (order_id,))
+    cursor.execute("""
+        INSERT INTO category_sales_daily (sale_date, product_category, revenue)
+        SELECT DATE(o.order_date), od.product_category, SUM(od.sub_total)
+        FROM orders o
+        JOIN order_details od ON od.order_id = o.order_id
+        WHERE o.order_id = %s
+        GROUP BY DATE(o.order_date), od.product_category
+        ORDER BY od.product_category
+        ON DUPLICATE KEY UPDATE revenue = revenue + VALUES(revenue)
+    """, (order_id,))
+
+
+def rebuild_rollups(cursor, start_date=None, end_date=None):
+    """Recompute the rollups for start_date..end_date (inclusive) from the raw tables.
+    
+    Either bound may be None to rebuild from the first or up to the last
+    order. Does not commit.
+    """
+    conditions = []
+    params = []
+    if start_date is not None:
+        conditions.append("{column} >= %s")
+        params.append(start_date)
+    if end_date is not None:
+        conditions.append("{column} < %s")
+        params.append(end_date + timedelta(days=1))
+    where = " AND ".join(conditions) or "TRUE"
+    
+    for table in ROLLUP_TABLES:
+        cursor.execute(f"DELETE FROM {table} WHERE {where.format(column='sale_date')}", tuple(params))
+    
+    # Range predicates on the raw order_date so idx_orders_date is used
+    order_range = where.format(column="o.order_date")
+    cursor.execute(f"""
+        INSERT INTO sales_daily (sale_date, order_count, revenue, highest_order, lowest_order)
+        SELECT DATE(o.order_date), COUNT(*), SUM(o.total_price), MAX(o.total_price), MIN(o.total_price)
+        FROM orders o
+        WHERE {order_range}
+        GROUP BY DATE(o.order_date)
+    """, tuple(params))
+    cursor.execute(f"""
+        INSERT INTO product_sales_daily (sale_date, product_id, quantity, revenue)
+        SELECT DATE(o.order_date), od.product_id, SUM(od.quantity), SUM(od.sub_total)
+        FROM orders o
+        JOIN order_details od ON od.order_id = o.order_id
+        WHERE {order_range}
+        GROUP BY DATE(o.order_date), od.product_id
+    """, tuple(params))
+    cursor.execute(f"""
+        INSERT INTO category_sales_daily (sale_date, product_category, revenue)
+        SELECT DATE(o.order_date), od.product_category, SUM(od.sub_total)
+        FROM orders o
+        JOIN order_details od ON od.order_id = o.order_id
+        WHERE {order_range}
+        GROUP BY DATE(o.order_date), od.product_category
+    """, tuple(params))
+
+
+def install_sales_rollups(cursor):
+    """Create the rollup tables and fill them from the existing orders."""
+    for table_name, query in ROLLUP_TABLES.items():
+        print(f"Creating table: {table_name}")
+        cursor.execute(query)
+    rebuild_rollups(cursor)
+
+
+def parse_date(text):
+    return datetime.strptime(text, "%Y-%m-%d").date()
+
+
+def main():
+    from utils import get_connection
+    
+    if len(sys.argv) > 3:
+        print("Usage: python sales_rollups.py [start_date [end_date]]")
+        sys.exit(1)
+    start_date = parse_date(sys.argv[1]) if len(sys.argv) > 1 else None
+    end_date = parse_date(sys.argv[2]) if len(sys.argv) > 2 else date.today()
+    
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        rebuild_rollups(cursor, start_date, end_date)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+    print(f"Rebuilt sales rollups from {start_date or 'the first order'} to {end_date}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# Store-wide counters for the admin dashboard. A single store_stats row is
+# kept current by triggers on users, products and orders (signups, inventory
+# edits, checkouts), so reading the statistics is one primary-key lookup no
+# matter how many orders exist.
+
+LOW_STOCK_THRESHOLD = 10
+
+STATS_TABLE = """
+    CREATE TABLE IF NOT EXISTS store_stats (
+        stats_id TINYINT PRIMARY KEY,
+        customer_count INT NOT NULL DEFAULT 0,
+        product_count INT NOT NULL DEFAULT 0,
+        low_stock_count INT NOT NULL DEFAULT 0,
+        order_count INT NOT NULL DEFAULT 0,
+        total_revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        catalog_version BIGINT NOT NULL DEFAULT 0
+    );
+"""
+
+STATS_TRIGGERS = {
+    "trg_stats_users_insert": """
+        CREATE TRIGGER trg_stats_users_insert AFTER INSERT ON users FOR EACH ROW
+        UPDATE store_stats
+        SET customer_count = customer_count + (NEW.user_role = 'customer')
+        WHERE stats_id = 1
+    """,
+    "trg_stats_users_update": """
+        CREATE TRIGGER trg_stats_users_update AFTER UPDATE ON users FOR EACH ROW
+        UPDATE store_stats
+        SET customer_count = customer_count + (NEW.user_role = 'customer') - (OLD.user_role = 'customer')
+        WHERE stats_id = 1
+    """,
+    "trg_stats_users_delete": """
+        CREATE TRIGGER trg_stats_users_delete AFTER DELETE ON users FOR EACH ROW
+        UPDATE store_stats
+        SET customer_count = customer_count - (OLD.user_role = 'customer')
+        WHERE stats_id = 1
+    """,
+    "trg_stats_products_insert": f"""
+        CREATE TRIGGER trg_stats_products_insert AFTER INSERT ON products FOR EACH ROW
+        UPDATE store_stats
+        SET product_count = product_count + 1,
+            low_stock_count = low_stock_count + (NEW.stock_quantity < {LOW_STOCK_THRESHOLD})
+        WHERE stats_id = 1
+    """,
+    "trg_stats_products_update": f"""
+        CREATE TRIGGER trg_stats_products_update AFTER UPDATE ON products FOR EACH ROW
+        UPDATE store_stats
+        SET low_stock_count = low_stock_count
+            + (NEW.stock_quantity < {LOW_STOCK_THRESHOLD})
+            - (OLD.stock_quantity < {LOW_STOCK_THRESHOLD})
+        WHERE stats_id = 1
+    """,
+    "trg_stats_products_delete": f"""
+        CREATE TRIGGER trg_stats_products_delete AFTER DELETE ON products FOR EACH ROW
+        UPDATE store_stats
+        SET product_count = product_count - 1,
+            low_stock_count = low_stock_count - (OLD.stock_quantity < {LOW_STOCK_THRESHOLD})
+        WHERE stats_id = 1
+    """,
+    "trg_stats_orders_insert": """
+        CREATE TRIGGER trg_stats_orders_insert AFTER INSERT ON orders FOR EACH ROW
+        UPDATE store_stats
+        SET order_count = order_count + 1,
+            total_revenue = total_revenue + NEW.total_price
+        WHERE stats_id = 1
+    """,
+    "trg_stats_orders_update": """
+        CREATE TRIGGER trg_stats_orders_update AFTER UPDATE ON orders FOR EACH ROW
+        UPDATE store_stats
+        SET total_revenue = total_revenue + NEW.total_price - OLD.total_price
+        WHERE stats_id = 1
+    """,
+    "trg_stats_orders_delete": """
+        CREATE TRIGGER trg_stats_orders_delete AFTER DELETE ON orders FOR EACH ROW
+        UPDATE store_stats
+        SET order_count = order_count - 1,
+            total_revenue = total_revenue - OLD.total_price
+        WHERE stats_id = 1
+    """,
+}
+
+# Every write to products bumps catalog_version and stamps the row with the
+# new value. The bump holds the store_stats row lock until commit, so
+# versions are handed out in commit order: once a reader sees version N,
+# every row stamped N or lower is committed. The shopping catalog cache
+# refetches rows with row_version above the last version it synced.
+CATALOG_VERSION_TRIGGERS = {
+    "trg_catalog_version_insert": """
+        CREATE TRIGGER trg_catalog_version_insert BEFORE INSERT ON products FOR EACH ROW
+        BEGIN
+            UPDATE store_stats SET catalog_version = catalog_version + 1 WHERE stats_id = 1;
+            SET NEW.row_version = COALESCE((SELECT catalog_version FROM store_stats WHERE stats_id = 1), 0);
+        END
+    """,
+    "trg_catalog_version_update": """
+        CREATE TRIGGER trg_catalog_version_update BEFORE UPDATE ON products FOR EACH ROW
+        BEGIN
+            UPDATE store_stats SET catalog_version = catalog_version + 1 WHERE stats_id = 1;
+            SET NEW.row_version = COALESCE((SELECT catalog_version FROM store_stats WHERE stats_id = 1), 0);
+        END
+    """,
+    "trg_catalog_version_delete": """
+        CREATE TRIGGER trg_catalog_version_delete AFTER DELETE ON products FOR EACH ROW
+        UPDATE store_stats SET catalog_version = catalog_version + 1 WHERE stats_id = 1
+    """,
+}
+
+# Computes every statistic from the base tables in one statement
+LIVE_STATS_QUERY = f"""
+    SELECT
+        (SELECT COUNT(*) FROM users WHERE user_role = 'customer') AS customer_count,
+        (SELECT COUNT(*) FROM products) AS product_count,
+        (SELECT COUNT(*) FROM products WHERE stock_quantity < {LOW_STOCK_THRESHOLD}) AS low_stock_count,
+        (SELECT COUNT(*) FROM orders) AS order_count,
+        (SELECT COALESCE(SUM(total_price), 0) FROM orders) AS total_revenue
+"""
+
+
+def create_triggers(cursor, triggers):
+    """Create each trigger in triggers that does not exist yet."""
+    cursor.execute("""
+        SELECT TRIGGER_NAME FROM information_schema.TRIGGERS
+        WHERE TRIGGER_SCHEMA = DATABASE()
+    """)
+    existing = {row[0] for row in cursor.fetchall()}
+    for trigger_name, query in triggers.items():
+        if trigger_name not in existing:
+            print(f"Creating trigger: {trigger_name}")
+            cursor.execute(query)
+
+
+def install_stats_counters(cursor):
+    """Create the counters table and triggers, seeding the row from the base tables."""
+    cursor.execute(STATS_TABLE)
+    create_triggers(cursor, STATS_TRIGGERS)
+    
+    # Seeded after the triggers exist so no write falls between the two
+    cursor.execute(f"""
+        INSERT IGNORE INTO store_stats
+            (stats_id, customer_count, product_count, low_stock_count, order_count, total_revenue)
+        SELECT 1, s.* FROM ({LIVE_STATS_QUERY}) AS s
+    """)
+
+
+def install_catalog_version(cursor):
+    """Create the triggers that maintain catalog_version and products.row_version."""
+    create_triggers(cursor, CATALOG_VERSION_TRIGGERS)
+
+
+def fetch_store_stats(cursor):
+    """Return the dashboard statistics as a dict in a single round-trip."""
+    cursor.execute("""
+        SELECT customer_count, product_count, low_stock_count, order_count, total_revenue
+        FROM store_stats WHERE stats_id = 1
+    """)
+    row = cursor.fetchone()
+    if row is None:
+        # Counters not installed yet; fall back to computing them directly
+        cursor.execute(LIVE_STATS_QUERY)
+        row = cursor.fetchone()
+    
+    if isinstance(row, dict):
+        return row
+    keys = ("customer_count", "product_count", "low_stock_count", "order_count", "total_revenue")
+    return dict(zip(keys, row))
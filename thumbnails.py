@@ -0,0 +1,111 @@
+import glob
+import os
+import threading
+from collections import OrderedDict
+
+import customtkinter as ctk
+from PIL import Image
+
+PRODUCT_IMAGE_DIR = os.path.join("images", "products")
+THUMBNAIL_DIR = os.path.join("images", "thumbnails")
+
+# Every size a product image is rendered at in the app
+THUMBNAIL_SIZES = [(180, 140), (60, 60), (50, 50)]
+
+
+class ThumbnailCache:
+    """Shared cache of resized product images.
+    
+    Thumbnails live in a bounded in-memory LRU of CTkImage objects backed by
+    resized PNGs on disk, keyed by the source image's mtime so replacing a
+    product image invalidates its thumbnails. A full-size source image is
+    decoded at most once per change: all sizes are written on the first miss.
+    """
+    
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._images = OrderedDict()  # (product_id, size, mtime) -> CTkImage
+        self._lock = threading.Lock()
+        
+        # Counters for monitoring
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    def get(self, product_id, size):
+        """Return a CTkImage of the product at the given size, or None if it has no image."""
+        source_path = os.path.join(PRODUCT_IMAGE_DIR, f"{product_id}.png")
+        try:
+            mtime = os.stat(source_path).st_mtime_ns
+        except OSError:
+            return None
+        
+        key = (product_id, tuple(size), mtime)
+        with self._lock:
+            photo = self._images.get(key)
+            if photo is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return photo
+        
+        try:
+            thumbnail = self._load_thumbnail(product_id, tuple(size), mtime, source_path)
+        except Exception as e:
+            print(f"Error loading image {source_path}: {e}")
+            return None
+        
+        photo = ctk.CTkImage(light_image=thumbnail, size=tuple(size))
+        with self._lock:
+            self._images[key] = photo
+            self._images.move_to_end(key)
+            while len(self._images) > self.max_entries:
+                self._images.popitem(last=False)
+        return photo
+    
+    def _thumbnail_path(self, product_id, size, mtime):
+        width, height = size
+        return os.path.join(THUMBNAIL_DIR, f"{width}x{height}", f"{product_id}_{mtime}.png")
+    
+    def _load_thumbnail(self, product_id, size, mtime, source_path):
+        """Read the resized image from disk, generating every size from the source if needed."""
+        thumbnail_path = self._thumbnail_path(product_id, size, mtime)
+        if os.path.exists(thumbnail_path):
+            self.disk_hits += 1
+            thumbnail = Image.open(thumbnail_path)
+            thumbnail.load()
+            return thumbnail
+        
+        self.misses += 1
+        with Image.open(source_path) as source:
+            source.load()
+            resized = {}
+            for thumbnail_size in set(THUMBNAIL_SIZES) | {size}:
+                resized[thumbnail_size] = source.resize(thumbnail_size, Image.LANCZOS)
+        
+        for thumbnail_size, image in resized.items():
+            self._save_thumbnail(product_id, thumbnail_size, mtime, image)
+        return resized[size]
+    
+    def _save_thumbnail(self, product_id, size, mtime, image):
+        """Persist a thumbnail and drop ones made from older versions of the source."""
+        path = self._thumbnail_path(product_id, size, mtime)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            for stale_path in glob.glob(os.path.join(os.path.dirname(path), f"{product_id}_*.png")):
+                if stale_path != path:
+                    os.remove(stale_path)
+            # Write under a temporary name so readers never see a partial file
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            image.save(temp_path, format="PNG")
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Could not cache thumbnail {path}: {e}")
+    
+    def clear(self):
+        """Drop all in-memory thumbnails."""
+        with self._lock:
+            self._images.clear()
+
+
+# Process-wide cache shared by all frames
+thumbnail_cache = ThumbnailCache()
@@ -39,21 +39,24 @@
     
 
 import mysql.connector
-from config import Config
+from db_pool import get_pool
 from PIL import Image
 import os
 import customtkinter as ctk
 
+def get_connection():
+    """Checks out a pooled connection to the MySQL database.
+
+    Raises mysql.connector.Error when no connection can be made, including
+    PoolTimeoutError when the pool stays exhausted. Calling close() on the
+    returned connection hands it back to the pool.
+    """
+    return get_pool().get_connection()
+
 def connect_to_database():
-    """Establishes and returns a connection to the MySQL database."""
+    """Like get_connection, but prints the error and returns None on failure."""
     try:
-        conn = mysql.connector.connect(
-            host=Config.db_host,
-            user=Config.user,
-            password=Config.password,
-            database=Config.database,
-            auth_plugin='mysql_native_password'
-        )
+        conn = get_connection()
         return conn
     except mysql.connector.Error as err:
         print(f"Database connection error: {err}")